@@ -29,7 +29,7 @@ params.out_prop_pad = 17
 
 // --------------- Check (and Describe) "--mode" param: ---------------
     modes = ['initiate', 'validate', 'prep_fasta',
-             'list_refs', 'run', 'help', 'version']
+             'list_refs', 'run', 'profile', 'help', 'version']
     usage = """\
     USAGE:
         nextflow [NF_OPTIONS] run CnR-flow --mode <run-mode> [PIPE_OPTIONS]
@@ -40,6 +40,7 @@ params.out_prop_pad = 17
         prep_fasta   : Prepare alignment reference(s) from <genome>.fa[sta]
         list_refs    : List prepared alignment references
         run          : Run pipeline
+        profile      : Summarize measured task resource usage of previous run(s)
         help         : Print help and usage information for pipeline
         version      : Print pipeline version
     """
@@ -100,22 +101,27 @@ if( ['prep_fasta'].contains(params.mode) ) {
 // If 'list_refs' mode, ensure refs dir is defined.
 } else if(['list_refs'].contains(params.mode)) {
     test_params_key(params, 'refs_dir')
+
+// If 'profile' mode, ensure output dir is defined.
+} else if(['profile'].contains(params.mode)) {
+    test_params_key(params, 'out_dir')
      
 // If a run or validate mode, ensure all required keys have been provided correctly.
 } else if(['run', 'validate'].contains(params.mode) ) {
     // Check to ensure required keys have been provided correctly.
     first_test_keys = [
         'do_merge_lanes', 'do_fastqc', 'do_trim', 'do_norm_spike', 
-        'do_norm_cpm', 'do_make_bigwig',
+        'do_norm_cpm', 'do_make_bigwig', 'do_qc_report',
         'peak_callers', 'java_call', 'bowtie2_build_call', 'samtools_call',
         'facount_call', 'bedgraphtobigwig_call',
         'fastqc_call', 'trimmomatic_call', 'bowtie2_call', 
         'bedtools_call', 'macs2_call', 
-        'seacr_call', 'out_dir', 'refs_dir', 'log_dir', 'prep_bt2db_suf',
+        'seacr_call', 'cnr_tools_call', 'out_dir', 'refs_dir', 'log_dir', 'stats_dir',
+        'prep_bt2db_suf', 'validate_cache_dir',
         'merge_fastqs_dir', 'fastqc_pre_dir', 'trim_dir', 
         'fastqc_post_dir', 'aln_dir_ref', 'aln_dir_spike', 'aln_dir_mod',
         'aln_dir_norm', 'aln_dir_norm_cpm', 
-        'aln_bigwig_dir', 'peaks_dir_macs', 'peaks_dir_seacr',
+        'aln_bigwig_dir', 'peaks_dir_macs', 'peaks_dir_seacr', 'qc_dir', 'stage_store_dir',
         'verbose', 'help', 'h', 'version', 'v', 'out_front_pad', 'out_prop_pad', 
         'trim_name_prefix', 'trim_name_suffix'
     ]
@@ -177,6 +183,29 @@ if( ['prep_fasta'].contains(params.mode) ) {
                         println ""
                     }
                 }
+                if( params.norm_aln_mode == 'combined' ) {
+                    comb_ref_key = get_comb_ref_name(
+                        get_ref_key(params, 'ref'), get_ref_key(params, 'norm_ref')
+                    )
+                    ref_info = get_ref_details(params, 'comb_ref', comb_ref_key)
+                    if( params.verbose ) { 
+                        log.info ""
+                        log.info "Identified Combined Reference + Spike-in Database Details:"
+                        ref_info.each {detail ->
+                            log.info "- comb_ref_${detail.key}".padRight(21) + " : ${detail.value}"
+                        }
+                    }
+                    // Set database details.
+                    ref_info.each {detail -> 
+                        if( !params.containsKey("comb_ref_${detail.key}".toString()) ) {
+                            params["comb_ref_${detail.key}".toString()] = detail.value
+                        } else if (!(['name'].contains(detail.key) ) ) {
+                            log.warn "Key: comb_ref_${detail.key} already exists in params."
+                            log.warn "-   Skipping auto-setting of this params value."
+                            println ""
+                        }
+                    }
+                }
             }
         } else {
             if( params.verbose ) {
@@ -200,31 +229,83 @@ if( ['prep_fasta'].contains(params.mode) ) {
         "SEACR": ["${params.seacr_call}", 1, *get_resources(params, 'seacr')],
         "bedGraphToBigWig": ["${params.bedgraphtobigwig_call}", 255, 
             *get_resources(params, 'bedgraphtobigwig')],
+        "CnR-tools": ["${params.cnr_tools_call} --version", 0, *get_resources(params, 'cnr_tools')],
+        "CnR-tools (Combined Alignment)": ["${params.cnr_tools_call} --version", 0, 
+            get_module(params, ['bowtie2', 'samtools', 'cnr_tools']),
+            get_conda(params, ['bowtie2', 'samtools', 'cnr_tools']),
+            get_container(params, 'bowtie2_samtools_cnr_tools')],
     ] 
 
     // General Keys and Params:
     req_keys.add(['publish_files', ['minimal', 'default', 'all']])
-    req_keys.add(['publish_mode', ['symlink', 'copy']])
+    req_keys.add(['publish_mode', ['symlink', 'copy', 'link']])
 
     // Keys and Params for merging langes
     if( params.do_merge_lanes ) {
-        null // No custom settings
+        req_keys.add(['merge_lanes_mode', ['copy', 'stream']])
+    }
+    // Keys and Params for data-size-aware resources
+    req_keys.add(['max_cpus'])
+    req_keys.add(['scale_resources', [true, false]])
+    if( params.scale_resources ) {
+        req_keys.add(['resource_base_gb'])
+        req_keys.add(['resource_min_scale'])
+        req_keys.add(['resource_max_scale'])
+        req_keys.add(['resource_max_retries'])
+        // Process selector settings (withLabel/withName) take priority over scaled values.
+        (session.config.process ?: [:]).each {selector, settings ->
+            if( !"${selector}".startsWith('withLabel:') && !"${selector}".startsWith('withName:') ) {
+                return
+            }
+            def set_keys = ['cpus', 'memory', 'time'].findAll {
+                settings instanceof Map && settings.containsKey(it) 
+            }
+            if( set_keys ) {
+                log.warn "Process setting: '${selector}' sets: ${set_keys.join(', ')}"
+                log.warn "-   These take priority over scaled resources (params.scale_resources)."
+            }
+        }
+    }
+    // Keys and Params for node-local scratch execution
+    req_keys.add(['use_scratch'])
+    // Keys and Params for reuse of stored stage outputs
+    req_keys.add(['stage_store', [true, false]])
+    req_keys.add(['stage_store_hash', ['standard', 'deep']])
+    if( params.stage_store && params.publish_mode == 'symlink' ) {
+        // Stored outputs are moved from the work directory after publishing.
+        message =  "Reuse of stored stage outputs (params.stage_store) requires \n"
+        message += "    --publish_mode 'copy' or 'link'."
+        log.error message
+        exit 1
     }
     // Keys and Params for FastQC
     if( params.do_fastqc ) {
         req_keys.add(['fastqc_flags'])
+        req_keys.add(['fastqc_mode', ['combined', 'files']])
     }
     // Keys and Params for Trimmomatic trimming
     if( params.do_trim ) {
         //req_files.add(['trimmomatic_adapterpath'])
         req_keys.add(['trimmomatic_settings'])
         req_keys.add(['trimmomatic_flags'])
+        req_keys.add(['fuse_trim_aln'])
+        if( params.fuse_trim_aln ) {
+            // Separate spike-in alignment requires trimmed fastq files.
+            if( params.do_norm_spike && params.norm_aln_mode != 'combined' ) {
+                message =  "Fused trimming and alignment (params.fuse_trim_aln) requires \n"
+                message += "    --norm_aln_mode 'combined' when spike-in normalization is enabled."
+                log.error message
+                exit 1
+            }
+        }
     }
     // keys and params for alignment steps
     if( true ) {
         req_keys.add(['ref_bt2db_path'])
         req_keys.add(['ref_name'])
         req_keys.add(['aln_ref_flags'])
+        req_keys.add(['aln_shard_reads'])
+        req_keys.add(['aln_format', ['cram', 'bam']])
         req_keys.add(['use_aln_modes',
             ['all', 'all_dedup', 'less_120', 'less_120_dedup']])
         req_files.add(['ref_chrom_sizes_path'])
@@ -233,9 +314,20 @@ if( ['prep_fasta'].contains(params.mode) ) {
     if( params.do_norm_spike ) {
         req_keys.add(['norm_scale'])
         req_keys.add(['aln_norm_flags'])
-        req_keys.add(['norm_ref_bt2db_path'])
         req_keys.add(['norm_ref_name'])
         req_keys.add(['norm_mode', ['adj', 'all']])
+        req_keys.add(['norm_aln_mode', ['separate', 'combined']])
+        if( params.norm_aln_mode == 'combined' ) {
+            req_keys.add(['comb_ref_bt2db_path'])
+            req_keys.add(['comb_ref_spike_prefix'])
+            // Combined-mode spike-in reads are aligned in the reference alignment.
+            if( params.aln_norm_flags != params.aln_ref_flags ) {
+                log.warn "In --norm_aln_mode 'combined', spike-in reads are aligned with"
+                log.warn "-   params.aln_ref_flags, and params.aln_norm_flags is not used."
+            }
+        } else {
+            req_keys.add(['norm_ref_bt2db_path'])
+        }
     }
     // keys and params for CPM normalization
     if( params.do_norm_cpm ) {
@@ -244,12 +336,23 @@ if( ['prep_fasta'].contains(params.mode) ) {
     // keys and params for bigWig creation
     if( params.do_make_bigwig ) {
         req_keys.add(['norm_mode', ['adj', 'all']])
+        req_keys.add(['bigwig_mode', ['bedgraph', 'direct', 'binned']])
+        if( params.bigwig_mode == 'binned' && !params.compact_bin_size ) {
+            message =  "bigWig creation from binned coverage (params.bigwig_mode) requires \n"
+            message += "    binned coverage to be enabled with --compact_bin_size."
+            log.error message
+            exit 1
+        }
     }
+    // keys and params for binned coverage
+    req_keys.add(['compact_bin_size'])
     // keys and params for peak calling
     req_keys.add(['peak_callers', ['macs', 'seacr']])
+    req_keys.add(['peaks_scatter_chunks'])
     if( params.peak_callers.contains('macs') ) {
         req_keys.add(['macs_qval'])
         req_keys.add(['macs_flags'])
+        req_keys.add(['macs_input_format', ['BAMPE', 'BEDPE']])
         req_keys.add(['ref_eff_genome_size'])
     }
     if( params.peak_callers.contains('seacr') ) {
@@ -438,19 +541,27 @@ if( ['validate'].contains( params.mode ) ) {
                           "${test_conda}" } else { "" } 
                         }
         label           'small_mem'   
-        maxForks        1
-        errorStrategy   'terminate'
+        // Dependencies are checked concurrently, reporting all failures before exiting.
+        errorStrategy   'finish'
         cpus            1
-        beforeScript    { task_details(task) }
+        // Setup start time, recorded on the compute node before the environment 
+        //   (container, modules, or conda) is started.
+        beforeScript    { task_details(task) + "\ndate +%s%3N > .command.setup_start\n" }
         echo            true
+        // Reuse successful checks with unchanged resources and test call (If Enabled)
+        if( params.validate_cache_dir ) {
+            storeDir    { "${params.validate_cache_dir}/" + validate_cache_key(
+                              title, test_call, exp_code, test_module, test_conda, test_container) }
+        }
 
         input:
         tuple val(title), val(test_call), val(exp_code), val(test_module), val(test_conda), val(test_container) from Channel.fromList(use_tests)
         
         output:
-        val('success') into validate_outs
+        path(result_file) into validate_outs
 
         script:
+        result_file     = "${title.replaceAll(/[^A-Za-z0-9_.-]/, '_')}.validate.txt"
         resource_string = ""
         if( task.container) { 
             resource_string = "echo -e '  -  Container: ${task.container.toString()}'"
@@ -462,6 +573,7 @@ if( ['validate'].contains( params.mode ) ) {
         
         shell:
         '''
+        START_MS=$(date +%s%3N)
         echo -e "\\n!{task.tag}"
         !{resource_string}
         echo -e "\\nTesting System Call for dependency: !{title}"
@@ -473,9 +585,21 @@ if( ['validate'].contains( params.mode ) ) {
         !{test_call}
         TEST_EXIT_CODE=$?
         set -e
+        END_MS=$(date +%s%3N)
+
+        # Record time to start the environment and time for the test call, both measured 
+        #   on the compute node (So are not affected by queue time or clock differences).
+        SETUP_START_MS=$(cat .command.setup_start 2>/dev/null || true)
+        SETUP_SEC="-"
+        if [ -n "${SETUP_START_MS}" ]; then
+            SETUP_SEC=$(awk "BEGIN {printf \\"%.1f\\", (${START_MS} - ${SETUP_START_MS}) / 1000}")
+        fi
+        TEST_SEC=$(awk "BEGIN {printf \\"%.1f\\", (${END_MS} - ${START_MS}) / 1000}")
+        echo "Environment Start: ${SETUP_SEC}s, Test Call: ${TEST_SEC}s"
 
         if [ "${TEST_EXIT_CODE}" == "!{exp_code}" ]; then
             echo "!{title} Test Success."
+            echo -e "!{title}\\t${SETUP_SEC}\\t${TEST_SEC}\\t$(date '+%Y-%m-%d %H:%M:%S')" > !{result_file}
             PROCESS_EXIT_CODE=0
         else
             echo "!{title} Test Failure."
@@ -486,8 +610,34 @@ if( ['validate'].contains( params.mode ) ) {
         '''
     }
     validate_outs
-                .collect()
-                .view { it -> "\nDependencies Have been Validated, Results:\n    $it\n" } 
+                .map {result_file -> result_file.text.trim().split('\t') as List }
+                .toSortedList {a, b -> a[0] <=> b[0] }
+                .view {results -> 
+                    message =  "\nDependencies Have been Validated, Results:\n"
+                    message += "    " + "Dependency".padRight(24) + "Env. Start".padRight(18)
+                    message += "Test Call".padRight(12) + "Checked\n"
+                    results.each {title, setup_sec, test_sec, checked ->
+                        message += "    " + title.padRight(24)
+                        message += (setup_sec == '-' ? '-' : "${setup_sec}s").padRight(18)
+                        message += "${test_sec}s".padRight(12) + "${checked}\n"
+                    }
+                    message
+                } 
+}
+
+def validate_cache_key(title, test_call, exp_code, test_module, test_conda, test_container) {
+    // Key (md5) a dependency check on its test call and resources, including the size and 
+    //   modification time of local container image files or conda environments.
+    def key_items = [title, test_call, exp_code, test_module, test_conda, test_container]
+    [test_container, test_conda].each {resource ->
+        def resource_file = new File("${resource}")
+        if( resource && !"${resource}".contains('://') && resource_file.exists() ) {
+            key_items.add("${resource_file.length()}:${resource_file.lastModified()}")
+        }
+    }
+    def digest = java.security.MessageDigest.getInstance('MD5')
+    def cache_key = digest.digest(key_items.join('\n').getBytes()).encodeHex().toString()
+    "${title.replaceAll(/[^A-Za-z0-9_.-]/, '_')}.${cache_key}"
 }
 
 def get_refs_locations(params) {
@@ -561,6 +711,68 @@ if( params.mode == 'list_refs' ) {
     }
 }
 
+// -- Run Mode: profile
+//   Resource usage of each task is recorded in Nextflow trace files during 'run' mode
+//   (See trace settings in nextflow.config), these are summarized into a report.
+if( params.mode == 'profile' ) { 
+    trace_dir = "${params.out_dir}/pipeline_info"
+    if( params.containsKey('trace_file') && params.trace_file ) {
+        use_traces = return_as_list(params.trace_file).collect { file(it, checkIfExists: true) }
+    } else {
+        // Most recent trace file (by name timestamp).
+        use_traces = file("${trace_dir}/CnR-flow.trace.*.tsv").sort { it.getName() }
+        use_traces = use_traces ? [use_traces[-1]] : []
+    }
+    if( !use_traces ) {
+        message =  "No trace files found in: ${trace_dir}\n"
+        message += "Please provide a trace file (params.trace_file) from a previous pipeline run."
+        log.error message
+        exit 1
+    }
+    use_traces.each { log.info "Summarizing Trace: ${it}" }
+    println ''
+
+    process CnR_Profile_Report {
+        if( has_container(params, 'cnr_tools') ) {
+            container get_container(params, 'cnr_tools')
+        } else if( has_module(params, 'cnr_tools') ) {
+            module get_module(params, 'cnr_tools')
+        } else if( has_conda(params, 'cnr_tools') ) {
+            conda get_conda(params, 'cnr_tools')
+        }
+        tag          { "all_tasks" }
+        label        'small_mem'
+        beforeScript { task_details(task) }
+        cpus         1
+        echo         true
+
+        input:
+        path(trace_files) from Channel.fromList(use_traces).collect()
+        path(pipeline_script) from Channel.fromPath("${projectDir}/${workflow.manifest.mainScript}")
+
+        output:
+        path "${profile_base}.*" into profile_outs
+
+        publishDir "${trace_dir}", mode: params.publish_mode, 
+                   pattern: "${profile_base}.*"
+
+        script:
+        profile_base = "CnR-flow.profile.${new Date().format('yyyy-MM-dd_HH-mm-ss')}"
+        shell:
+        '''
+        TRACE_FLAGS=""
+        for TRACE_FILE in !{trace_files}; do
+            TRACE_FLAGS="${TRACE_FLAGS} --trace ${TRACE_FILE}"
+        done
+        !{params.cnr_tools_call} profile ${TRACE_FLAGS} \\
+                                 --pipeline !{pipeline_script} \\
+                                 --out !{profile_base}.tsv \\
+                                 --report !{profile_base}.txt
+        echo "Profile Report Written to: !{trace_dir}/!{profile_base}.txt"
+        '''
+    }
+}
+
 // -- Run Mode: prep_fasta
 if( params.mode == 'prep_fasta' ) { 
     if( !file("${params.refs_dir}").exists() ) {
@@ -582,6 +794,17 @@ if( params.mode == 'prep_fasta' ) {
         }
         use_prep_sources.add([db_name, "${source_fasta}"])
     }
+    // If combined spike-in alignment is enabled, also prepare a combined reference.
+    prep_comb_ref = (
+        params.containsKey('norm_ref_fasta') 
+        && params.containsKey('norm_aln_mode') 
+        && params.norm_aln_mode == 'combined'
+    )
+    if( prep_comb_ref ) {
+        prep_ref_name      = use_prep_sources[0][0]
+        prep_norm_ref_name = use_prep_sources[1][0]
+        prep_comb_ref_name = get_comb_ref_name(prep_ref_name, prep_norm_ref_name)
+    }
     Channel.fromList(use_prep_sources)
           .map {db_name, full_fn -> 
               use_full_fn = full_fn
@@ -593,18 +816,30 @@ if( params.mode == 'prep_fasta' ) {
           }
           .set {source_fasta}
 
+    // The fasta is decompressed (in parallel with pigz, if available) and written once, 
+    //   with index, chrom sizes, nucleotide counts, effective genome size, checksums, 
+    //   and CRAM reference cache computed from the same stream with cnr_tools.py prep_ref.
     process CnR_Prep_GetFasta {
+        if( has_container(params, 'cnr_tools') ) {
+            container get_container(params, 'cnr_tools')
+        } else if( has_module(params, 'cnr_tools') ) {
+            module get_module(params, 'cnr_tools')
+        } else if( has_conda(params, 'cnr_tools') ) {
+            conda get_conda(params, 'cnr_tools')
+        }
         tag          { name }
         label        'big_mem'
         beforeScript { task_details(task) }
-        stageInMode  'copy'    
         echo         true
 
         input:
-        tuple val(name), val(fasta_source), path(fasta) from source_fasta
+        tuple val(name), val(fasta_source), path(fasta, stageAs: 'source/*') from source_fasta
     
         output:
         tuple val(name), path(use_fasta) into get_fasta_outs
+        tuple val(name), path(fasta_md5) into get_fasta_md5_outs
+        tuple path(faidx_name), path(chrom_sizes_name), path(fa_count_name),
+              path(eff_size_name), path(seq_md5_name), path(ref_cache_name) into prep_sizes_outs
         tuple val(name), val(get_fasta_details) into get_fasta_detail_outs
         path '.command.log' into get_fasta_log_outs
     
@@ -612,6 +847,10 @@ if( params.mode == 'prep_fasta' ) {
                    pattern: ".command.log", saveAs: { out_log_name }
         publishDir "${params.refs_dir}", mode: params.publish_mode, 
                    overwrite: false, pattern: "${use_fasta}*"
+        publishDir "${params.refs_dir}", mode: params.publish_mode, 
+                   pattern: "${name}.{chrom.sizes,faCount,effGenome,seq_md5.tsv}"
+        publishDir "${params.refs_dir}", mode: params.publish_mode, 
+                   pattern: "${ref_cache_name}"
     
         script:
         run_id         = "${task.tag}.${task.process}"
@@ -623,23 +862,59 @@ if( params.mode == 'prep_fasta' ) {
         }
         if( "${fasta}".endsWith('.gz') ) {
             use_fasta = fasta.getBaseName()  
-            gunzip_command = "gunzip -c ${fasta} > ${use_fasta}"
+            read_command = "\${GUNZIP} ${fasta} | "
+            read_input = "-"
         } else {
-            use_fasta = fasta
-            gunzip_command = "echo 'File is not gzipped.'"
+            use_fasta = fasta.getName()
+            read_command = ""
+            read_input = "${fasta}"
         }
+        decomp_threads     = (task.cpus ? task.cpus : 1)
+        fasta_md5          = "${name}.md5.txt"
+        faidx_name         = "${use_fasta}.fai"
+        chrom_sizes_name   = "${name}.chrom.sizes"
+        fa_count_name      = "${name}.faCount"
+        eff_size_name      = "${name}.effGenome"
+        seq_md5_name       = "${name}.seq_md5.tsv"
+        ref_cache_name     = "${name}.ref_cache"
         get_fasta_details  = "name,${name}\n"
         get_fasta_details += "title,${name}\n"
         get_fasta_details += "fasta_source,${fasta_source}\n"
         get_fasta_details += "fastq_acq,${acq_datetime}\n"
-        get_fasta_details += "fasta_path,./${use_fasta}"
+        get_fasta_details += "fasta_path,./${use_fasta}\n"
+        get_fasta_details += "faidx_path,./${faidx_name}\n"
+        get_fasta_details += "chrom_sizes_path,./${chrom_sizes_name}\n"
+        get_fasta_details += "fa_count_path,./${fa_count_name}\n"
+        get_fasta_details += "eff_genome_path,./${eff_size_name}\n"
+        get_fasta_details += "seq_md5_path,./${seq_md5_name}\n"
+        get_fasta_details += "cache_path,./${ref_cache_name}"
 
         shell:
         '''
+        set -o pipefail
         echo "Acquiring Fasta from Source:"
         echo "    !{fasta}"
         echo ""
-        !{gunzip_command}
+        if command -v pigz > /dev/null; then
+            GUNZIP="pigz -dc -p !{decomp_threads}"
+        else
+            GUNZIP="gzip -dc"
+        fi
+
+        echo "Writing Fasta with index, sizes, and nucleotide counts (single pass)..."
+        set -v -H -o history
+        !{read_command}!{params.cnr_tools_call} prep_ref \\
+                           --input !{read_input} \\
+                           --out-fasta !{use_fasta} \\
+                           --faidx !{faidx_name} \\
+                           --chrom-sizes !{chrom_sizes_name} \\
+                           --facount !{fa_count_name} \\
+                           --eff-genome !{eff_size_name} \\
+                           --md5 !{fasta_md5} \\
+                           --seq-md5 !{seq_md5_name} \\
+                           --ref-cache !{ref_cache_name}
+        set +v +H +o history
+        echo ""
 
         echo "Publishing Fasta to References Directory:"
         echo "   !{full_refs_dir}"    
@@ -647,7 +922,107 @@ if( params.mode == 'prep_fasta' ) {
         '''
     }
 
-    get_fasta_outs.into{prep_bt2db_inputs; prep_sizes_inputs}
+    if( prep_comb_ref ) {
+        get_fasta_outs.into{prep_bt2db_sep_inputs; prep_comb_inputs}
+
+        prep_comb_inputs
+                  .toList()
+                  .map {fastas ->
+                      def ref_fasta   = fastas.find {name, fasta -> name == prep_ref_name }[1]
+                      def spike_fasta = fastas.find {name, fasta -> name == prep_norm_ref_name }[1]
+                      [prep_comb_ref_name, ref_fasta, spike_fasta]
+                  }
+                  .set { comb_fasta_inputs }
+
+        process CnR_Prep_CombFasta {
+            tag          { name }
+            label        'norm_mem'
+            beforeScript { task_details(task) }
+            cpus         1
+            echo         true
+
+            input:
+            tuple val(name), path(ref_fasta), path(spike_fasta) from comb_fasta_inputs
+
+            output:
+            tuple val(name), path(comb_fasta) into comb_fasta_outs
+            tuple val(name), path(comb_fasta_md5) into comb_fasta_md5_outs
+            tuple val(name), val(comb_fasta_details) into comb_fasta_detail_outs
+            path '.command.log' into comb_fasta_log_outs
+
+            publishDir "${params.refs_dir}/logs", mode: params.publish_mode, 
+                       pattern: ".command.log", saveAs: { out_log_name }
+            publishDir "${params.refs_dir}", mode: params.publish_mode, 
+                       overwrite: false, pattern: "${comb_fasta}"
+
+            script:
+            run_id       = "${task.tag}.${task.process}"
+            out_log_name = "${run_id}.nf.log.txt"
+            comb_fasta   = "${name}.fa"
+            comb_fasta_md5 = "${name}.md5.txt"
+            spike_prefix = "${params.comb_spike_prefix}"
+            acq_datetime = new Date().format("yyyy-MM-dd_HH:mm:ss")
+            comb_fasta_details  = "name,${name}\n"
+            comb_fasta_details += "title,${name}\n"
+            comb_fasta_details += "ref_name,${prep_ref_name}\n"
+            comb_fasta_details += "norm_ref_name,${prep_norm_ref_name}\n"
+            comb_fasta_details += "spike_prefix,${spike_prefix}\n"
+            comb_fasta_details += "fastq_acq,${acq_datetime}\n"
+            comb_fasta_details += "fasta_path,./${comb_fasta}"
+
+            shell:
+            '''
+            echo "Combining Reference and Spike-in Fasta Files:"
+            echo "    Reference: !{ref_fasta}"
+            echo "    Spike-in:  !{spike_fasta}  (Contig Prefix: '!{spike_prefix}')"
+            echo ""
+            if grep -q '^>!{spike_prefix}' !{ref_fasta} ; then
+                echo "Error: Reference contig names begin with the spike-in prefix: '!{spike_prefix}'"
+                echo "    Please select a different prefix with the parameter: comb_spike_prefix"
+                exit 1
+            fi
+
+            set -v -H -o history
+            cat !{ref_fasta} > !{comb_fasta}
+            sed 's/^>/>!{spike_prefix}/' !{spike_fasta} >> !{comb_fasta}
+            set +v +H +o history
+            md5sum !{comb_fasta} | cut -d ' ' -f 1 > !{comb_fasta_md5}
+            '''
+        }
+
+        prep_bt2db_sep_inputs
+                  .mix(comb_fasta_outs)
+                  .set { prep_bt2db_fastas }
+        get_fasta_md5_outs
+                  .mix(comb_fasta_md5_outs)
+                  .set { prep_fasta_md5s }
+    } else {
+        get_fasta_outs.set { prep_bt2db_fastas }
+        get_fasta_md5_outs.set { prep_fasta_md5s }
+        Channel.empty().set { comb_fasta_detail_outs }
+    }
+
+    // Prepared Bowtie2 databases are kept in a content-addressed store (If Enabled),
+    //   keyed by the checksum of the fasta file.
+    use_ref_store = false
+    if( params.containsKey('ref_store_dir') && params.ref_store_dir ) {
+        ref_store_dir = "${params.ref_store_dir}"
+        use_ref_store = true
+    } else if( params.containsKey('shared_refs_dir') && params.shared_refs_dir ) {
+        ref_store_dir = "${params.shared_refs_dir}/ref_store"
+        use_ref_store = true
+    }
+    if( use_ref_store ) {
+        log.info "Using Reference Store: ${ref_store_dir}"
+        println ""
+        if( !file(ref_store_dir).exists() ) {
+            file(ref_store_dir).mkdirs()
+        }
+    }
+    prep_bt2db_fastas
+                  .join(prep_fasta_md5s)
+                  .map {name, fasta, md5_file -> [name, fasta, md5_file.text.trim()] }
+                  .set { prep_bt2db_inputs }
 
     process CnR_Prep_Bt2db {
         if( has_container(params, 'bowtie2') ) {
@@ -663,7 +1038,7 @@ if( params.mode == 'prep_fasta' ) {
         echo         true
     
         input:
-        tuple val(name), path(fasta) from prep_bt2db_inputs
+        tuple val(name), path(fasta), val(fasta_md5) from prep_bt2db_inputs
     
         output:
         path "${bt2db_dir_name}/*" into prep_bt2db_outs
@@ -672,8 +1047,10 @@ if( params.mode == 'prep_fasta' ) {
     
         publishDir "${params.refs_dir}/logs", mode: params.publish_mode, 
                    pattern: ".command.log", saveAs: { out_log_name }
+        // Databases in the reference store are referenced (rather than published).
         publishDir "${params.refs_dir}", mode: params.publish_mode, 
-                   pattern: "${bt2db_dir_name}/*"
+                   pattern: "${bt2db_dir_name}/*",
+                   enabled: !use_ref_store
     
         script:
         run_id         = "${task.tag}.${task.process}"
@@ -681,87 +1058,112 @@ if( params.mode == 'prep_fasta' ) {
         bt2db_dir_name = "${name}_${params.prep_bt2db_suf}"
         refs_dir       = "${params.refs_dir}"
         full_out_base  = "${bt2db_dir_name}/${name}"
-        bt2db_details  = "bt2db_path,./${full_out_base}"
-        shell:
-        '''
+        bt2db_details  = "fasta_md5,${fasta_md5}\n"
+        if( use_ref_store ) {
+            store_dir      = "${ref_store_dir}/${fasta_md5}"
+            store_db_dir   = "${store_dir}/${params.prep_bt2db_suf}"
+            lock_max_secs  = ((params.ref_store_lock_max_hours as double) * 3600) as long
+            lock_wait_secs = ((params.ref_store_lock_wait_hours as double) * 3600) as long
+            bt2db_details += "bt2db_path,${store_db_dir}/ref"
+            command = '''
+            echo "Preparing Bowtie2 Database for fasta file:"
+            echo "    !{fasta}  (md5: !{fasta_md5})"
+            echo "Reference Store: !{store_dir}"
+            echo ""
+            mkdir -pv !{store_dir}
+
+            # Databases are built only once per fasta checksum. A lock directory 
+            #   (mkdir is atomic, including on shared filesystems) ensures
+            #   that concurrent tasks wait for a single build.
+            #   The lock owner (host, PID, start time) is recorded, and locks of exited
+            #   owners (on the same host) or older than the maximum age are removed.
+            if [ ! -d "!{store_db_dir}" ]; then
+                LOCK_DIR="!{store_dir}/.lock"
+                LOCK_WAIT=0
+                until mkdir "${LOCK_DIR}" 2> /dev/null; do
+                    LOCK_OWNER=$(cat ${LOCK_DIR}/owner.txt 2> /dev/null)
+                    read LOCK_HOST LOCK_PID LOCK_START <<< "${LOCK_OWNER}"
+                    LOCK_AGE=$(( $(date +%s) - ${LOCK_START:-$(date +%s)} ))
+                    LOCK_STALE=""
+                    if [ "${LOCK_HOST}" == "$(hostname)" ] && ! kill -0 "${LOCK_PID}" 2> /dev/null; then
+                        LOCK_STALE="Owner process has exited"
+                    elif [ ${LOCK_AGE} -gt !{lock_max_secs} ]; then
+                        LOCK_STALE="Lock is older than !{params.ref_store_lock_max_hours} hours"
+                    fi
+                    if [ -n "${LOCK_STALE}" ]; then
+                        # Locks are removed by (atomic) rename, only if unchanged.
+                        echo "Removing stale lock held by: ${LOCK_OWNER} (${LOCK_STALE})"
+                        if mv -T "${LOCK_DIR}" "${LOCK_DIR}.stale.$$" 2> /dev/null; then
+                            if [ "$(cat ${LOCK_DIR}.stale.$$/owner.txt 2> /dev/null)" == "${LOCK_OWNER}" ]; then
+                                rm -rf "${LOCK_DIR}.stale.$$"
+                            else
+                                mv -T "${LOCK_DIR}.stale.$$" "${LOCK_DIR}" 2> /dev/null
+                            fi
+                        fi
+                        continue
+                    fi
+                    if [ ${LOCK_WAIT} -ge !{lock_wait_secs} ]; then
+                        echo "Error: Timed out after !{params.ref_store_lock_wait_hours} hours waiting for a"
+                        echo "    Bowtie2 database build in the reference store, with lock held by:"
+                        echo "    ${LOCK_OWNER} (Host PID Start)"
+                        echo "If no build is running, remove the lock directory and retry:"
+                        echo "    ${LOCK_DIR}"
+                        exit 1
+                    fi
+                    echo "Waiting for lock held by: ${LOCK_OWNER} (Host PID Start)"
+                    sleep 60
+                    LOCK_WAIT=$(( LOCK_WAIT + 60 ))
+                done
+                echo "$(hostname) $$ $(date +%s)" > ${LOCK_DIR}/owner.txt
+                trap 'rm -rf "${LOCK_DIR}"' EXIT
+            fi
+            if [ ! -d "!{store_db_dir}" ]; then
+                BUILD_DIR="!{store_db_dir}.building"
+                rm -rf ${BUILD_DIR}
+                mkdir -v ${BUILD_DIR}
+                echo "Out DB:     !{store_db_dir}/ref"
+                set -v -H -o history
+                !{params.bowtie2_build_call} --quiet --threads !{task.cpus} !{fasta} ${BUILD_DIR}/ref
+                set +v +H +o history
+                echo -e "name\\t!{name}\\nfasta_md5\\t!{fasta_md5}" > ${BUILD_DIR}/source.txt
+                mv -v ${BUILD_DIR} !{store_db_dir}
+            else
+                echo "Existing Bowtie2 Database found in Reference Store, skipping build."
+                echo "    Built from: $(cut -f 2 !{store_db_dir}/source.txt | paste -s -d ' ')"
+            fi
+
+            mkdir -v !{bt2db_dir_name}
+            for DB_FILE in !{store_db_dir}/ref.*; do
+                ln -sv ${DB_FILE} !{bt2db_dir_name}/
+            done
+            echo "Using Bowtie2 Database: !{store_db_dir}/ref"
+            '''
+        } else {
+            bt2db_details += "bt2db_path,./${full_out_base}"
+            command = '''
     
-        echo "Preparing Bowtie2 Database for fasta file:"
-        echo "    !{fasta}"
-        echo ""
-        echo "Out DB Dir: !{bt2db_dir_name}"
-        echo "Out DB:     !{full_out_base}"
+            echo "Preparing Bowtie2 Database for fasta file:"
+            echo "    !{fasta}"
+            echo ""
+            echo "Out DB Dir: !{bt2db_dir_name}"
+            echo "Out DB:     !{full_out_base}"
 
-        mkdir -v !{bt2db_dir_name}
-        set -v -H -o history
-        !{params.bowtie2_build_call} --quiet --threads !{task.cpus} !{fasta} !{full_out_base}
-        set +v +H +o history
+            mkdir -v !{bt2db_dir_name}
+            set -v -H -o history
+            !{params.bowtie2_build_call} --quiet --threads !{task.cpus} !{fasta} !{full_out_base}
+            set +v +H +o history
 
-        echo "Publishing Bowtie2 Database to References Directory:"
-        echo "   !{params.refs_dir}"    
-    
-        '''
-    }
+            echo "Publishing Bowtie2 Database to References Directory:"
+            echo "   !{params.refs_dir}"    
     
-    process CnR_Prep_Sizes {
-        if( has_container(params, 'samtools_facount') ) {
-            container get_container(params, 'samtools_facount') 
-        } else if( has_module(params, ['samtools', 'facount']) ) {
-            module get_module(params, ['samtools', 'facount'])
-        } else if( has_conda(params, ['samtools', 'facount']) ) {
-            conda get_conda(params, ['samtools', 'facount'])
+            '''
         }
-        tag          { name }
-        beforeScript { task_details(task) }
-        label        'norm_mem'
-        cpus         1
-        echo         true
-    
-        input:
-        tuple val(name), path(fasta) from prep_sizes_inputs
-    
-        output:
-        tuple path(faidx_name), path(chrom_sizes_name), path(fa_count_name),
-              path(eff_size_name) into prep_sizes_outs
-        tuple val(name), val(prep_sizes_details) into prep_sizes_detail_outs
-        path '.command.log' into prep_sizes_log_outs
-    
-        publishDir "${params.refs_dir}/logs", mode: params.publish_mode, 
-                   pattern: ".command.log", saveAs: { out_log_name } 
-        publishDir "${params.refs_dir}", mode: params.publish_mode, 
-                   pattern: "${name}*" 
-    
-        script:
-        run_id = "${task.tag}.${task.process}"
-        out_log_name = "${run_id}.nf.log.txt"
-        faidx_name = "${fasta}.fai"
-        chrom_sizes_name = "${name}.chrom.sizes"
-        fa_count_name = "${name}.faCount"
-        eff_size_name = "${name}.effGenome"
-        prep_sizes_details  = "faidx_path,./${faidx_name}\n"
-        prep_sizes_details += "chrom_sizes_path,./${chrom_sizes_name}\n"
-        prep_sizes_details += "fa_count_path,./${fa_count_name}\n"
-        prep_sizes_details += "eff_genome_path,./${eff_size_name}"
         shell:
-        '''
-        echo -e "\\nPreparing genome size information for Input Fasta: !{fasta}"
-        echo -e "Indexing Fasta..."
-        !{params.samtools_call} faidx !{fasta}
-        echo -e "Preparing chrom.sizes File..."
-        cut -f1,2 !{faidx_name} > !{chrom_sizes_name}
-        echo -e "Counting Reference Nucleotides..."
-        !{params.facount_call} !{fasta} > !{fa_count_name}
-        echo -e "Calculating Reference Effective Genome Size (Total - N's method )..."
-        TOTAL=$(tail -n 1 !{fa_count_name} | cut -f2) 
-        NS=$(tail -n 1 !{fa_count_name} | cut -f7)
-        EFFECTIVE=$( expr ${TOTAL} - ${NS})
-        echo "${EFFECTIVE}" > !{eff_size_name}
-        echo "Effective Genome Size: ${TOTAL} - ${NS} = ${EFFECTIVE}"
-        echo "Done."
-        '''
+        command
     }
-
+    
     get_fasta_detail_outs
-                        .concat(prep_sizes_detail_outs)
+                        .concat(comb_fasta_detail_outs)
                         .concat(prep_bt2db_detail_outs)
                         .collectFile(
                             sort: false, newLine: true, 
@@ -835,8 +1237,16 @@ if( params.mode == 'run' ) {
               .set { ctrl_fastqs }
     }
 
-    // Mix (Labeled) Treatment and Control Fastqs
+    // Control samples shared by multiple groups are processed once, labeled with the 
+    //   list of all groups using them (and paired with each group's treatment samples 
+    //   for peak calling).
     ctrl_fastqs
+          .groupTuple()
+          .map { name, conds, groups, fastqs -> [name, conds[0], groups.unique(), fastqs[0]] }
+          .set { shared_ctrl_fastqs }
+
+    // Mix (Labeled) Treatment and Control Fastqs
+    shared_ctrl_fastqs
           .concat( treat_fastqs )
           // Remove duplicate ctrl also matched as treat:
           .unique { name, cond, group, fastqs -> name }
@@ -868,15 +1278,16 @@ if( params.mode == 'run' ) {
         // Step 0, Part A, Merge Lanes (If Enabled)
         process CnR_S0_B_MergeFastqs {
             tag          { name }
-            label        'big_mem'
+            label        'small_mem'
             beforeScript { task_details(task) }
-            cpus         1
+            cpus         2   // R1 and R2 files are processed in parallel.
            
             input:
             tuple val(name), val(cond), val(group), path(fastq) from merge_fastqs
         
             output:
-            tuple val(name), val(cond), val(group), path("${merge_fastqs_dir}/${name}_R{1,2}_001.fastq.gz") into use_fastqs
+            tuple val(name), val(cond), val(group), path("${merge_fastqs_dir}/${name}_R{1,2}_*") into use_fastqs
+            tuple val(name), val('S0_B_MergeFastqs'), path(stats_file) into mergeFastqs_stats_outs
             path '.command.log' into mergeFastqs_log_outs
         
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
@@ -884,84 +1295,123 @@ if( params.mode == 'run' ) {
             // Publish merged fastq files only when publish_files == all
             publishDir "${params.out_dir}", mode: params.publish_mode,
                        pattern: "${merge_fastqs_dir}/*", 
-                       enabled: (params.publish_files == "all") 
+                       enabled: (params.publish_files == "all" && params.merge_lanes_mode == "copy") 
         
             script:
             run_id = "${task.tag}.${task.process}"
             out_log_name = "${run_id}.nf.log.txt"
             merge_fastqs_dir = "${params.merge_fastqs_dir}"
-            R1_files = fastq.findAll {fn ->
-                "${fn}".contains("_R1_") || "${fn}".contains("_R1.")
-                || "${fn}".contains("_1.f") || "${fn}".contains("_1_")
-            }
-            R2_files = fastq.findAll {fn -> 
-                "${fn}".contains("_R2_") || "${fn}".contains("_R2.")
-                || "${fn}".contains("_2.f") || "${fn}".contains("_2_")
-            }
+            (R1_files, R2_files) = split_fastq_reads(fastq)
             R1_out_file = "${params.merge_fastqs_dir}/${name}_R1_001.fastq.gz"
             R2_out_file = "${params.merge_fastqs_dir}/${name}_R2_001.fastq.gz" 
+            stats_file  = "${name}.stats.tsv"
 
-            if( R1_files.size() < 1 || R2_files.size() < 1 ) {
+            if( R1_files.size() < 1 || R2_files.size() < 1 || R1_files.size() != R2_files.size() ) {
                 log.error "Error: Merge cannot classify .fastq[.gz] 1/2 or R1/R2 file names."
                 log.error "Detected R1 Files: ${R1_files}"
                 log.error "Detected R2 Files: ${R2_files}"
                 log.error "Supported schemes are '_R1_', '_R1.', '_1_', '_1.'"
                 exit 1
             } 
-            check_command = ""
-            if( "${R1_files[0]}".endsWith('.gz') ) {
-                check_command = "gzip -t ${R1_files.join(' ')} ${R2_files.join(' ')}"
-            }
             if( R1_files.size() == 1 && R2_files.size() == 1 ) {
                 command = '''
+                set -o pipefail
                 echo "No Merge Necessary. Renaming Files..."
                 mkdir !{merge_fastqs_dir}
 
-                # Check File Integrity if gzipped
-                !{check_command}
-
                 set -v -H -o history
                 mv -v "!{R1_files[0]}" "!{R1_out_file}"
                 mv -v "!{R2_files[0]}" "!{R2_out_file}"
                 set +v +H +o history
-                R1_OUT_LEN=$(zcat -f < !{R1_out_file} | wc -l | xargs)
-                R2_OUT_LEN=$(zcat -f < !{R2_out_file} | wc -l | xargs)
-                echo "R1 Lines: ${R1_OUT_LEN}"
-                echo "R2 Lines: ${R2_OUT_LEN}"
-                if [ "${R1_OUT_LEN}" == "0" -o "${R2_OUT_LEN}" == "0" ] ; then
-                    echo "Input file not found, or input file of zero length detected."
-                    exit 1
-                fi
+
+                # Count Lines (and Check File Integrity if gzipped) in a single pass per file.
+                zcat -f < "!{R1_out_file}" | wc -l > R1.line_count &
+                R1_PID=$!
+                zcat -f < "!{R2_out_file}" | wc -l > R2.line_count &
+                R2_PID=$!
+                wait ${R1_PID}
+                wait ${R2_PID}
+                R1_OUT_LEN=$(cat R1.line_count | xargs)
+                R2_OUT_LEN=$(cat R2.line_count | xargs)
                 '''
-            } else {
+            } else if( params.merge_lanes_mode == 'copy' ) {
                 command = '''
+                set -o pipefail
                 mkdir !{merge_fastqs_dir}
 
-                # Check File Integrity if gzipped
-                !{check_command}
-
+                # Files are combined, counted, and checked for integrity (if gzipped)
+                #   in a single pass, with R1 and R2 files processed in parallel.
                 echo -e "\\nCombining Files: !{R1_files.join(' ')}"
                 echo "    Into: !{R1_out_file}"
-                set -v -H -o history
-                cat '!{R1_files.join("' '")}' > '!{R1_out_file}'
-                set +v +H +o history
-    
                 echo -e "\\nCombining Files: !{R2_files.join(' ')}"
                 echo "    Into: !{R2_out_file}"
                 set -v -H -o history
-                cat '!{R2_files.join("' '")}' > '!{R2_out_file}'
+                cat '!{R1_files.join("' '")}' | tee '!{R1_out_file}' | zcat -f | wc -l > R1.line_count &
+                R1_PID=$!
+                cat '!{R2_files.join("' '")}' | tee '!{R2_out_file}' | zcat -f | wc -l > R2.line_count &
+                R2_PID=$!
+                wait ${R1_PID}
+                wait ${R2_PID}
+                set +v +H +o history
+                R1_OUT_LEN=$(cat R1.line_count | xargs)
+                R2_OUT_LEN=$(cat R2.line_count | xargs)
+                '''
+            } else if( params.merge_lanes_mode == 'stream' ) {
+                command = '''
+                set -o pipefail
+                mkdir !{merge_fastqs_dir}
+
+                # Lane files are not copied. Ordered links to each lane file are passed on,
+                #   and are read by later steps as a single (virtual) concatenated file.
+                echo -e "\\nLinking Lane Files: !{R1_files.join(' ')}"
+                echo -e "\\nLinking Lane Files: !{R2_files.join(' ')}"
+                set -v -H -o history
+                for READ in R1 R2; do
+                    if [ "${READ}" == "R1" ]; then
+                        LANE_FILES=('!{R1_files.join("' '")}')
+                    else
+                        LANE_FILES=('!{R2_files.join("' '")}')
+                    fi
+                    LANE_NUM=0
+                    for LANE_FILE in "${LANE_FILES[@]}"; do
+                        LANE_NUM=$(( LANE_NUM + 1 ))
+                        LINK_NAME="!{name}_${READ}_part$(printf '%03d' ${LANE_NUM}).fastq"
+                        if [[ "${LANE_FILE}" == *.gz ]]; then
+                            LINK_NAME+=".gz"
+                        fi
+                        ln -sv "$(readlink -f "${LANE_FILE}")" "!{merge_fastqs_dir}/${LINK_NAME}"
+                    done
+                done
                 set +v +H +o history
 
-                R1_OUT_LEN=$(zcat -f < !{R1_out_file} | wc -l | xargs)
-                R2_OUT_LEN=$(zcat -f < !{R2_out_file} | wc -l | xargs)
+                # Each file is counted and checked for integrity (if gzipped) in a single pass,
+                #   with R1 and R2 files processed in parallel (One file at a time per read).
+                set -v -H -o history
+                for LANE_FILE in '!{R1_files.join("' '")}'; do
+                    zcat -f < "${LANE_FILE}" | wc -l || exit 1
+                done | awk '{sum += $1} END {print sum + 0}' > R1.line_count &
+                R1_PID=$!
+                for LANE_FILE in '!{R2_files.join("' '")}'; do
+                    zcat -f < "${LANE_FILE}" | wc -l || exit 1
+                done | awk '{sum += $1} END {print sum + 0}' > R2.line_count &
+                R2_PID=$!
+                wait ${R1_PID}
+                wait ${R2_PID}
+                set +v +H +o history
+                R1_OUT_LEN=$(cat R1.line_count | xargs)
+                R2_OUT_LEN=$(cat R2.line_count | xargs)
+                '''
+            }
+            command += '''
                 echo "R1 Lines: ${R1_OUT_LEN}"
                 echo "R2 Lines: ${R2_OUT_LEN}"
                 if [ "${R1_OUT_LEN}" == "0" -o "${R2_OUT_LEN}" == "0" ] ; then
                     echo "Input file not found, or input file of zero length detected."
                     exit 1
                 fi
+                echo -e "fastq_r1_reads\\t$(( R1_OUT_LEN / 4 ))" >  !{stats_file}
+                echo -e "fastq_r2_reads\\t$(( R2_OUT_LEN / 4 ))" >> !{stats_file}
                 '''
-            }
             shell:
             command
         }
@@ -974,6 +1424,7 @@ if( params.mode == 'run' ) {
                          [name, cond, group, fastqs]
                        }
                   .set { use_fastqs }
+        Channel.empty().set { mergeFastqs_stats_outs }
     }
 
     // Prepare Step 0/1 Input Channels
@@ -992,13 +1443,15 @@ if( params.mode == 'run' ) {
             tag          { name }
             label        'norm_mem'
             beforeScript { task_details(task) }
-            cpus         1   //Multiple CPUS for FastQC are for multiple files.
+            // Multiple CPUS for FastQC are for multiple files.
+            cpus         { params.fastqc_mode == 'files' ? Math.min(fastq.size(), params.max_cpus) : 1 }
 
             input:
             tuple val(name), val(cond), val(group), path(fastq) from fastqcPre_inputs
         
             output:
             path "${fastqc_out_dir}/*.{html,zip}" into fastqcPre_all_outs
+            tuple val(name), val('S0_C_FastQCPre'), path(stats_file) into fastqcPre_stats_outs
             path '.command.log' into fastqcPre_log_outs
         
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
@@ -1010,21 +1463,32 @@ if( params.mode == 'run' ) {
             run_id         = "${task.tag}.${task.process}"
             out_log_name   = "${run_id}.nf.log.txt"
             fastqc_out_dir = params.fastqc_pre_dir
-            fastqc_flags   = params.fastqc_flags
+            stats_file     = "${name}.stats.tsv"
+            command        = get_fastqc_command(params, task, name, fastq, fastqc_out_dir, stats_file)
             shell:
-            '''
-            set -v -H -o history
-            mkdir -v !{fastqc_out_dir}
-            cat !{fastq} > !{name}_all.fastq.gz
-            !{params.fastqc_call} !{fastqc_flags} -o !{fastqc_out_dir} !{name}_all.fastq.gz
-            rm !{name}_all.fastq.gz  # Remove Intermediate
-            set +v +H +o history
-            '''
+            command
         }
+    } else {
+        Channel.empty().set { fastqcPre_stats_outs }
+    }
+
+    // In fused trim + align mode, trimming is instead performed during Step 2, Part A,
+    //   with trimmed reads streamed directly into alignment.
+    use_fused_trim_aln = (
+        params.do_trim && params.fuse_trim_aln && params.publish_files != "all"
+    )
+    // If using containers, a combined (trimmomatic + bowtie2 + samtools) container is required.
+    if( use_fused_trim_aln && params.containsKey('bowtie2_samtools_container')
+        && !has_container(params, 'trimmomatic_bowtie2_samtools') ) {
+        message =  "Fused trimming and alignment (params.fuse_trim_aln) requires a combined \n"
+        message += "    container (params.trimmomatic_bowtie2_samtools_container) when using containers.\n"
+        message += "    Trimming and alignment will be performed separately."
+        log.warn message
+        use_fused_trim_aln = false
     }
 
     // Step 1, Part A, Trim Reads using Trimmomatic (if_enabled)
-    if( params.do_trim ) {
+    if( params.do_trim && !use_fused_trim_aln ) {
         process CnR_S1_A_Trim { 
             if( has_container(params, 'trimmomatic') ) {
                 container get_container(params, 'trimmomatic')
@@ -1036,6 +1500,22 @@ if( params.mode == 'run' ) {
             tag          { name }
             label        'small_mem'
             beforeScript { task_details(task) }
+            // Scale resources with input size (If Enabled)
+            if( params.scale_resources ) {
+                cpus          { scaled_resource(params, task, 'cpus', fastq) }
+                memory        { scaled_resource(params, task, 'memory', fastq) }
+                time          { scaled_resource(params, task, 'time', fastq) }
+                errorStrategy { resource_retry(params, task) }
+                maxRetries    params.resource_max_retries
+            }
+            // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+            if( params.stage_store ) {
+                storeDir { stage_store_path(params, 'S1_A_Trim', name, [fastq],
+                    ['trimmomatic_adapterpath', 'trimmomatic_adapter_mode',
+                     'trimmomatic_adapter_params', 'trimmomatic_settings',
+                     'trimmomatic_flags'],
+                    ['java', 'trimmomatic']) }
+            }
         
             input:
             tuple val(name), val(cond), val(group), path(fastq) from trim_inputs
@@ -1043,6 +1523,7 @@ if( params.mode == 'run' ) {
             output:
             path "${params.trim_dir}/*" into trim_all_outs
             tuple val(name), val(cond), val(group), path("${params.trim_dir}/*.paired.*") into trim_final
+            tuple val(name), val(stats_step), path(stats_file) into trim_stats_outs
             path '.command.log' into trim_log_outs
         
             // Publish Log
@@ -1061,17 +1542,22 @@ if( params.mode == 'run' ) {
             out_log_name         = "${run_id}.nf.log.txt"
             trimmomatic_flags    = params.trimmomatic_flags 
             trimmomatic_adapter  = params.trimmomatic_adapterpath
-            trimmomatic_settings = params.trimmomatic_settings
-            if( params.trimmomatic_adapter_mode ) {
-                adapter_command = "${params.trimmomatic_adapter_mode}${trimmomatic_adapter}"
-                adapter_command += "${params.trimmomatic_adapter_params}"
-                trimmomatic_settings = "${adapter_command} ${trimmomatic_settings}"
-            }
+            trimmomatic_settings = get_trimmomatic_settings(params)
             trim_dir             = "${params.trim_dir}"       
             out_reads_1_paired   = "${trim_dir}/${name}_1.paired.fastq.gz"
             out_reads_1_unpaired = "${trim_dir}/${name}_1.unpaired.fastq.gz" 
             out_reads_2_paired   = "${trim_dir}/${name}_2.paired.fastq.gz"
             out_reads_2_unpaired = "${trim_dir}/${name}_2.unpaired.fastq.gz" 
+            trim_summary         = "${trim_dir}/${name}.trim_summary.txt"
+            stats_file           = "${name}.stats.tsv"
+            stats_step           = 'S1_A_Trim'
+            // Multiple (lane) files per read are read as a single stream (merge_lanes_mode 'stream')
+            (R1_files, R2_files) = split_fastq_reads(fastq)
+            if( R1_files.size() > 1 ) {
+                fastq_inputs = "<(zcat -f ${R1_files.join(' ')}) <(zcat -f ${R2_files.join(' ')})"
+            } else {
+                fastq_inputs = "${R1_files[0]} ${R2_files[0]}"
+            }
             shell:
             '''
             mkdir !{trim_dir}
@@ -1083,8 +1569,9 @@ if( params.mode == 'run' ) {
             set -v -H -o history
             !{params.trimmomatic_call} PE \\
                           -threads !{task.cpus} \\
+                          -summary !{trim_summary} \\
                           !{trimmomatic_flags} \\
-                          !{fastq} \\
+                          !{fastq_inputs} \\
                           !{out_reads_1_paired}   \\
                           !{out_reads_1_unpaired} \\
                           !{out_reads_2_paired}   \\
@@ -1092,18 +1579,24 @@ if( params.mode == 'run' ) {
                           !{trimmomatic_settings}
             set +v +H +o history
 
+            # Record Trimming Counts from Trimmomatic Summary (Ex: "Input Read Pairs: 100")
+            awk -F ': ' '{key = tolower($1); gsub(/ /, "_", key); print key "\\t" $2}' \\
+                !{trim_summary} > !{stats_file}
+
             echo "Step 1, Part A, Trimmomatic Trimming, Complete."
             '''
         }
-    // If not performing trimming, pass trim output forward.
+    // If not performing trimming (or fused trimming), pass trim output forward.
     } else {
         trim_inputs.set { trim_final } 
+        Channel.empty().set { trim_stats_outs }
     }
 
     trim_final.into { aln_ref_inputs; aln_spike_inputs; fastqcPost_inputs }
 
     // Step 1, Part C, Evaluate Final Trimmed Sequences With FastQC (If Enabled)
-    if( params.do_fastqc ) {
+    //   (Trimmed sequences are not written in fused trim + align mode)
+    if( params.do_fastqc && !use_fused_trim_aln ) {
         process CnR_S1_C_FastQCPost {
             if( has_container(params, 'fastqc') ) {
                 container get_container(params, 'fastqc')
@@ -1115,13 +1608,15 @@ if( params.mode == 'run' ) {
             tag          { name }
             label        'norm_mem'
             beforeScript { task_details(task) }
-            cpus         1   //Multiple CPUS for FastQC are for multiple files.
-           
+            // Multiple CPUS for FastQC are for multiple files.
+            cpus         { params.fastqc_mode == 'files' ? Math.min(fastq.size(), params.max_cpus) : 1 }
+
             input:
             tuple val(name), val(cond), val(group), path(fastq) from fastqcPost_inputs
         
             output:
             path "${fastqc_out_dir}/*.{html,zip}" into fastqcPost_all_outs
+            tuple val(name), val('S1_C_FastQCPost'), path(stats_file) into fastqcPost_stats_outs
             path '.command.log' into fastqcPost_log_outs
         
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
@@ -1132,53 +1627,208 @@ if( params.mode == 'run' ) {
             script:
             run_id         = "${task.tag}.${task.process}"
             out_log_name   = "${run_id}.nf.log.txt"
-            fastqc_out_dir = params.fastqc_post_dir 
-            fastqc_flags   = params.fastqc_flags
+            fastqc_out_dir = params.fastqc_post_dir
+            stats_file     = "${name}.stats.tsv"
+            command        = get_fastqc_command(params, task, name, fastq, fastqc_out_dir, stats_file)
+            shell:
+            command
+        }
+    } else {
+        Channel.empty().set { fastqcPost_stats_outs }
+    }
+
+    // Step 2, Part A0, Split Reads into Shards for Parallel Alignment (If Enabled)
+    if( params.aln_shard_reads ) {
+        process CnR_S2_A0_Shard_Reads {
+            tag          { name }
+            label        'small_mem'
+            beforeScript { task_details(task) }
+            cpus         2   // R1 and R2 files are split in parallel.
+
+            input:
+            tuple val(name), val(cond), val(group), path(fastq) from aln_ref_inputs
+
+            output:
+            tuple val(name), val(cond), val(group), path("${shard_dir}/*") into shard_outs
+            path '.command.log' into shard_log_outs
+
+            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                       pattern: '.command.log', saveAs: { out_log_name } 
+
+            script:
+            run_id       = "${task.tag}.${task.process}"
+            out_log_name = "${run_id}.nf.log.txt"
+            shard_dir    = "shards"
+            shard_lines  = (params.aln_shard_reads as long) * 4
+            (R1_files, R2_files) = split_fastq_reads(fastq)
             shell:
             '''
+            set -o pipefail
+            mkdir !{shard_dir}
+            echo "Splitting reads for name base: !{name} into shards of !{params.aln_shard_reads} read pairs."
+
+            # Suffix length is not fixed (no "-a") so split widens numeric suffixes as needed
+            #   (00-89, 9000-9899, ...); shard IDs are matched as any run of digits below.
             set -v -H -o history
-            mkdir -v !{fastqc_out_dir}
-            cat !{fastq} > !{name}_all.fastq.gz
-            !{params.fastqc_call} !{fastqc_flags} -t !{task.cpus} -o !{fastqc_out_dir} !{name}_all.fastq.gz
-            rm !{name}_all.fastq.gz  # Remove Intermediate
+            zcat -f !{R1_files.join(' ')} \\
+              | split -d -l !{shard_lines} --additional-suffix=_R1.fastq.gz \\
+                      --filter='gzip -1 > $FILE' - !{shard_dir}/!{name}_shard_ &
+            R1_PID=$!
+            zcat -f !{R2_files.join(' ')} \\
+              | split -d -l !{shard_lines} --additional-suffix=_R2.fastq.gz \\
+                      --filter='gzip -1 > $FILE' - !{shard_dir}/!{name}_shard_ &
+            R2_PID=$!
+            wait ${R1_PID}
+            wait ${R2_PID}
             set +v +H +o history
+
+            ls -l !{shard_dir}
+            echo "Step 2, Part A0, Split Reads into Shards, Complete."
             '''
         }
+
+        // Emit each shard pair separately, keyed with the number of shards per sample 
+        //   so shards can be merged as soon as all shards of a sample are aligned.
+        shard_outs
+                  .flatMap {name, cond, group, shard_files -> 
+                      def shard_ids = shard_files.collect {shard_file -> 
+                          (shard_file.getName() =~ /_shard_(\d+)_R[12]\.fastq\.gz$/)[0][1]
+                      }.unique().sort()
+                      shard_ids.collect {shard_id ->
+                          [groupKey(name, shard_ids.size()), cond, group, shard_id, 
+                           shard_files.findAll { it.getName().contains("_shard_${shard_id}_") }
+                                      .sort { it.getName() }]
+                      }
+                  }
+                  .set { aln_shard_inputs }
+    } else {
+        aln_ref_inputs
+                  .map {name, cond, group, fastq -> [name, cond, group, '', fastq] }
+                  .set { aln_shard_inputs }
     }
 
     // Step 2, Part A, Align Reads to Reference Genome(s)
+    aln_ref_container = 'bowtie2_samtools'
+    aln_ref_deps      = ['bowtie2', 'samtools']
+    if( use_fused_trim_aln ) {
+        aln_ref_container = 'trimmomatic_bowtie2_samtools'
+        aln_ref_deps      = ['trimmomatic', 'bowtie2', 'samtools', 'cnr_tools']
+    } else if( params.do_norm_spike && params.norm_aln_mode == 'combined' ) {
+        // Spike-in alignments are separated using cnr_tools.py split_spike.
+        aln_ref_container = 'bowtie2_samtools_cnr_tools'
+        aln_ref_deps      = ['bowtie2', 'samtools', 'cnr_tools']
+    }
     process CnR_S2_A_Aln_Ref {
-        if( has_container(params, 'bowtie2_samtools') ) {
-            container get_container(params, 'bowtie2_samtools')
-        } else if( has_module(params, ['bowtie2', 'samtools']) ) {
-            module get_module(params, ['bowtie2', 'samtools'])
-        } else if( has_conda(params, ['bowtie2', 'samtools']) ) {
-            conda get_conda(params, ['bowtie2', 'samtools'])
+        if( has_container(params, aln_ref_container) ) {
+            container get_container(params, aln_ref_container)
+        } else if( has_module(params, aln_ref_deps) ) {
+            module get_module(params, aln_ref_deps)
+        } else if( has_conda(params, aln_ref_deps) ) {
+            conda get_conda(params, aln_ref_deps)
         }
-        tag          { name }
+        tag          { shard ? "${name}.shard_${shard}" : name }
         label        'norm_mem'
         beforeScript { task_details(task) }
+        scratch      params.use_scratch  // Run in node-local scratch (If Enabled)
+        // Scale resources with input size (If Enabled)
+        if( params.scale_resources ) {
+            cpus          { scaled_resource(params, task, 'cpus', fastq) }
+            memory        { scaled_resource(params, task, 'memory', fastq) }
+            time          { scaled_resource(params, task, 'time', fastq) }
+            errorStrategy { resource_retry(params, task) }
+            maxRetries    params.resource_max_retries
+        }
+        // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+        if( params.stage_store ) {
+            storeDir { stage_store_path(params, 'S2_A_Aln_Ref',
+                (shard ? "${name}.shard_${shard}" : name),
+                [fastq],
+                ['aln_ref_flags', 'ref_bt2db_path', 'do_norm_spike', 'norm_aln_mode',
+                 'norm_mode', 'norm_ref_name', 'comb_ref_bt2db_path',
+                 'comb_ref_spike_prefix', 'do_trim', 'fuse_trim_aln',
+                 'trimmomatic_adapterpath', 'trimmomatic_adapter_mode',
+                 'trimmomatic_adapter_params', 'trimmomatic_settings', 'trimmomatic_flags'],
+                aln_ref_deps) }
+        }
     
         input:
-        tuple val(name), val(cond), val(group), path(fastq) from aln_ref_inputs
+        tuple val(name), val(cond), val(group), val(shard), path(fastq) from aln_shard_inputs
     
         output:
-        tuple val(name), val(cond), val(group), path("${params.aln_dir_ref}/*") into aln_outs
+        tuple val(name), val(cond), val(group), path("${params.aln_dir_ref}/*"), 
+              path(stats_file) into aln_ref_outs
+        // Spike-in counts are only produced when params.norm_aln_mode == 'combined'
+        tuple val(name), path(aln_use_count) optional true into aln_ref_comb_spike_outs
+        path "${aln_count_csv}" optional true into aln_comb_spike_csv_outs
         path '.command.log' into aln_log_outs
     
         // Publish Log
         publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                    pattern: '.command.log', saveAs: { out_log_name }
         // Publish unsorted alignments only when publish_files == all
+        //   (Sharded alignments are published after merging)
         publishDir "${params.out_dir}", mode: params.publish_mode, 
                    pattern: "${params.aln_dir_ref}/*",
-                   enabled: (params.publish_files == "all")
+                   enabled: (params.publish_files == "all" && !params.aln_shard_reads)
+        // Publish combined-mode spike-in count file if publish_file == "minimal" or "default"
+        publishDir "${params.out_dir}", mode: params.publish_mode, 
+                   pattern: "${aln_use_count}",
+                   enabled:  (comb_mode && !params.aln_shard_reads && params.publish_files != "all") 
+        // Publish combined-mode spike-in report if publish_file == "default"
+        publishDir "${params.out_dir}", mode: params.publish_mode, 
+                   pattern: "${aln_count_report}",
+                   enabled: (comb_mode && !params.aln_shard_reads && params.publish_files == "default")
     
         script:
+        // In sharded alignment mode, each shard is aligned as a separate task.
+        aln_name       = shard ? "${name}.shard_${shard}" : "${name}"
         run_id         = "${task.tag}.${task.process}"
         out_log_name   = "${run_id}.nf.log.txt"
         aln_ref_flags  = params.aln_ref_flags
         ref_bt2db_path = params.ref_bt2db_path
+        aln_summary    = "${aln_name}.bt2_summary.txt"
+        stats_file     = "${aln_name}.stats.tsv"
+        (R1_files, R2_files) = split_fastq_reads(fastq)
+        aln_threads     = task.cpus
+        aln_input_flags = "-1 ${R1_files.join(',')} -2 ${R2_files.join(',')}"
+        // In fused trim + align mode, reads are trimmed here and paired trimmed reads are
+        //   streamed through named pipes, interleaved, directly into alignment.
+        fuse_mode            = use_fused_trim_aln
+        trim_dir             = "${params.trim_dir}"
+        trim_summary         = "${trim_dir}/${aln_name}.trim_summary.txt"
+        trim_fifo_1          = "${aln_name}_1.paired.fifo"
+        trim_fifo_2          = "${aln_name}_2.paired.fifo"
+        trim_fifo_interleave = "${aln_name}.interleaved.fifo"
+        out_reads_1_unpaired = "${trim_dir}/${aln_name}_1.unpaired.fastq.gz" 
+        out_reads_2_unpaired = "${trim_dir}/${aln_name}_2.unpaired.fastq.gz" 
+        trimmomatic_flags    = params.do_trim ? params.trimmomatic_flags : ""
+        trimmomatic_settings = params.do_trim ? get_trimmomatic_settings(params) : ""
+        trim_threads         = 0
+        fastq_inputs         = ""
+        if( fuse_mode ) {
+            trim_threads    = Math.max(1, (task.cpus ?: 1).intdiv(4))
+            aln_threads     = Math.max(1, (task.cpus ?: 1) - trim_threads)
+            aln_input_flags = "--interleaved ${trim_fifo_interleave}"
+            if( R1_files.size() > 1 ) {
+                fastq_inputs = "<(zcat -f ${R1_files.join(' ')}) <(zcat -f ${R2_files.join(' ')})"
+            } else {
+                fastq_inputs = "${R1_files[0]} ${R2_files[0]}"
+            }
+        }
+        // In combined mode, reads are aligned once to the concatenated reference + spike-in
+        //   genome and spike-in alignments are counted and removed in the stream.
+        comb_mode      = (params.do_norm_spike && params.norm_aln_mode == 'combined')
+        spike_prefix   = ""
+        spike_stats    = "${aln_name}.spike_stats.tsv"
+        spike_name     = "spike"
+        if( comb_mode ) {
+            ref_bt2db_path = params.comb_ref_bt2db_path
+            spike_prefix   = params.comb_ref_spike_prefix
+            spike_name     = params.containsKey('norm_ref_title') ? params.norm_ref_title : params.norm_ref_name
+        }
+        aln_count_report = "${params.aln_dir_spike}/${aln_name}.${spike_name}.count_report.txt"
+        aln_count_csv    = "${params.aln_dir_spike}/${aln_name}.${spike_name}.count_report.csv"
+        aln_use_count    = "${params.aln_dir_spike}/${aln_name}.${spike_name}.${params.norm_mode}.count.txt"
  
         shell:
         '''
@@ -1188,77 +1838,350 @@ if( params.mode == 'run' ) {
 
         # echo "Reference Files:"
         # ls !{ref_bt2db_path}*
+
+        if [ "!{fuse_mode}" == "true" ]; then
+            echo "Fused Trim + Align Mode: Trimming file name base: !{name} ... utilizing Trimmomatic"
+            echo "    (Paired trimmed reads are streamed directly into alignment)"
+            echo "Verifying accessibility of Trimmomatic adapters file:"
+            ls !{params.trimmomatic_adapterpath}
+            mkdir !{trim_dir}
+            mkfifo !{trim_fifo_1} !{trim_fifo_2} !{trim_fifo_interleave}
+
+            set -v -H -o history
+            !{params.trimmomatic_call} PE \\
+                          -threads !{trim_threads} \\
+                          -summary !{trim_summary} \\
+                          !{trimmomatic_flags} \\
+                          !{fastq_inputs} \\
+                          !{trim_fifo_1} !{out_reads_1_unpaired} \\
+                          !{trim_fifo_2} !{out_reads_2_unpaired} \\
+                          !{trimmomatic_settings} &
+            TRIM_PID=$!
+            !{params.cnr_tools_call} interleave --in-1 !{trim_fifo_1} \\
+                                                --in-2 !{trim_fifo_2} \\
+                                                --output !{trim_fifo_interleave} &
+            INTERLEAVE_PID=$!
+            set +v +H +o history
+        fi
     
-        set -v -H -o history
-        !{params.bowtie2_call} -p !{task.cpus} \\
-                               !{aln_ref_flags} \\
-                               -x !{ref_bt2db_path} \\
-                               -1 !{fastq[0]} \\
-                               -2 !{fastq[1]} \\
-                                 | !{params.samtools_call} view -bS - \\
-                                   > !{params.aln_dir_ref}/!{name}.bam
-        set +v +H +o history
+        if [ -z "!{spike_prefix}" ]; then
+            set -v -H -o history
+            !{params.bowtie2_call} -p !{aln_threads} \\
+                                   !{aln_ref_flags} \\
+                                   -x !{ref_bt2db_path} \\
+                                   !{aln_input_flags} \\
+                                   2> !{aln_summary} \\
+                                     | !{params.samtools_call} view -bS - \\
+                                       > !{params.aln_dir_ref}/!{aln_name}.bam
+            set +v +H +o history
+        else
+            echo "Combined Reference + Spike-In Alignment Mode, Spike-In Contig Prefix: '!{spike_prefix}'"
+            echo "    (Spike-in alignments are counted and removed during alignment)"
+            set -v -H -o history
+            !{params.bowtie2_call} -p !{aln_threads} \\
+                                   !{aln_ref_flags} \\
+                                   -x !{ref_bt2db_path} \\
+                                   !{aln_input_flags} \\
+                                   2> !{aln_summary} \\
+                                     | !{params.cnr_tools_call} split_spike \\
+                                              --prefix '!{spike_prefix}' \\
+                                              --stats !{spike_stats} \\
+                                     | !{params.samtools_call} view -bS - \\
+                                       > !{params.aln_dir_ref}/!{aln_name}.bam
+            set +v +H +o history
+        fi
+        cat !{aln_summary}
+
+        if [ "!{fuse_mode}" == "true" ]; then
+            wait ${TRIM_PID}
+            wait ${INTERLEAVE_PID}
+            rm -v !{trim_fifo_1} !{trim_fifo_2} !{trim_fifo_interleave}
+        fi
 
+        # Record Counts from the Bowtie2 Alignment Summary
+        awk '/reads; of these:/                     {print "fastq_pairs\\t" $1}
+             /aligned concordantly exactly 1 time/  {print "aln_concordant_unique_pairs\\t" $1}
+             /aligned concordantly >1 times/        {print "aln_concordant_multi_pairs\\t" $1}
+             /overall alignment rate/               {print "aln_overall_rate\\t" $1}' \\
+            !{aln_summary} > !{stats_file}
+
+        # Record Trimming Counts from Trimmomatic Summary (Ex: "Input Read Pairs: 100")
+        if [ "!{fuse_mode}" == "true" ]; then
+            awk -F ': ' '{key = tolower($1); gsub(/ /, "_", key); print key "\\t" $2}' \\
+                !{trim_summary} >> !{stats_file}
+        fi
 
-        ALNS=$(!{params.samtools_call} view -c !{params.aln_dir_ref}/!{name}.bam )
-        echo "Alignments: ${ALNS}"
-        if [ "${ALNS}" == "0" ]; then 
+        ALN_RATE=$(awk '$1 == "aln_overall_rate" {print $2}' !{stats_file})
+        echo "Overall Alignment Rate: ${ALN_RATE}"
+        # Single shards may legitimately have no alignments, so sharded runs are checked
+        #   on the summed counts when merged.
+        if [ -z "!{shard}" ] && [ -z "${ALN_RATE}" -o "${ALN_RATE}" == "0.00%" ]; then 
             echo "No Alignments Found. Please check alignment paramaters and reference setup."
             exit 1
         fi
 
-        echo "Step 2, Part A, Alignment, Complete."
-        '''
-    }
+        if [ -n "!{spike_prefix}" ]; then
+            mkdir !{params.aln_dir_spike}
+            cat !{spike_stats} >> !{stats_file}
+            READ_NUM=$(awk '$1 == "fastq_pairs" {print $2}' !{stats_file})
+            SPIKE_COUNT=$(awk '$1 == "spike_aln" {print $2}' !{stats_file})
+            CROSS_COUNT=$(awk '$1 == "cross_aln" {print $2}' !{stats_file})
+            ADJ_COUNT=$(awk '$1 == "adj_aln" {print $2}' !{stats_file})
+            MIXED_COUNT=$(awk '$1 == "mixed_ref_aln" {print $2}' !{stats_file})
+            SPIKE_PERCENT=$(python <<< "print((${SPIKE_COUNT}/${READ_NUM})*100)")
+            CROSS_PERCENT=$(python <<< "print((${CROSS_COUNT}/${READ_NUM})*100)")
+            ADJ_PERCENT=$(python <<< "print((${ADJ_COUNT}/${READ_NUM})*100)")
 
-    // Step 2, Part B, Sort and Process Alignments
-    process CnR_S2_B_Modify_Aln {
-        if( has_container(params, 'samtools') ) {
-            container get_container(params, 'samtools')
-        } else if( has_module(params, 'samtools') ) {
-            module get_module(params, 'samtools')
-        } else if( has_conda(params, 'samtools') ) {
-            conda get_conda(params, 'samtools')
-        }
-        tag          { name }
+            MESSAGE="Counted ${READ_NUM} Fastq Reads.\n"
+            MESSAGE+="${SPIKE_COUNT} ( ${SPIKE_PERCENT}% ) Total Spike-In Reads Detected\n"
+            MESSAGE+="${CROSS_COUNT} Spike-In Reads Detected with Equal-Scoring Alternate Alignments\n"
+            MESSAGE+="    (Alternate alignments may be in the reference or spike-in genome)\n"
+            MESSAGE+="${ADJ_COUNT} (${SPIKE_COUNT} - ${CROSS_COUNT}, ${ADJ_PERCENT}) Adjusted Spike-in Reads Detected.\n"
+            MESSAGE+="${MIXED_COUNT} Reference Alignments Removed with a Mate Aligned to the Spike-In Genome\n"
+            MESSAGE+="\nNormalization Mode: !{params.norm_mode}\n"
+            MESSAGE+="Spike-In Alignment Mode: combined (Spike-in reads aligned with params.aln_ref_flags)\n"
+            MESSAGE+="Selecting count for use in sample normalization:\n"
+            MESSAGE+="    !{aln_use_count}"
+            echo -e "\n${MESSAGE}\n"
+            echo -e "${MESSAGE}" > !{aln_count_report}
+
+            echo -e "name,fq_reads,spike_aln_pairs,spike_aln_pct,cross_aln_pairs,cross_aln_pct,adj_aln_pairs,adj_aln_pct" > !{aln_count_csv}
+            echo -e "!{name},${READ_NUM},${SPIKE_COUNT},${SPIKE_PERCENT},${CROSS_COUNT},${CROSS_PERCENT},${ADJ_COUNT},${ADJ_PERCENT}" >> !{aln_count_csv}
+
+            if [ "!{params.norm_mode}" == "adj" ]; then
+                echo "${ADJ_COUNT}" > !{aln_use_count}
+            else
+                echo "${SPIKE_COUNT}" > !{aln_use_count}
+            fi
+        fi
+
+        echo "Step 2, Part A, Alignment, Complete."
+        '''
+    }
+
+    // Step 2, Part A1, Merge Sharded Alignments (If Enabled)
+    if( params.aln_shard_reads ) {
+        aln_ref_outs
+                  .groupTuple()
+                  .set { aln_merge_inputs }
+
+        process CnR_S2_A1_Merge_Shards {
+            if( has_container(params, 'samtools') ) {
+                container get_container(params, 'samtools')
+            } else if( has_module(params, 'samtools') ) {
+                module get_module(params, 'samtools')
+            } else if( has_conda(params, 'samtools') ) {
+                conda get_conda(params, 'samtools')
+            }
+            tag          { name }
+            label        'norm_mem'
+            beforeScript { task_details(task) }
+            scratch      params.use_scratch  // Run in node-local scratch (If Enabled)
+
+            input:
+            tuple val(name), val(conds), val(groups), path(alns), path(shard_stats) from aln_merge_inputs
+
+            output:
+            tuple val(sample_name), val(cond), val(group), path("${params.aln_dir_ref}/*") into aln_outs
+            tuple val(sample_name), val('S2_A_Aln_Ref'), path(stats_file) into aln_stats_outs
+            tuple val(sample_name), path(aln_use_count) optional true into aln_comb_spike_outs
+            path '.command.log' into aln_merge_log_outs
+
+            // Publish Log
+            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                       pattern: '.command.log', saveAs: { out_log_name }
+            // Publish unsorted alignments only when publish_files == all
+            publishDir "${params.out_dir}", mode: params.publish_mode, 
+                       pattern: "${params.aln_dir_ref}/*",
+                       enabled: (params.publish_files == "all")
+            // Publish combined-mode spike-in count file if publish_file == "minimal" or "default"
+            publishDir "${params.out_dir}", mode: params.publish_mode, 
+                       pattern: "${aln_use_count}",
+                       enabled:  (comb_mode && params.publish_files != "all") 
+
+            script:
+            sample_name  = name.toString()
+            cond         = conds[0]
+            group        = groups[0]
+            run_id       = "${task.tag}.${task.process}"
+            out_log_name = "${run_id}.nf.log.txt"
+            stats_file   = "${sample_name}.stats.tsv"
+            comb_mode    = (params.do_norm_spike && params.norm_aln_mode == 'combined')
+            count_key    = (params.norm_mode == 'adj') ? 'adj_aln' : 'spike_aln'
+            spike_name   = "spike"
+            if( comb_mode ) {
+                spike_name = params.containsKey('norm_ref_title') ? params.norm_ref_title : params.norm_ref_name
+            }
+            aln_use_count = "${params.aln_dir_spike}/${sample_name}.${spike_name}.${params.norm_mode}.count.txt"
+            shell:
+            '''
+            set -o pipefail
+            mkdir !{params.aln_dir_ref}
+            echo "Merging shard alignments for name base: !{name} ... utilizing samtools cat"
+            echo "    (Alignments are coordinate-sorted in the next step, so are concatenated only)"
+
+            set -v -H -o history
+            !{params.samtools_call} cat -o !{params.aln_dir_ref}/!{sample_name}.bam !{alns}
+            set +v +H +o history
+
+            # Sum Shard Counts (Non-count values, such as rates, are not combined)
+            awk -F '\\t' '$2 ~ /^[0-9]+$/ {
+                     if( !($1 in sum) ) { keys[++num_keys] = $1 }
+                     sum[$1] += $2 
+                 }
+                 END { for( i = 1; i <= num_keys; i++ ) { print keys[i] "\\t" sum[keys[i]] } }' \\
+                !{shard_stats} > !{stats_file}
+            echo -e "aln_shards\\t$(echo !{alns} | wc -w)" >> !{stats_file}
+            cat !{stats_file}
+
+            ALN_PAIRS=$(awk '$1 ~ /^aln_concordant_(unique|multi)_pairs$/ {sum += $2} END {print sum + 0}' \\
+                            !{stats_file})
+            echo "Aligned Pairs (All Shards): ${ALN_PAIRS}"
+            if [ "${ALN_PAIRS}" == "0" ]; then 
+                echo "No Alignments Found. Please check alignment paramaters and reference setup."
+                exit 1
+            fi
+
+            if [ "!{comb_mode}" == "true" ]; then
+                mkdir !{params.aln_dir_spike}
+                awk '$1 == "!{count_key}" {print $2}' !{stats_file} > !{aln_use_count}
+                echo "Combined-Mode Spike-In Count (!{params.norm_mode}): $(cat !{aln_use_count})"
+            fi
+
+            echo "Step 2, Part A1, Merge Sharded Alignments, Complete."
+            '''
+        }
+    } else {
+        aln_ref_outs.into { aln_ref_outs_aln; aln_ref_outs_stats }
+        aln_ref_outs_aln
+                  .map {name, cond, group, aln, stats -> [name, cond, group, aln] }
+                  .set { aln_outs }
+        aln_ref_outs_stats
+                  .map {name, cond, group, aln, stats -> [name, 'S2_A_Aln_Ref', stats] }
+                  .set { aln_stats_outs }
+        aln_ref_comb_spike_outs.set { aln_comb_spike_outs }
+    }
+
+    // MACS2 peak calling input (params.macs_input_format): For "BAMPE", alignments are
+    //   also written in BAM format if aln_format is "cram". Scattered peak calling 
+    //   filters fragments to the chromosomes of each chunk, so uses "BEDPE" input.
+    use_macs_bampe = (peak_callers.contains('macs') && params.macs_input_format == 'BAMPE')
+    if( use_macs_bampe && params.peaks_scatter_chunks > 1 ) {
+        message =  "Scattered peak calling (params.peaks_scatter_chunks) requires BEDPE input. \n"
+        message += "    MACS2 peaks will be called from fragments (-f BEDPE)."
+        log.warn message
+        use_macs_bampe = false
+    }
+
+    // Step 2, Part B, Sort and Process Alignments
+    process CnR_S2_B_Modify_Aln {
+        if( has_container(params, 'samtools_cnr_tools') ) {
+            container get_container(params, 'samtools_cnr_tools')
+        } else if( has_module(params, ['samtools', 'cnr_tools']) ) {
+            module get_module(params, ['samtools', 'cnr_tools'])
+        } else if( has_conda(params, ['samtools', 'cnr_tools']) ) {
+            conda get_conda(params, ['samtools', 'cnr_tools'])
+        }
+        tag          { name }
         label        'big_mem'
         beforeScript { task_details(task) }
-    
+        scratch      params.use_scratch  // Run in node-local scratch (If Enabled)
+        // Scale resources with input size (If Enabled)
+        if( params.scale_resources ) {
+            cpus          { scaled_resource(params, task, 'cpus', aln) }
+            memory        { scaled_resource(params, task, 'memory', aln) }
+            time          { scaled_resource(params, task, 'time', aln) }
+            errorStrategy { resource_retry(params, task) }
+            maxRetries    params.resource_max_retries
+        }
+        // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+        if( params.stage_store ) {
+            storeDir { stage_store_path(params, 'S2_B_Modify_Aln', name, [aln],
+                ['use_aln_modes', 'aln_format', 'ref_fasta_path', 'do_qc_report',
+                 'peak_callers', 'macs_input_format', 'peaks_scatter_chunks'],
+                ['samtools', 'cnr_tools']) }
+        }
+
         input:
         tuple val(name), val(cond), val(group), path(aln) from aln_outs
-    
+
         output:
         path "${params.aln_dir_mod}/*" into sort_aln_all_outs
-        tuple val(name), val(cond), val(group), val("all"), 
-              path("${params.aln_dir_mod}/${name}_sort.*") into sort_aln_outs_all
-        tuple val(name), val(cond), val(group), val("all_dedup"), 
-              path("${params.aln_dir_mod}/${name}_sort_dedup.*") into sort_aln_outs_all_dedup
-        tuple val(name), val(cond), val(group), val("limit_120"), 
-              path("${params.aln_dir_mod}/${name}_sort_120.*") into sort_aln_outs_120
-        tuple val(name), val(cond), val(group), val("limit_120_dedup"), 
-              path("${params.aln_dir_mod}/${name}_sort_dedup_120.*") into sort_aln_outs_120_dedup
+        // Only alignment modes enabled in params.use_aln_modes are written.
+        tuple val(name), val(cond), val(group), val(aln_type_all),
+              path("${params.aln_dir_mod}/${name}_sort.*") optional true into sort_aln_outs_all
+        tuple val(name), val(cond), val(group), val(aln_type_all_dedup),
+              path("${params.aln_dir_mod}/${name}_sort_dedup.*") optional true into sort_aln_outs_all_dedup
+        tuple val(name), val(cond), val(group), val(aln_type_120),
+              path("${params.aln_dir_mod}/${name}_sort_120.*") optional true into sort_aln_outs_120
+        tuple val(name), val(cond), val(group), val(aln_type_120_dedup),
+              path("${params.aln_dir_mod}/${name}_sort_dedup_120.*") optional true into sort_aln_outs_120_dedup
+        tuple val(name), val(stats_step), path(stats_file) into sort_aln_stats_outs
+        path(frag_hist_file) optional true into qc_frag_hist_outs
         path '.command.log' into sort_aln_log_outs
-    
+
         // Publish Log
-        publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+        publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode,
                    pattern: '.command.log', saveAs: { out_log_name }
         // If publish raw alingments only if publish_files == "all",
-        publishDir "${params.out_dir}", mode: params.publish_mode, 
+        publishDir "${params.out_dir}", mode: params.publish_mode,
                    pattern: "${params.aln_dir_mod}/*",
                    enabled: (params.publish_files=="all")
-    
+
         script:
         run_id              = "${task.tag}.${task.process}"
         out_log_name        = "${run_id}.nf.log.txt"
         aln_dir_mod         = "${params.aln_dir_mod}"
         ref_fasta           = "${params.ref_fasta_path}"
         aln_pre             = "${aln_dir_mod}/${name}_pre"
-        aln_sort            = "${aln_dir_mod}/${name}_sort.cram"
-        aln_sort_dedup      = "${aln_dir_mod}/${name}_sort_dedup.cram"
-        aln_sort_120        = "${aln_dir_mod}/${name}_sort_120.cram"
-        aln_sort_dedup_120  = "${aln_dir_mod}/${name}_sort_dedup_120.cram"
-        dedup_metrics       = "${aln_dir_mod}/${name}.dedup_metrics.txt"
-        add_threads         = (task.cpus ? (task.cpus - 1) : 0) 
+        aln_ext             = ".${params.aln_format}"
+        aln_mode_outs       = [
+            'all':            "${aln_dir_mod}/${name}_sort${aln_ext}",
+            'all_dedup':      "${aln_dir_mod}/${name}_sort_dedup${aln_ext}",
+            'less_120':       "${aln_dir_mod}/${name}_sort_120${aln_ext}",
+            'less_120_dedup': "${aln_dir_mod}/${name}_sort_dedup_120${aln_ext}",
+        ].findAll {mode, out_file -> return_as_list(params.use_aln_modes).contains(mode) }
+        split_out_flags     = aln_mode_outs.collect {mode, out_file -> "--out ${mode}=${out_file}" }
+        split_frag_flags    = aln_mode_outs.collect {mode, out_file -> 
+            "--frag ${mode}=${out_file - aln_ext}.bed.clean.frag" 
+        }
+        split_count_flags   = aln_mode_outs.collect {mode, out_file -> 
+            "--count ${mode}=${out_file - aln_ext}.aln_count.txt" 
+        }
+        // CRAM Reference: Sequence checksums (header M5 tags) and cache (References 
+        //   prepared with --mode prep_fasta), so reference sequences are not re-read 
+        //   and re-hashed for each output.
+        seq_md5_flag        = ""
+        ref_cache_command   = ""
+        if( params.aln_format == 'cram' && params.containsKey('ref_seq_md5_path') ) {
+            seq_md5_flag      = "--seq-md5 ${params.ref_seq_md5_path}"
+        }
+        if( params.aln_format == 'cram' && params.containsKey('ref_cache_path') ) {
+            ref_cache_command  = "export REF_PATH='${params.ref_cache_path}/%2s/%2s/%s'\n"
+            ref_cache_command += "export REF_CACHE='${params.ref_cache_path}/%2s/%2s/%s'"
+        }
+        split_out_files     = aln_mode_outs.collect {mode, out_file -> out_file }
+        // BAM copies of CRAM alignments for MACS2 BAMPE input (Written in the same pass)
+        macs_bam_flags      = ""
+        macs_bam_writers    = 0
+        if( use_macs_bampe && params.aln_format == 'cram' ) {
+            macs_bam_flags  = aln_mode_outs.collect {mode, out_file -> 
+                "--out ${mode}=${out_file - aln_ext}.macs.bam" 
+            }.join(' ')
+            macs_bam_writers = aln_mode_outs.size()
+        }
+        stats_file          = "${name}.stats.tsv"
+        stats_step          = 'S2_B_Modify_Aln'
+        // Output alignment mode names (Stored outputs (params.stage_store) require named values)
+        aln_type_all        = 'all'
+        aln_type_all_dedup  = 'all_dedup'
+        aln_type_120        = 'limit_120'
+        aln_type_120_dedup  = 'limit_120_dedup'
+        frag_hist_file      = "${name}.frag_hist.tsv"
+        frag_hist_flag      = (params.do_qc_report ? "--frag-hist ${frag_hist_file}" : "")
+        add_threads         = (task.cpus ? (task.cpus - 1) : 0)
+        // Additional threads are shared by markdup and each alignment writer process
+        split_threads       = add_threads.intdiv(aln_mode_outs.size() + macs_bam_writers + 1)
         mem_flag            = ""
         if( "${task.memory}" != "null" ) {
             reduced_mem = ( task.memory * 0.8 )
@@ -1269,7 +2192,8 @@ if( params.mode == 'run' ) {
         '''
         set -o pipefail
         mkdir -v !{aln_dir_mod}
-        
+        !{ref_cache_command}
+
         echo -e "\\nFiltering Unmapped Fragments for name base: !{name} ... utilizing samtools view"
         set -v -H -o history
         !{params.samtools_call} view -bh -f 3 -F 4 -F 8 \\
@@ -1307,82 +2231,43 @@ if( params.mode == 'run' ) {
         set +v +H +o history
         rm -v !{aln_pre}.mapped.nsort.fm.bam  # Clean Intermediate File
 
-        echo "Marking duplicates for: !{name} ... utilizing samtools markdup"
+        echo -e "\\nMarking duplicates and splitting alignment modes for: !{name} ... utilizing samtools markdup"
+        echo    "    Alignment Modes: !{aln_mode_outs.keySet().join(', ')}"
+        echo    "    (All modes are filtered and written in !{params.aln_format} format in a single pass)"
+        echo    "    (Paired-end fragments for each mode are written in bed format in the same pass)"
         set -v -H -o history
         !{params.samtools_call} markdup \\
-                       --threads !{add_threads} \\
+                       --threads !{split_threads} \\
+                       --output-fmt SAM \\
                        !{aln_pre}.mapped.nsort.fm.csort.bam \\
-                       !{aln_pre}.mapped.nsort.fm.csort.mkd.bam
+                       - \\
+          | !{params.cnr_tools_call} split_modes \\
+                       --samtools "!{params.samtools_call}" \\
+                       --reference !{ref_fasta} \\
+                       !{seq_md5_flag} \\
+                       --threads !{split_threads} \\
+                       !{split_out_flags.join(' ')} \\
+                       !{macs_bam_flags} \\
+                       !{split_frag_flags.join(' ')} \\
+                       !{split_count_flags.join(' ')} \\
+                       !{frag_hist_flag} \\
+                       --stats !{stats_file}
         set +v +H +o history
         rm -v !{aln_pre}.mapped.nsort.fm.csort.bam  # Clean Intermediate File
 
-        echo "Summarizing/outputting all alignments in cram (compressed) format: !{name} ... utilizing samtools view"
-        set -v -H -o history
-        !{params.samtools_call} view -Ch  \\
-                                     -T !{ref_fasta} \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort} \\
-                                     !{aln_pre}.mapped.nsort.fm.csort.mkd.bam
-        set +v +H +o history
-        rm -v !{aln_pre}.mapped.nsort.fm.csort.mkd.bam  # Clean Intermediate File
-        
-        echo "\\nRemoving Duplicates for name base: !{name} ... utilizing samtools view"
-        set -v -H -o history
-        !{params.samtools_call} view -Ch -F 1024  \\
-                                     -T !{ref_fasta} \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort_dedup} \\
-                                     !{aln_sort}
-        set +v +H +o history
-    
-        echo -e "\\nFiltering Non-Deduplicated Alignments for name base: !{name} ... to < 120 utilizing samtools view"
-        set -v -H -o history
-        !{params.samtools_call} view -h \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort}.sam \\
-                                     !{aln_sort}
-        LC_ALL=C awk 'length($10) < 121 || $1 ~ /^@/' \\
-                     !{aln_sort}.sam \\
-                     > !{aln_sort}.120.sam
-        !{params.samtools_call} view -Ch \\
-                                     -T !{ref_fasta} \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort_120} \\
-                                     !{aln_sort}.120.sam
-        rm -v !{aln_sort}.sam !{aln_sort}.120.sam
-        set +v +H +o history
-
-        echo -e "\\nFiltering Deduplicated Alignments for name base: !{name} ... to < 120 utilizing samtools view"
-        set -v -H -o history
-        !{params.samtools_call} view -h \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort_dedup}.sam \\
-                                     !{aln_sort_dedup}
-        LC_ALL=C awk 'length($10) < 121 || $1 ~ /^@/' \\
-                     !{aln_sort_dedup}.sam \\
-                     > !{aln_sort_dedup}.120.sam
-        !{params.samtools_call} view -Ch \\
-                                     -T !{ref_fasta} \\
-                                     --threads !{add_threads} \\
-                                     -o !{aln_sort_dedup_120} \\
-                                     !{aln_sort_dedup}.120.sam
-        rm -v !{aln_sort_dedup}.sam !{aln_sort_dedup}.120.sam
-        set +v +H +o history
-        
         echo ""
         echo "Creating bam index files for name base: !{name} ... utilizing samtools index"
 
         set -v -H -o history
-        !{params.samtools_call} index -@ !{add_threads} !{aln_sort}
-        !{params.samtools_call} index -@ !{add_threads} !{aln_sort_dedup}
-        !{params.samtools_call} index -@ !{add_threads} !{aln_sort_120}
-        !{params.samtools_call} index -@ !{add_threads} !{aln_sort_dedup_120}
+        for ALN_FILE in !{split_out_files.join(' ')}; do
+            !{params.samtools_call} index -@ !{add_threads} ${ALN_FILE}
+        done
         set +v +H +o history
 
         echo "Step 2, Part B, (Sort -> Dedup -> Filter) Alignments, Complete."
         '''
     }
-      
+
     use_aln_channels = []
     if( use_aln_modes.contains('all') ) {
         use_aln_channels.add(sort_aln_outs_all)
@@ -1412,17 +2297,32 @@ if( params.mode == 'run' ) {
 
     // Step 2, Part C, Create Paired-end Bedgraphs
     process CnR_S2_C_Make_Bdg {
-        if( has_container(params, 'samtools_bedtools') ) {
-            container get_container(params, 'samtools_bedtools')
-        } else if( has_module(params, ['samtools', 'bedtools']) ) {
-            module get_module(params, ['samtools', 'bedtools'])
-        } else if( has_conda(params, ['samtools', 'bedtools']) ) {
-            conda get_conda(params, ['samtools', 'bedtools'])
+        if( has_container(params, 'cnr_tools') ) {
+            container get_container(params, 'cnr_tools')
+        } else if( has_module(params, 'cnr_tools') ) {
+            module get_module(params, 'cnr_tools')
+        } else if( has_conda(params, 'cnr_tools') ) {
+            conda get_conda(params, 'cnr_tools')
         }
         tag          { name }
         label        'big_mem'
         beforeScript { task_details(task) }
+        // (Not run in scratch: Outputs include input alignment links, which would be copied back)
         cpus         1 // Effiency for multiple CPUS is too low for this task.    
+        // Scale resources with input size (If Enabled)
+        if( params.scale_resources ) {
+            memory        { scaled_resource(params, task, 'memory', aln) }
+            time          { scaled_resource(params, task, 'time', aln) }
+            errorStrategy { resource_retry(params, task) }
+            maxRetries    params.resource_max_retries
+        }
+        // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+        if( params.stage_store ) {
+            storeDir { stage_store_path(params, 'S2_C_Make_Bdg', "${name}.${aln_type}", [aln],
+                ['compact_bin_size', 'ref_chrom_sizes_path', 'do_qc_report',
+                 'do_norm_spike', 'norm_aln_mode', 'norm_ref_name'],
+                ['cnr_tools']) }
+        }
 
         input:
         tuple val(name), val(cond), val(group), val(aln_type), path(aln) from use_mod_alns
@@ -1430,7 +2330,9 @@ if( params.mode == 'run' ) {
         output:
         path "${aln_dir_bdg}/*" into bdg_aln_all_outs
         tuple val(name), val(cond), val(group), val(aln_type), 
-              path("${aln_dir_bdg}/*.{bam,cram,bdg,frag}*", includeInputs: true ) into bdg_aln_outs
+              path("${aln_dir_bdg}/*.{bam,cram,bdg,frag,aln_count,npz}*", includeInputs: true ) into bdg_aln_outs
+        tuple val(name), val(aln_type), path(qc_frag) into qc_frag_outs
+        path(chrom_stats_file) optional true into qc_chrom_stats_outs
 
         path '.command.log' into bdg_aln_log_outs
     
@@ -1438,8 +2340,9 @@ if( params.mode == 'run' ) {
         publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                    pattern: '.command.log', saveAs: { out_log_name }
         // Publish Bedgraph if publish_files == "default" or "minimal" and no normalization.
+        //   (If binned coverage is enabled, it is published in place of the bedgraph)
         publishDir "${params.out_dir}", mode: params.publish_mode, 
-                   pattern: "${aln_dir_bdg}/*.bdg",
+                   pattern: "${aln_dir_bdg}/*${use_bdg_ext}",
                    enabled: (
                        (params.publish_files == "minimal" && !params.do_norm_spike)
                        || (params.publish_files == "default")
@@ -1458,59 +2361,45 @@ if( params.mode == 'run' ) {
         run_id       = "${task.tag}.${task.process}.${aln_type}"
         out_log_name = "${run_id}.nf.log.txt"
         aln_dir_bdg  = "${params.aln_dir_bdg}.${aln_type}"
-        aln_in       = "${aln[0]}"
+        aln_in       = ( aln.findAll{fn -> ("${fn}".endsWith(".cram") || "${fn}".endsWith(".bam"))
+                                       && !"${fn}".endsWith(".macs.bam") } )[0]
+        aln_macs_bam = aln.findAll{fn -> "${fn}".endsWith(".macs.bam") }
+        aln_in_idx   = ( aln.findAll{fn -> "${fn}".endsWith(".crai") || "${fn}".endsWith(".bai") } )[0]
+        aln_bed_frag = ( aln.findAll{fn -> "${fn}".endsWith(".frag") } )[0]
+        aln_count    = ( aln.findAll{fn -> "${fn}".endsWith(".aln_count.txt") } )[0]
         aln_in_base  = "${aln_in}" - ~/.cram$/ - ~/.bam$/
-        aln_by_name  = "${aln_dir_bdg}/${aln_in_base}_byname.bam"
-        aln_bed      = "${aln_dir_bdg}/${aln_in_base + ".bed"}"
         aln_bdg      = "${aln_dir_bdg}/${aln_in_base + ".bdg"}"
         chrom_sizes  = "${params.ref_chrom_sizes_path}"
-        add_threads  = (task.cpus ? (task.cpus - 1) : 0) 
-        mem_flag     = ""
-        if( "${task.memory}" != "null" ) {
-            reduced_mem = ( task.memory * 0.8 )
-            split_mem = ( reduced_mem.div(task.cpus) )
-            mem_flag = "-m ${split_mem.toUnit("MB")}MB"
+        qc_frag      = "${aln_dir_bdg}/${aln_bed_frag}"
+        chrom_stats_file = "${name}.${aln_type}.chrom_stats.tsv"
+        chrom_stats_flag = (params.do_qc_report ? "--chrom-stats ${chrom_stats_file}" : "")
+        binned_flags = ""
+        use_bdg_ext  = ".bdg"
+        if( params.compact_bin_size ) {
+            aln_binned   = "${aln_dir_bdg}/${aln_in_base}.bin${params.compact_bin_size}.npz"
+            binned_flags = "--bin-size ${params.compact_bin_size} --binned 1=${aln_binned}"
+            use_bdg_ext  = ".npz"
         }
     
         shell:
         '''
         echo ""
         mkdir -v !{aln_dir_bdg}
-        cp -vPR !{aln_in} !{aln_dir_bdg}/!{aln_in}       
+        cp -vPR !{aln_in} !{aln_in_idx} !{aln_bed_frag} !{aln_count} !{aln_macs_bam.join(' ')} !{aln_dir_bdg}/
 
-        IN_ALNS=$(!{params.samtools_call} view -c !{aln_in} )
+        IN_ALNS=$(cat !{aln_count} )
         echo "Input Alignments: ${IN_ALNS}"
         if [ "${IN_ALNS}" == "0" ]; then 
             echo "No Input Alignments Found. Please check alignment processing output log."
             exit 1
         fi
 
-        echo "Sorting alignment file by name: !{aln_in} ... utilizing samtools sort"
-        set -v -H -o history
-        !{params.samtools_call} sort -n \\
-                                     -@ !{task.cpus} \\
-                                     !{mem_flag} \\
-                                     -o !{aln_by_name} \\
-                                     !{aln_in}
-        set -v -H -o history
         echo ""
-        echo "Convert BAM into Paired-end Bedgraph."
+        echo "Convert Paired-end Fragments into Bedgraph."
         echo "Procedure: https://github.com/FredHutch/SEACR/blob/master/README.md" 
-        echo ""
-        echo "Creating Bedgraph for file: !{aln_by_name} ... utilizing bamtools bamtobed"
-         
-        set -v -H -o history
-        !{params.bedtools_call} bamtobed -bedpe -i !{aln_by_name} > !{aln_bed}
-        set +v +H +o history
+        echo "(Coordinate-sorted fragments were written during alignment processing.)"
 
-        echo ""
-        echo "Modifying bed file file: !{aln_bed} ... utilizing awk, cut, and sort."
-        set -v -H -o history
-        awk '$1==$4 && $6-$2 < 1000 {print $0}' !{aln_bed} > !{aln_bed}.clean
-        cut -f 1,2,6 !{aln_bed}.clean | sort -k1,1 -k2,2n -k3,3n > !{aln_bed}.clean.frag
-        set +v +H +o history
-
-        NUM_FRAGS=$(wc -l !{aln_bed}.clean.frag )
+        NUM_FRAGS=$(wc -l < !{aln_bed_frag} )
         echo "Number of Processed Fragments: ${NUM_FRAGS}"
         if [ "${NUM_FRAGS}" == "0" ]; then
             echo "No bed fragments detected after processing."
@@ -1518,171 +2407,201 @@ if( params.mode == 'run' ) {
         fi      
 
         echo ""
-        echo "Creating Bedgraph using bedtools genomecov."
+        echo "Creating Bedgraph using cnr_tools.py coverage."
         set -v -H -o history
-        !{params.bedtools_call} genomecov -bg -i !{aln_bed}.clean.frag -g !{chrom_sizes} > !{aln_bdg}
+        !{params.cnr_tools_call} coverage --input !{aln_bed_frag} \\
+                                          --chrom-sizes !{chrom_sizes} \\
+                                          --out !{aln_bdg} !{binned_flags} \\
+                                          !{chrom_stats_flag}
         set +v +H +o history
 
-        echo "Step 2, Part C, Convert (CRAM -> BAM -> BED -> BDG) Alignments, Complete."
+        echo "Step 2, Part C, Convert (BED -> BDG) Fragments, Complete."
         '''
     }
     
     if( params.do_norm_spike ) {
-        use_name = params.norm_ref_name
-        if( params.containsKey('norm_ref_title') ) {
-            use_name = params.norm_ref_title 
-        }
-        spike_ref_dbs = [[use_name, params.norm_ref_bt2db_path]]
-
-        // Step 3, Part A, Align Reads to Spike-In Genome (If Enabled)
-        process CnR_S3_A_Aln_Spike {
-            if( has_container(params, 'bowtie2_samtools') ) {
-                container get_container(params, 'bowtie2_samtools')
-            } else if( has_module(params, ['bowtie2', 'samtools']) ) {
-                module get_module(params, ['bowtie2', 'samtools'])
-            } else if( has_conda(params, ['bowtie2', 'samtools']) ) {
-                conda get_conda(params, ['bowtie2', 'samtools'])
+        // In combined alignment mode, spike-in counts are produced during Step 2, Part A.
+        if( params.norm_aln_mode == 'combined' ) {
+            aln_comb_spike_outs.set { aln_spike_outs }
+            Channel.empty().set { aln_spike_stats_outs }
+        } else {
+            use_name = params.norm_ref_name
+            if( params.containsKey('norm_ref_title') ) {
+                use_name = params.norm_ref_title 
             }
-            tag          { name }
-            label        'norm_mem'
-            beforeScript { task_details(task) }
+            spike_ref_dbs = [[use_name, params.norm_ref_bt2db_path]]
+
+            // Step 3, Part A, Align Reads to Spike-In Genome (If Enabled)
+            process CnR_S3_A_Aln_Spike {
+                if( has_container(params, 'bowtie2_samtools') ) {
+                    container get_container(params, 'bowtie2_samtools')
+                } else if( has_module(params, ['bowtie2', 'samtools']) ) {
+                    module get_module(params, ['bowtie2', 'samtools'])
+                } else if( has_conda(params, ['bowtie2', 'samtools']) ) {
+                    conda get_conda(params, ['bowtie2', 'samtools'])
+                }
+                tag          { name }
+                label        'norm_mem'
+                beforeScript { task_details(task) }
+                scratch      params.use_scratch  // Run in node-local scratch (If Enabled)
+                // Scale resources with input size (If Enabled)
+                if( params.scale_resources ) {
+                    cpus          { scaled_resource(params, task, 'cpus', fastq) }
+                    memory        { scaled_resource(params, task, 'memory', fastq) }
+                    time          { scaled_resource(params, task, 'time', fastq) }
+                    errorStrategy { resource_retry(params, task) }
+                    maxRetries    params.resource_max_retries
+                }
+                // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+                if( params.stage_store ) {
+                    storeDir { stage_store_path(params, 'S3_A_Aln_Spike', name, [fastq],
+                        ['aln_norm_flags', 'norm_mode', 'norm_ref_name',
+                         'norm_ref_bt2db_path', 'ref_bt2db_path'],
+                        ['bowtie2', 'samtools']) }
+                }
         
-            input:
-            tuple val(name), val(cond), val(group), path(fastq) from aln_spike_inputs
-            tuple val(spike_ref_name), val(spike_ref) from Channel.fromList(spike_ref_dbs).first()
+                input:
+                tuple val(name), val(cond), val(group), path(fastq) from aln_spike_inputs
+                tuple val(spike_ref_name), val(spike_ref) from Channel.fromList(spike_ref_dbs).first()
         
-            output:
-            path "${params.aln_dir_spike}/*" into aln_spike_all_outs
-            tuple val(name), path(aln_count_csv) into aln_spike_csv_outs
-            tuple val(name), path(aln_spike_count) into aln_spike_outs
-            path '.command.log' into aln_spike_log_outs
+                output:
+                path "${params.aln_dir_spike}/*" into aln_spike_all_outs
+                tuple val(name), path(aln_count_csv) into aln_spike_csv_outs
+                tuple val(name), path(aln_spike_count) into aln_spike_outs
+                tuple val(name), val(stats_step), path(stats_file) into aln_spike_stats_outs
+                path '.command.log' into aln_spike_log_outs
         
-            // Publish Log
-            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
-                       pattern: '.command.log', saveAs: { out_log_name }
-            // Publish count file if publish_file == "minimal" or "default"
-            publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${aln_use_count}",
-                       enabled:  (params.publish_files != "all") 
-            // Publish report if publish_file == "default"
-            publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${aln_count_report}",
-                       enabled: (params.publish_files == "default")
-            // Publish all files when publish_files == all
-            publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${params.aln_dir_spike}/*",
-                       enabled: (params.publish_files == "all")
+                // Publish Log
+                publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                           pattern: '.command.log', saveAs: { out_log_name }
+                // Publish count file if publish_file == "minimal" or "default"
+                publishDir "${params.out_dir}", mode: params.publish_mode, 
+                           pattern: "${aln_use_count}",
+                           enabled:  (params.publish_files != "all") 
+                // Publish report if publish_file == "default"
+                publishDir "${params.out_dir}", mode: params.publish_mode, 
+                           pattern: "${aln_count_report}",
+                           enabled: (params.publish_files == "default")
+                // Publish all files when publish_files == all
+                publishDir "${params.out_dir}", mode: params.publish_mode, 
+                           pattern: "${params.aln_dir_spike}/*",
+                           enabled: (params.publish_files == "all")
         
-            script:
-            run_id           = "${task.tag}.${task.process}"
-            out_log_name     = "${run_id}.nf.log.txt"
-            if( params.containsKey('ref_title') ) {
-                ref_name     = params.ref_title
-            } else {
-                ref_name     = params.ref_name
-            }
-            aln_norm_flags   = params.aln_norm_flags
-            aln_spike_sam    = "${params.aln_dir_spike}/${name}.${spike_ref_name}.sam"
-            aln_spike_fq     = "${params.aln_dir_spike}/${name}.${spike_ref_name}.fastq.gz"
-            aln_spike_fq_1   = "${params.aln_dir_spike}/${name}.${spike_ref_name}.fastq.1.gz"
-            aln_spike_fq_2   = "${params.aln_dir_spike}/${name}.${spike_ref_name}.fastq.2.gz"
-            aln_cross_sam    = "${params.aln_dir_spike}/${name}.cross.${ref_name}.sam"
-            aln_count        = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report"
-            aln_count_report = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report.txt" 
-            aln_count_csv    = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report.csv" 
-            aln_spike_count  = "${params.aln_dir_spike}/${name}.${spike_ref_name}.01.all.count.txt"
-            aln_cross_count  = "${params.aln_dir_spike}/${name}.${spike_ref_name}.02.cross.count.txt"
-            aln_adj_count    = "${params.aln_dir_spike}/${name}.${spike_ref_name}.03.adj.count.txt"
-            if( params.norm_mode == 'adj') { 
-                aln_use_count = aln_adj_count
-            } else if( params.norm_mode == 'all' ) {
-                aln_use_count = aln_spike_count
-            }
+                script:
+                run_id           = "${task.tag}.${task.process}"
+                out_log_name     = "${run_id}.nf.log.txt"
+                if( params.containsKey('ref_title') ) {
+                    ref_name     = params.ref_title
+                } else {
+                    ref_name     = params.ref_name
+                }
+                aln_norm_flags   = params.aln_norm_flags
+                aln_count        = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report"
+                aln_count_report = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report.txt" 
+                aln_count_csv    = "${params.aln_dir_spike}/${name}.${spike_ref_name}.count_report.csv" 
+                aln_spike_count  = "${params.aln_dir_spike}/${name}.${spike_ref_name}.01.all.count.txt"
+                aln_cross_count  = "${params.aln_dir_spike}/${name}.${spike_ref_name}.02.cross.count.txt"
+                aln_adj_count    = "${params.aln_dir_spike}/${name}.${spike_ref_name}.03.adj.count.txt"
+                if( params.norm_mode == 'adj') { 
+                    aln_use_count = aln_adj_count
+                } else if( params.norm_mode == 'all' ) {
+                    aln_use_count = aln_spike_count
+                }
 
-            if( fastq[0].toString().endsWith('.gz') ) {
-                count_command = 'expr $(zcat < ' + "${fastq[0]}" + ' | wc -l) / 4'
-            } else {
-                count_command = 'expr $(wc -l ' + "${fastq[0]}" + ') / 4'
-            }
-            ref_bt2db_path = params.ref_bt2db_path
-            spike_ref_path = spike_ref
+                aln_spike_summary = "${params.aln_dir_spike}/${name}.${spike_ref_name}.bt2_summary.txt"
+                aln_cross_summary = "${params.aln_dir_spike}/${name}.cross.${ref_name}.bt2_summary.txt"
+                stats_file     = "${name}.stats.tsv"
+                stats_step     = 'S3_A_Aln_Spike'
+                ref_bt2db_path = params.ref_bt2db_path
+                (R1_files, R2_files) = split_fastq_reads(fastq)
+                spike_ref_path = spike_ref
             
-            shell:
-            '''
-            set -o pipefail
-            mkdir !{params.aln_dir_spike}
-            echo "Aligning file name base: !{name} ... utilizing Bowtie2"
-
-            # Count Total Reads
-            READ_NUM="$(!{count_command})"
-            MESSAGE="Counted ${READ_NUM} Fastq Reads."
-            echo -e "\\n${MESSAGE}\\n"
-            echo    "${MESSAGE}" > !{aln_count_report}
+                shell:
+                '''
+                set -o pipefail
+                mkdir !{params.aln_dir_spike}
+                echo "Aligning file name base: !{name} ... utilizing Bowtie2"
 
-            # echo "Spike-in Reference Files:"
-            # ls !{spike_ref}*
+                # echo "Spike-in Reference Files:"
+                # ls !{spike_ref}*
 
-            # Align Reads to Spike-in Genome
-            set -v -H -o history
-            !{params.bowtie2_call} -p !{task.cpus} \\
-                                   !{aln_norm_flags} \\
-                                   -x !{spike_ref_path} \\
-                                   -1 !{fastq[0]} \\
-                                   -2 !{fastq[1]} \\
-                                   -S !{aln_spike_sam} \\
-                                   --al-conc-gz !{aln_spike_fq}
-                                          
-            SPIKE_COUNT="$(!{params.samtools_call} view -Sc !{aln_spike_sam})"
-            echo "${SPIKE_COUNT}" > !{aln_spike_count}
-            SPIKE_PERCENT=$(python <<< "print((${SPIKE_COUNT}/${READ_NUM})*100)")
-          
-            set +v +H +o history
+                # Align Reads to Spike-in Genome, Counting Spike-in Alignments in the Stream
+                #   Concordantly-aligned pairs are then streamed (interleaved) directly into 
+                #   re-alignment to the Reference Genome to Check Cross-Mapping.
+                #   (No alignment or fastq intermediates are written)
+                set -v -H -o history
+                !{params.bowtie2_call} -p !{task.cpus} \\
+                                       !{aln_norm_flags} \\
+                                       -x !{spike_ref_path} \\
+                                       -1 !{R1_files.join(',')} \\
+                                       -2 !{R2_files.join(',')} \\
+                                       2> !{aln_spike_summary} \\
+                  | awk -v count_file=!{aln_spike_count} \\
+                        '!/^@/ {count++} {print} END {print count + 0 > count_file}' \\
+                  | !{params.samtools_call} fastq -f 2 -F 2304 - \\
+                  | !{params.bowtie2_call} -p !{task.cpus} \\
+                                       !{aln_norm_flags} \\
+                                       -x !{ref_bt2db_path} \\
+                                       --interleaved - \\
+                                       2> !{aln_cross_summary} \\
+                  | awk '!/^@/ {count++} END {print count + 0}' > !{aln_cross_count}
+                set +v +H +o history
+                echo -e "\\nSpike-in Alignment Summary:"
+                cat !{aln_spike_summary}
+                echo -e "\\nCross-Mapping Alignment Summary:"
+                cat !{aln_cross_summary}
 
-            MESSAGE="${SPIKE_COUNT} ( ${SPIKE_PERCENT}% ) Total Spike-In Reads Detected"
-            echo -e "\\n${MESSAGE}\\n"
-            echo    "${MESSAGE}" >> !{aln_count_report}
+                # Count Total Reads (Read Pairs) from the Bowtie2 Alignment Summary
+                READ_NUM=$(awk '/reads; of these:/ {print $1}' !{aln_spike_summary})
+                MESSAGE="Counted ${READ_NUM} Fastq Reads."
+                echo -e "\\n${MESSAGE}\\n"
+                echo    "${MESSAGE}" > !{aln_count_report}
 
-            # echo "Genome Reference Files:"
-            # ls !{ref_bt2db_path}*
+                set -v -H -o history
+                SPIKE_COUNT="$(cat !{aln_spike_count})"
+                SPIKE_PERCENT=$(python <<< "print((${SPIKE_COUNT}/${READ_NUM})*100)")
+                set +v +H +o history
 
-            # Realign Spike-in Alignments to Reference Genome to Check Cross-Mapping
-            set -v -H -o history
-            !{params.bowtie2_call} -p !{task.cpus} \\
-                                   !{aln_norm_flags} \\
-                                   -x !{ref_bt2db_path} \\
-                                   -1 !{aln_spike_fq_1} \\
-                                   -2 !{aln_spike_fq_2} \\
-                                   -S !{aln_cross_sam}
+                MESSAGE="${SPIKE_COUNT} ( ${SPIKE_PERCENT}% ) Total Spike-In Reads Detected"
+                echo -e "\\n${MESSAGE}\\n"
+                echo    "${MESSAGE}" >> !{aln_count_report}
 
-            CROSS_COUNT="$(!{params.samtools_call} view -Sc !{aln_cross_sam})"
-            echo "${CROSS_COUNT}" > !{aln_cross_count}
-            set +v +H +o history
+                set -v -H -o history
+                CROSS_COUNT="$(cat !{aln_cross_count})"
+                CROSS_PERCENT=$(python <<< "print((${CROSS_COUNT}/${READ_NUM})*100)")
+                set +v +H +o history
 
-            MESSAGE="${CROSS_COUNT} Reads Detected that Cross-Map to Reference Genome"
-            echo -e "\\n${MESSAGE}\\n"
-            echo    "${MESSAGE}" >> !{aln_count_report}
+                MESSAGE="${CROSS_COUNT} Reads Detected that Cross-Map to Reference Genome"
+                echo -e "\\n${MESSAGE}\\n"
+                echo    "${MESSAGE}" >> !{aln_count_report}
          
-            # Get Difference Between All Spike-In and Cross-Mapped Reads
-            OPERATION="${SPIKE_COUNT} - ${CROSS_COUNT}"
-            echo $(expr ${OPERATION}) > !{aln_adj_count}  
-            ADJ_COUNT=$(cat !{aln_adj_count})
-            ADJ_PERCENT=$(python <<< "print((${ADJ_COUNT}/${READ_NUM})*100)")
-
-            MESSAGE="$(cat !{aln_adj_count}) (${OPERATION}, ${ADJ_PERCENT}) Adjusted Spike-in Reads Detected."
-            echo -e "\\n${MESSAGE}\\n"
-            echo    "${MESSAGE}" >> !{aln_count_report}
-
-            MESSAGE="\\nNormalization Mode: !{params.norm_mode}\\n"
-            MESSAGE+="Selecting file for use in sample normalization:\\n"
-            MESSAGE+="    !{aln_use_count}"
-            echo -e "\\n${MESSAGE}\\n"
-            echo -e "${MESSAGE}" >> !{aln_count_report}
-
-            echo -e "name,fq_reads,spike_aln_pairs,spike_aln_pct,cross_aln_pairs,cross_aln_pct,adj_aln_pairs,adj_aln_pct" > !{aln_count_csv}
-            echo -e "!{name},${READ_NUM},${SPIKE_COUNT},${SPIKE_PERCENT},${CROSS_COUNT},CROSS_PCT,${ADJ_COUNT},${ADJ_PERCENT}" >> !{aln_count_csv}
-
-            echo "Step 3, Part A, Spike-In Alignment, Complete."
-            '''
+                # Get Difference Between All Spike-In and Cross-Mapped Reads
+                OPERATION="${SPIKE_COUNT} - ${CROSS_COUNT}"
+                echo $(expr ${OPERATION}) > !{aln_adj_count}  
+                ADJ_COUNT=$(cat !{aln_adj_count})
+                ADJ_PERCENT=$(python <<< "print((${ADJ_COUNT}/${READ_NUM})*100)")
+
+                MESSAGE="$(cat !{aln_adj_count}) (${OPERATION}, ${ADJ_PERCENT}) Adjusted Spike-in Reads Detected."
+                echo -e "\\n${MESSAGE}\\n"
+                echo    "${MESSAGE}" >> !{aln_count_report}
+
+                MESSAGE="\\nNormalization Mode: !{params.norm_mode}\\n"
+                MESSAGE+="Selecting file for use in sample normalization:\\n"
+                MESSAGE+="    !{aln_use_count}"
+                echo -e "\\n${MESSAGE}\\n"
+                echo -e "${MESSAGE}" >> !{aln_count_report}
+
+                echo -e "name,fq_reads,spike_aln_pairs,spike_aln_pct,cross_aln_pairs,cross_aln_pct,adj_aln_pairs,adj_aln_pct" > !{aln_count_csv}
+                echo -e "!{name},${READ_NUM},${SPIKE_COUNT},${SPIKE_PERCENT},${CROSS_COUNT},${CROSS_PERCENT},${ADJ_COUNT},${ADJ_PERCENT}" >> !{aln_count_csv}
+
+                echo -e "fastq_pairs\\t${READ_NUM}"    >  !{stats_file}
+                echo -e "spike_aln\\t${SPIKE_COUNT}"   >> !{stats_file}
+                echo -e "cross_aln\\t${CROSS_COUNT}"   >> !{stats_file}
+                echo -e "adj_aln\\t${ADJ_COUNT}"       >> !{stats_file}
+
+                echo "Step 3, Part A, Spike-In Alignment, Complete."
+                '''
+            }
         }
 
         aln_spike_outs
@@ -1694,15 +2613,15 @@ if( params.mode == 'run' ) {
 
         // Step 3, Part B, Normalize to Spike-in (If Enabled)
         process CnR_S3_B_Norm_Bdg {
-            if( has_container(params, 'samtools_bedtools') ) {
-                container get_container(params, 'samtools_bedtools')
-            } else if( has_module(params, ['bedtools', 'samtools']) ) {
-                module get_module(params, ['bedtools', 'samtools'])
-            } else if( has_conda(params, ['bedtools', 'samtools']) ) {
-                conda get_conda(params, ['bedtools', 'samtools'])
+            if( has_container(params, 'cnr_tools') ) {
+                container get_container(params, 'cnr_tools')
+            } else if( has_module(params, 'cnr_tools') ) {
+                module get_module(params, 'cnr_tools')
+            } else if( has_conda(params, 'cnr_tools') ) {
+                conda get_conda(params, 'cnr_tools')
             }
             tag          { name }
-            label        'norm_mem'
+            label        'small_mem'
             beforeScript { task_details(task) }
             cpus         1        
 
@@ -1712,16 +2631,16 @@ if( params.mode == 'run' ) {
             output:
             path "${aln_dir_norm}/*" into norm_all_outs
             tuple val(name), val(cond), val(group), val(aln_type), 
-                  path("${aln_dir_norm}/*.{bam,bdg}*", includeInputs: true
+                  path("${aln_dir_norm}/*.{bam,bdg,frag,npz}*", includeInputs: true
                   ) into final_alns
             path '.command.log' into norm_log_outs
         
             // Publish Log
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                        pattern: '.command.log', saveAs: { out_log_name }
-            // Publish bedgraph if publish_files == "minimal" or "default"
+            // Publish bedgraph (or binned coverage) if publish_files == "minimal" or "default"
             publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${aln_dir_norm}/*_norm.bdg",
+                       pattern: "${aln_dir_norm}/*_norm${use_bdg_ext}",
                        enabled: (params.publish_files!="all")
             // Publish all outputs if publish_files == "all"
             publishDir "${params.out_dir}", mode: params.publish_mode, 
@@ -1731,19 +2650,22 @@ if( params.mode == 'run' ) {
             script:
             run_id        = "${task.tag}.${task.process}.${aln_type}"
             out_log_name  = "${run_id}.nf.log.txt"
-            chrom_sizes   = "${params.ref_chrom_sizes_path}"
             aln_dir_norm  = "${params.aln_dir_norm}.${aln_type}"
             aln_bed_frag  = ( aln.findAll{fn -> "${fn}".endsWith(".frag") } )[0]
-            aln_cram      = ( aln.findAll{fn -> "${fn}".endsWith(".cram") } )[0]
             aln_bdg       = ( aln.findAll{fn -> "${fn}".endsWith(".bdg")  } )[0]
-            aln_byname    = ( aln.findAll{fn -> "${fn}".endsWith(".bam")  } )[0]
+            aln_bam_links = aln.findAll{fn -> "${fn}".endsWith(".bam") }.collect {fn -> "\$(readlink -f ${fn})" }.join(' ')
             bed_frag_base = "${aln_bed_frag}" - ~/.bed.clean.frag$/
             norm_bdg      = "${aln_dir_norm}/${bed_frag_base + '_norm.bdg'}"
+            aln_binned    = ( aln.findAll{fn -> "${fn}".endsWith(".npz") } )
+            aln_binned    = aln_binned.isEmpty() ? "" : aln_binned[0]
+            norm_binned   = "${aln_dir_norm}/${bed_frag_base}_norm.bin${params.compact_bin_size}.npz"
+            use_bdg_ext   = params.compact_bin_size ? ".bin${params.compact_bin_size}.npz" : ".bdg"
         
             shell:
             '''
             mkdir -v !{aln_dir_norm}
-            cp -vPR !{aln_cram} !{aln_bdg} !{aln_byname} !{aln_dir_norm}           
+            # Link (rather than copy) inputs required downstream.
+            ln -sv $(readlink -f !{aln_bdg}) $(readlink -f !{aln_bed_frag}) !{aln_bam_links} !{aln_dir_norm}/
 
             echo "Calculating Scaling Factor..."
             # Reference: https://github.com/Henikoff/Cut-and-Run/blob/master/spike_in_calibration.csh
@@ -1752,28 +2674,42 @@ if( params.mode == 'run' ) {
             SCALE=$(python <<< "print($CALC)")
 
             echo "Scaling factor calculated: ( ${CALC} ) = ${SCALE} "
+            echo "${SCALE}" > !{norm_bdg}.scale.txt
 
             echo ""
-            echo "Creating normalized bedgraph using bedtools genomecov."
+            echo "Creating normalized bedgraph by scaling bedgraph: !{aln_bdg} ... utilizing awk"
             set -v -H -o history
-            !{params.bedtools_call} genomecov -bg -i !{aln_bed_frag} -g !{chrom_sizes} -scale ${SCALE} > !{norm_bdg}
+            awk -v scale="${SCALE}" 'BEGIN {OFS="\\t"} {$4 = $4 * scale; print}' \\
+                !{aln_bdg} > !{norm_bdg}
             set +v +H +o history
 
+            if [ -n "!{aln_binned}" ]; then
+                echo ""
+                echo "Creating normalized binned coverage: !{aln_binned} ... utilizing cnr_tools.py binned"
+                set -v -H -o history
+                !{params.cnr_tools_call} binned --input !{aln_binned} \\
+                                                --scale ${SCALE} \\
+                                                --out !{norm_binned}
+                set +v +H +o history
+            fi
+
             echo "Step 3, Part B, Create Normalized Bedgraph, Complete."
             '''
         }
     } else if( params.do_norm_cpm ) {
+        Channel.empty().set { aln_spike_stats_outs }
+
         // Step 3, Part X, Normalize to Counts Per Million Alignments (If Enabled)
         process CnR_S3_X_NormCPM_Bdg {
-            if( has_container(params, 'samtools_bedtools') ) {
-                container get_container(params, 'samtools_bedtools')
-            } else if( has_module(params, ['samtools', 'bedtools']) ) {
-                module get_module(params, ['samtools', 'bedtools'])
-            } else if( has_conda(params, ['samtools', 'bedtools']) ) {
-                conda get_conda(params, ['samtools', 'bedtools'])
+            if( has_container(params, 'cnr_tools') ) {
+                container get_container(params, 'cnr_tools')
+            } else if( has_module(params, 'cnr_tools') ) {
+                module get_module(params, 'cnr_tools')
+            } else if( has_conda(params, 'cnr_tools') ) {
+                conda get_conda(params, 'cnr_tools')
             }
             tag          { name }
-            label        'norm_mem'
+            label        'small_mem'
             beforeScript { task_details(task) }
             cpus         1        
 
@@ -1783,16 +2719,16 @@ if( params.mode == 'run' ) {
             output:
             path "${aln_dir_norm_cpm}/*" into norm_all_outs
             tuple val(name), val(cond), val(group), val(aln_type), 
-                  path("${aln_dir_norm_cpm}/*.{bam,bdg}*", includeInputs: true
+                  path("${aln_dir_norm_cpm}/*.{bam,bdg,frag,npz}*", includeInputs: true
                   ) into final_alns
             path '.command.log' into norm_cpm_log_outs
         
             // Publish Log
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                        pattern: '.command.log', saveAs: { out_log_name }
-            // Publish bedgraph if publish_files == "minimal" or "default"
+            // Publish bedgraph (or binned coverage) if publish_files == "minimal" or "default"
             publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${aln_dir_norm_cpm}/*_norm.bdg",
+                       pattern: "${aln_dir_norm_cpm}/*_normCPM${use_bdg_ext}",
                        enabled: (params.publish_files!="all")
             // Publish all outputs if publish_files == "all"
             publishDir "${params.out_dir}", mode: params.publish_mode, 
@@ -1801,43 +2737,60 @@ if( params.mode == 'run' ) {
             script:
             run_id           = "${task.tag}.${task.process}.${aln_type}"
             out_log_name     = "${run_id}.nf.log.txt"
-            chrom_sizes      = "${params.ref_chrom_sizes_path}"
             aln_dir_norm_cpm = "${params.aln_dir_norm_cpm}.${aln_type}"
             aln_bed_frag     = ( aln.findAll{fn -> "${fn}".endsWith(".frag") } )[0]
-            aln_cram         = ( aln.findAll{fn -> "${fn}".endsWith(".cram") } )[0]
             aln_bdg          = ( aln.findAll{fn -> "${fn}".endsWith(".bdg")  } )[0]
-            aln_byname       = ( aln.findAll{fn -> "${fn}".endsWith(".bam")  } )[0]
+            aln_bam_links    = aln.findAll{fn -> "${fn}".endsWith(".bam") }.collect {fn -> "\$(readlink -f ${fn})" }.join(' ')
+            aln_count        = ( aln.findAll{fn -> "${fn}".endsWith(".aln_count.txt") } )[0]
             bed_frag_base    = "${aln_bed_frag}" - ~/.bed.clean.frag$/
             norm_bdg         = "${aln_dir_norm_cpm}/${bed_frag_base + '_normCPM.bdg'}"
+            aln_binned       = ( aln.findAll{fn -> "${fn}".endsWith(".npz") } )
+            aln_binned       = aln_binned.isEmpty() ? "" : aln_binned[0]
+            norm_binned      = "${aln_dir_norm_cpm}/${bed_frag_base}_normCPM.bin${params.compact_bin_size}.npz"
+            use_bdg_ext      = params.compact_bin_size ? ".bin${params.compact_bin_size}.npz" : ".bdg"
         
             shell:
             '''
             mkdir -v !{aln_dir_norm_cpm}
-            cp -vPR !{aln_cram} !{aln_bdg} !{aln_byname} !{aln_dir_norm_cpm}           
+            # Link (rather than copy) inputs required downstream.
+            ln -sv $(readlink -f !{aln_bdg}) $(readlink -f !{aln_bed_frag}) !{aln_bam_links} !{aln_dir_norm_cpm}/
 
             echo "Calculating CPM Scaling Factor..."
+            echo "(Using alignment count recorded during alignment processing: !{aln_count})"
 
             set -v -H -o history
-            ALNS_COUNT="$(!{params.samtools_call} view -Sc !{aln_dir_norm_cpm}/!{aln_cram})"
-            echo "${ALNS_COUNT}" > aln_count.txt
+            ALNS_COUNT="$(cat !{aln_count})"
             
             CALC="!{params.norm_cpm_scale}*1000000/${ALNS_COUNT}"
             SCALE=$(python <<< "print($CALC)")
             set +v +H +o history
 
             echo "Scaling factor caluculated: ( ${CALC} ) = ${SCALE} "
+            echo "${SCALE}" > !{norm_bdg}.scale.txt
 
             echo ""
-            echo "Creating CPM-normalized bedgraph using bedtools genomecov."
+            echo "Creating CPM-normalized bedgraph by scaling bedgraph: !{aln_bdg} ... utilizing awk"
             set -v -H -o history
-            !{params.bedtools_call} genomecov -bg -i !{aln_bed_frag} -g !{chrom_sizes} -scale ${SCALE} > !{norm_bdg}
+            awk -v scale="${SCALE}" 'BEGIN {OFS="\\t"} {$4 = $4 * scale; print}' \\
+                !{aln_bdg} > !{norm_bdg}
             set +v +H +o history
 
+            if [ -n "!{aln_binned}" ]; then
+                echo ""
+                echo "Creating CPM-normalized binned coverage: !{aln_binned} ... utilizing cnr_tools.py binned"
+                set -v -H -o history
+                !{params.cnr_tools_call} binned --input !{aln_binned} \\
+                                                --scale ${SCALE} \\
+                                                --out !{norm_binned}
+                set +v +H +o history
+            fi
+
             echo "Step 3, Part X, Create CPM-Normalized Bedgraph, Complete."
             '''
         }
     } else {
         bdg_aln_outs.set { final_alns }
+        Channel.empty().set { aln_spike_stats_outs }
     }
 
     // Step 4, Part A, Create bigWig tracks from final alignments (if enabled)
@@ -1845,16 +2798,28 @@ if( params.mode == 'run' ) {
 
         final_alns.into { peak_call_alns; make_bigwig_alns }
 
+        // In "direct" and "binned" modes, bigWig files are written by cnr_tools.py
+        if( params.bigwig_mode == 'direct' ) {
+            bigwig_dep   = 'cnr_tools'
+            bigwig_label = 'big_mem'
+        } else if( params.bigwig_mode == 'binned' ) {
+            bigwig_dep   = 'cnr_tools'
+            bigwig_label = 'small_mem'
+        } else {
+            bigwig_dep   = 'bedgraphtobigwig'
+            bigwig_label = 'norm_mem'
+        }
+
         process CnR_S4_A_Make_BigWig {
-            if( has_container(params, 'bedgraphtobigwig') ) {
-                container get_container(params, 'bedgraphtobigwig')
-            } else if( has_module(params, 'bedgraphtobigwig') ) {
-                module get_module(params, 'bedgraphtobigwig')
-            } else if( has_conda(params, 'bedgraphtobigwig') ) {
-                conda get_conda(params, 'bedgraphtobigwig')
+            if( has_container(params, bigwig_dep) ) {
+                container get_container(params, bigwig_dep)
+            } else if( has_module(params, bigwig_dep) ) {
+                module get_module(params, bigwig_dep)
+            } else if( has_conda(params, bigwig_dep) ) {
+                conda get_conda(params, bigwig_dep)
             }
             tag          { name }
-            label        'norm_mem'
+            label        bigwig_label
             beforeScript { task_details(task) }
             cpus         1
 
@@ -1891,23 +2856,77 @@ if( params.mode == 'run' ) {
                 out_suffix = ""   
             }
             in_bdg_sort  = "${in_bdg}.sort"
+            in_frag      = ( aln.findAll {fn -> "${fn}".endsWith(".frag") } )[0]
+            all_scale    = aln.findAll {fn -> "${fn}".endsWith("${in_bdg}.scale.txt") }
+            in_scale     = all_scale.isEmpty() ? "" : all_scale[0]
+            in_binned    = ( aln.findAll {fn -> "${fn}".endsWith(".npz") } )[0]
             out_bigwig   = "${bigwig_dir}/${name}${out_suffix}.bigWig"
             chrom_sizes  = "${params.ref_chrom_sizes_path}"
         
-            shell:
-            '''
-            mkdir -v !{bigwig_dir}
+            if( params.bigwig_mode == 'direct' ) {
+                command = '''
+                mkdir -v !{bigwig_dir}
+                SCALE="1"
+                if [ -n "!{in_scale}" ]; then
+                    SCALE="$(cat !{in_scale})"
+                fi
 
-            echo -e "\\nCreating UCSC bigWig file tracks for: !{name} ... utilizing UCSC bedGraphToBigWig"
+                echo -e "\\nCreating UCSC bigWig file tracks for: !{name} ... utilizing cnr_tools.py coverage"
+                echo "(Written directly from fragments: !{in_frag}, with scale factor: ${SCALE})"
             
-            set -v -H -o history
-            LC_ALL=C sort -k1,1 -k2,2n -o !{in_bdg_sort} !{in_bdg}
-            !{params.bedgraphtobigwig_call} !{in_bdg_sort} !{chrom_sizes} !{out_bigwig}
-            set +v +H +o history
-            rm -v !{in_bdg_sort}  # Remove intermediate
+                set -v -H -o history
+                !{params.cnr_tools_call} coverage --input !{in_frag} \\
+                                                  --chrom-sizes !{chrom_sizes} \\
+                                                  --bigwig "${SCALE}=!{out_bigwig}"
+                set +v +H +o history
 
-            echo "Step 4, Part A, bigWig Creation, Complete."
-            '''
+                echo "Step 4, Part A, bigWig Creation, Complete."
+                '''
+            } else if( params.bigwig_mode == 'binned' ) {
+                command = '''
+                mkdir -v !{bigwig_dir}
+
+                echo -e "\\nCreating UCSC bigWig file tracks for: !{name} ... utilizing cnr_tools.py binned"
+                echo "(Written from binned coverage: !{in_binned})"
+
+                set -v -H -o history
+                !{params.cnr_tools_call} binned --input !{in_binned} \\
+                                                --bigwig !{out_bigwig}
+                set +v +H +o history
+
+                echo "Step 4, Part A, bigWig Creation, Complete."
+                '''
+            } else {
+                command = '''
+                mkdir -v !{bigwig_dir}
+
+                echo -e "\\nCreating UCSC bigWig file tracks for: !{name} ... utilizing UCSC bedGraphToBigWig"
+           
+                # Pipeline bedgraphs are written in sorted order, so sorting is only
+                #   performed if the (streaming) sort-order check fails.
+                USE_BDG="!{in_bdg}"
+                if LC_ALL=C sort -c -k1,1 -k2,2n !{in_bdg}; then
+                    echo "Bedgraph is sorted (LC_ALL=C sort -k1,1 -k2,2n), skipping sort."
+                else
+                    echo "Bedgraph is not sorted, sorting before conversion."
+                    set -v -H -o history
+                    LC_ALL=C sort -k1,1 -k2,2n -o !{in_bdg_sort} !{in_bdg}
+                    set +v +H +o history
+                    USE_BDG="!{in_bdg_sort}"
+                fi
+
+                set -v -H -o history
+                !{params.bedgraphtobigwig_call} ${USE_BDG} !{chrom_sizes} !{out_bigwig}
+                set +v +H +o history
+                if [ "${USE_BDG}" == "!{in_bdg_sort}" ]; then
+                    rm -v !{in_bdg_sort}  # Remove intermediate
+                fi
+
+                echo "Step 4, Part A, bigWig Creation, Complete."
+                '''
+            }
+            shell:
+            command
         }
     } else {
         final_alns.set { peak_call_alns }
@@ -1924,6 +2943,10 @@ if( params.mode == 'run' ) {
                  .set { cmb_aln_outs }   
     
         cmb_aln_outs.ctrl
+                        // Broadcast each control sample to every group using it.
+                        .flatMap {name, cond, groups, aln_set, alns ->
+                            return_as_list(groups).collect {group -> [name, cond, group, aln_set, alns] }
+                        }
                         .cross(cmb_aln_outs.treat) {name, cond, group, aln_set, alns -> "${group}.${aln_set}" }
                         .map {ctrl_info, treat_info ->
                               treat_name = treat_info[0]
@@ -1944,6 +2967,38 @@ if( params.mode == 'run' ) {
                  .into { macs_alns; seacr_alns }
     }
 
+    // Peak calling can be scattered across chunks of chromosomes (If Enabled), 
+    //   balancing chunks by total chromosome length.
+    //   Chunks: [chunk_id, chunk_chroms, chunk_fraction_of_genome]
+    peak_chunks = [['', [], 1.0]]
+    if( params.peaks_scatter_chunks > 1 ) {
+        chrom_sizes = file(params.ref_chrom_sizes_path).readLines()
+                          .findAll { it.trim() }
+                          .collect {line -> 
+                              def fields = line.trim().split(/\s+/)
+                              [fields[0], fields[1] as long]
+                          }
+                          .sort { -it[1] }
+        num_peak_chunks = Math.min(params.peaks_scatter_chunks as int, chrom_sizes.size())
+        chunk_sizes     = [0L] * num_peak_chunks
+        chunk_chroms    = (1..num_peak_chunks).collect { [] }
+        chrom_sizes.each {chrom, size ->
+            def chunk_index = chunk_sizes.indexOf(chunk_sizes.min())
+            chunk_sizes[chunk_index] += size
+            chunk_chroms[chunk_index].add(chrom)
+        }
+        total_size  = chunk_sizes.sum()
+        peak_chunks = (0..<num_peak_chunks).collect {chunk_index ->
+            [String.format('%03d', chunk_index + 1), chunk_chroms[chunk_index], 
+             ((chunk_sizes[chunk_index] / total_size) as double)]
+        }
+        if( params.verbose ) {
+            log.info "Scattering peak calling across ${num_peak_chunks} chromosome chunks."
+            log.info ""
+        }
+    }
+    use_peak_chunks = (peak_chunks.size() > 1)
+
     // Step 5, Part A, Utilize MACS for Peak Calling
     if( peak_callers.contains("macs") ) {
         if( params.do_norm_spike || params.do_norm_cpm ) {
@@ -1960,13 +3015,23 @@ if( params.mode == 'run' ) {
             } else if( has_conda(params, 'macs2') ) {
                 conda get_conda(params, 'macs2')
             }
-            tag          { name }
+            tag          { chunk_id ? "${name}.chunk_${chunk_id}" : name }
             label        'small_mem'
             beforeScript { task_details(task) }
             cpus         1     
+            // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+            if( params.stage_store ) {
+                storeDir { stage_store_path(params, 'S5_A_Peaks_MACS',
+                    (chunk_id ? "${name}.${aln_type}.chunk_${chunk_id}" : "${name}.${aln_type}"),
+                    [aln, ctrl_aln],
+                    ['macs_qval', 'macs_flags', 'macs_input_format', 'ref_eff_genome_size',
+                     'peaks_scatter_chunks', 'ref_chrom_sizes_path'],
+                    ['macs2']) }
+            }
           
             input:
-            tuple val(name), val(group), val(aln_type), path(aln), val(ctrl_name), path(ctrl_aln) from macs_alns
+            tuple val(name), val(group), val(aln_type), path(aln), val(ctrl_name), path(ctrl_aln), 
+                  val(chunk_id), val(chunk_chroms), val(chunk_fraction) from macs_alns.combine(Channel.fromList(peak_chunks))
         
             output:
             path "${peaks_dir}/*" into macs_peak_all_outs
@@ -1978,44 +3043,81 @@ if( params.mode == 'run' ) {
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                        pattern: '.command.log', saveAs: { out_log_name }
             // Publish Only Minimal Outputs
+            //   (Chunk outputs are published after merging)
             publishDir "${params.out_dir}", mode: params.publish_mode, 
                        pattern: "${peaks_dir}/*",
-                       enabled: (params.publish_files!="all")
+                       enabled: (params.publish_files!="all" && !chunk_id)
             // Publish All Outputs
             publishDir "${params.out_dir}", mode: params.publish_mode, 
                        pattern: "${peaks_dir}/*",
-                       enabled: (params.publish_files=="all") 
+                       enabled: (params.publish_files=="all" && !chunk_id) 
             
             script:
             run_id        = "${task.tag}.${task.process}.${aln_type}"
             out_log_name  = "${run_id}.nf.log.txt"
             use_name      = "${name}.${aln_type}"
             peaks_dir     = "${params.peaks_dir_macs}.${aln_type}"
-            treat_bams    = aln.findAll {fn -> "${fn}".endsWith('_byname.bam') }
-            treat_bam     = treat_bams[0]
+            // Input: BAM alignments ("BAMPE", ".macs.bam" for CRAM alignments), 
+            //   or paired-end fragments ("BEDPE", Fragments < 1000 bp)
+            macs_format   = use_macs_bampe ? 'BAMPE' : 'BEDPE'
+            macs_in_ext   = use_macs_bampe ? '.bam' : '.bed.clean.frag'
+            treat_frag    = ( aln.findAll {fn -> "${fn}".endsWith(macs_in_ext) } )[0]
+            ctrl_frag     = ""
             if( ctrl_name ) {
-                ctrl_bams = ctrl_aln.findAll {fn -> "${fn}".endsWith('_byname.bam') }
-                ctrl_flag = "--control ${ctrl_bams[0]}"
-            } else {
-                ctrl_flag = ""
+                ctrl_frag  = ( ctrl_aln.findAll {fn -> "${fn}".endsWith(macs_in_ext) } )[0]
             }
             macs_qval     = "${params.macs_qval}"
             genome_size   = "${params.ref_eff_genome_size}"
             macs_flags    = "${params.macs_flags}"
             keep_dup_flag = aln_type.contains('_dedup') ? "" : "--keep-dup all " 
             //add_threads = (task.cpus ? (task.cpus - 1) : 0) 
+            // For chromosome chunks, fragments are filtered to chunk chromosomes
+            //   and the effective genome size is scaled to the chunk fraction.
+            chunk_chroms_file = ""
+            if( chunk_id ) {
+                use_name          = "${use_name}.chunk_${chunk_id}"
+                chunk_chroms_file = "${peaks_dir}/${use_name}.chroms.txt"
+                genome_size       = "${Math.round((genome_size as long) * chunk_fraction)}"
+            }
         
             shell:
             '''
             mkdir -v !{peaks_dir}
+            USE_TREAT="!{treat_frag}"
+            USE_CTRL="!{ctrl_frag}"
+            if [ -n "!{chunk_id}" ]; then
+                echo "Filtering fragments to chromosome chunk: !{chunk_id}"
+                printf '%s\\n' !{chunk_chroms.join(' ')} > !{chunk_chroms_file}
+                USE_TREAT="!{use_name}.treat.frag"
+                awk 'NR == FNR {keep[$1] = 1; next} $1 in keep' \\
+                    !{chunk_chroms_file} !{treat_frag} > ${USE_TREAT}
+                if [ -n "${USE_CTRL}" ]; then
+                    USE_CTRL="!{use_name}.ctrl.frag"
+                    awk 'NR == FNR {keep[$1] = 1; next} $1 in keep' \\
+                        !{chunk_chroms_file} !{ctrl_frag} > ${USE_CTRL}
+                    if [ ! -s "${USE_CTRL}" ]; then
+                        echo "No control fragments in chunk, calling peaks without control."
+                        USE_CTRL=""
+                    fi
+                fi
+                if [ ! -s "${USE_TREAT}" ]; then
+                    echo "No treatment fragments in chunk, skipping peak calling."
+                    echo "Step 5, Part A, Call Peaks Using MACS, Complete."
+                    exit 0
+                fi
+            fi
+            CTRL_FLAG=""
+            if [ -n "${USE_CTRL}" ]; then
+                CTRL_FLAG="--control ${USE_CTRL}"
+            fi
 
             echo "Calling Peaks for base name: !{name} ... utilizing macs2 callpeak"
              
             set -v -H -o history
             !{params.macs2_call} callpeak \\
-                -f BAMPE \\
-                --treatment !{treat_bam} \\
-                !{ctrl_flag} \\
+                -f !{macs_format} \\
+                --treatment ${USE_TREAT} \\
+                ${CTRL_FLAG} \\
                 --gsize  !{genome_size} \\
                 --name   !{use_name} \\
                 --outdir !{peaks_dir} \\
@@ -2027,10 +3129,21 @@ if( params.mode == 'run' ) {
             echo "Step 5, Part A, Call Peaks Using MACS, Complete."
             '''
         }
+    } else {
+        Channel.empty().set { macs_peak_outs }
     }
 
-    // Step 5, Part B, Utilize MACS for Peak Calling
+    // Step 5, Part B, Utilize SEACR for Peak Calling
     if( peak_callers.contains("seacr") ) {
+        // Relaxed and stringent modes are called as separate tasks.
+        seacr_modes = []
+        if( params.seacr_call_relaxed ) { seacr_modes.add('relaxed') }
+        if( params.seacr_call_stringent ) { seacr_modes.add('stringent') }
+        if( seacr_modes.isEmpty() ) {
+            log.error "Need either stringent or relaxed SEACR modes enabled."
+            exit 1
+        }
+
         process CnR_S5_B_Peaks_SEACR {
             if( has_container(params, 'seacr') ) {
                 container get_container(params, 'seacr')
@@ -2039,26 +3152,40 @@ if( params.mode == 'run' ) {
             } else if( has_conda(params, 'seacr') ) {
                 conda get_conda(params, 'seacr')
             }
-            tag          { name }
+            tag          { chunk_id ? "${name}.${seacr_mode}.chunk_${chunk_id}" : "${name}.${seacr_mode}" }
             label        'small_mem'
             beforeScript { task_details(task) }
             cpus         1     
+            // Reuse stored outputs of a matching stage fingerprint (If Enabled)
+            if( params.stage_store ) {
+                storeDir { stage_store_path(params, 'S5_B_Peaks_SEACR',
+                    (chunk_id ? "${name}.${aln_type}.${seacr_mode}.chunk_${chunk_id}" : "${name}.${aln_type}.${seacr_mode}"),
+                    [aln, ctrl_aln],
+                    ['seacr_fdr_threshhold', 'seacr_norm_mode', 'do_norm_spike',
+                     'peaks_scatter_chunks', 'ref_chrom_sizes_path'],
+                    ['seacr']) }
+            }
    
             input:
-            tuple val(name), val(group), val(aln_type), path(aln), val(ctrl_name), path(ctrl_aln) from seacr_alns
+            tuple val(name), val(group), val(aln_type), path(aln), val(ctrl_name), path(ctrl_aln), 
+                  val(seacr_mode), val(chunk_id), val(chunk_chroms), val(chunk_fraction) from seacr_alns
+                      .combine(Channel.fromList(seacr_modes))
+                      .combine(Channel.fromList(peak_chunks))
         
             output:
             path "${peaks_dir}/*" into seacr_peak_all_outs
             tuple val(name), val(group), val(aln_type), 
-                  path("${peaks_dir}/*.bed") into seacr_peak_outs
+                  path("${peaks_dir}/*") into seacr_peak_outs
             path '.command.log' into seacr_peak_log_outs
         
             // Publish Log
             publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
                        pattern: '.command.log', saveAs: { out_log_name }
             // Publish All Outputs
+            //   (Chunk outputs are published after merging)
             publishDir "${params.out_dir}", mode: params.publish_mode, 
-                       pattern: "${peaks_dir}/*"
+                       pattern: "${peaks_dir}/*",
+                       enabled: (!chunk_id)
                        //enabled: (params.publish_files=="all") 
         
             
@@ -2066,6 +3193,7 @@ if( params.mode == 'run' ) {
             run_id             = "${task.tag}.${task.process}.${aln_type}"
             out_log_name       = "${run_id}.nf.log.txt"
             peaks_dir          = "${params.peaks_dir_seacr}.${aln_type}"
+            use_name           = "${name}.${aln_type}.peaks.seacr"
             all_treat_bdg      = aln.findAll {fn -> "${fn}".endsWith(".bdg") }
             all_treat_norm_bdg = aln.findAll {fn -> "${fn}".endsWith("_norm.bdg") }
             if( all_treat_norm_bdg.isEmpty() ) {
@@ -2073,66 +3201,309 @@ if( params.mode == 'run' ) {
             } else {
                 treat_bdg      = all_treat_norm_bdg[0]
             }
+            ctrl_bdg = ""
             if( ctrl_name ) {
                 all_ctrl_bdg      = ctrl_aln.findAll {fn -> "${fn}".endsWith(".bdg") } 
                 all_ctrl_norm_bdg = ctrl_aln.findAll {fn -> "${fn}".endsWith("_norm.bdg") } 
                 if(all_treat_norm_bdg.isEmpty()) {
-                    ctrl_flag     = all_ctrl_bdg[0]
+                    ctrl_bdg      = all_ctrl_bdg[0]
                 } else {
-                    ctrl_flag     = all_ctrl_norm_bdg[0]
+                    ctrl_bdg      = all_ctrl_norm_bdg[0]
                 }
-            } else {
-                ctrl_flag = params.seacr_fdr_threshhold 
-            }
-            if( params.seacr_call_stringent && params.seacr_call_relaxed ) {
-                do_relaxed   = "Enabled"
-                do_stringent = "Enabled"
-            } else if( params.seacr_call_relaxed ) {
-                do_relaxed   = "Enabled"
-                do_stringent = ""
-            } else if( params.seacr_call_stringent ) {
-                do_relaxed   = ""
-                do_stringent = "Enabled"
-            } else {
-                throw new Exception("Need either stringent or relaxed modes enabled.")
             }
+            fdr_threshhold = params.seacr_fdr_threshhold 
             if( params.seacr_norm_mode == 'auto' ) { 
                 norm_mode = params.do_norm_spike ? 'non' : 'norm'
             } else {
                 norm_mode = "${params.seacr_norm_mode}"
             }
+            // For chromosome chunks, bedgraphs are filtered to chunk chromosomes.
+            chunk_chroms_file = ""
+            if( chunk_id ) {
+                use_name          = "${use_name}.chunk_${chunk_id}"
+                chunk_chroms_file = "${peaks_dir}/${use_name}.${seacr_mode}.chroms.txt"
+            }
             shell:
             '''
             mkdir -v !{peaks_dir}
+            USE_TREAT="!{treat_bdg}"
+            USE_CTRL="!{ctrl_bdg}"
+            if [ -n "!{chunk_id}" ]; then
+                echo "Filtering bedgraphs to chromosome chunk: !{chunk_id}"
+                printf '%s\\n' !{chunk_chroms.join(' ')} > !{chunk_chroms_file}
+                USE_TREAT="!{use_name}.treat.bdg"
+                awk 'NR == FNR {keep[$1] = 1; next} $1 in keep' \\
+                    !{chunk_chroms_file} !{treat_bdg} > ${USE_TREAT}
+                if [ -n "${USE_CTRL}" ]; then
+                    USE_CTRL="!{use_name}.ctrl.bdg"
+                    awk 'NR == FNR {keep[$1] = 1; next} $1 in keep' \\
+                        !{chunk_chroms_file} !{ctrl_bdg} > ${USE_CTRL}
+                    if [ ! -s "${USE_CTRL}" ]; then
+                        echo "No control signal in chunk, using numeric threshold: !{fdr_threshhold}"
+                        USE_CTRL=""
+                    fi
+                fi
+                if [ ! -s "${USE_TREAT}" ]; then
+                    echo "No treatment signal in chunk, skipping peak calling."
+                    echo "Step 5, Part B, Call Peaks Using SEACR, Complete."
+                    exit 0
+                fi
+            fi
+            CTRL_FLAG="!{fdr_threshhold}"
+            if [ -n "${USE_CTRL}" ]; then
+                CTRL_FLAG="${USE_CTRL}"
+            fi
            
             echo "Calling Peaks for base name: !{name} ... utilizing SEACR"
+            echo 'Calling Peaks using "!{seacr_mode}" mode.'
             set -v -H -o history
-            if [ -n "!{do_relaxed}" ]; then
-
-                echo 'Calling Peaks using "relaxed" mode.'
-                !{params.seacr_call} !{treat_bdg} \\
-                                     !{ctrl_flag} \\
-                                     !{norm_mode} \\
-                                     relaxed \\
-                                     !{peaks_dir}/!{name}.!{aln_type}.peaks.seacr \\
-                                     !{params.seacr_R_script} 
-            fi
-
-            if [ -n "!{do_stringent}" ]; then
-                echo 'Calling Peaks using "stringent" mode.'
-                !{params.seacr_call} !{treat_bdg} \\
-                                     !{ctrl_flag} \\
-                                     !{norm_mode} \\
-                                     stringent \\
-                                     !{peaks_dir}/!{name}.!{aln_type}.peaks.seacr \\
-                                     !{params.seacr_R_script} 
-
-            fi
+            !{params.seacr_call} ${USE_TREAT} \\
+                                 ${CTRL_FLAG} \\
+                                 !{norm_mode} \\
+                                 !{seacr_mode} \\
+                                 !{peaks_dir}/!{use_name} \\
+                                 !{params.seacr_R_script} 
             set +v +H +o history
     
             echo "Step 5, Part B, Call Peaks Using SEACR, Complete."
             '''
         }
+    } else {
+        seacr_modes = []
+        Channel.empty().set { seacr_peak_outs }
+    }
+
+    // Step 5, Part C, Merge Chromosome-Chunk Peaks (If Enabled)
+    if( use_peak_chunks ) {
+        macs_peak_outs
+                  .map {name, group, aln_type, peaks ->
+                      ['macs', "${params.peaks_dir_macs}.${aln_type}", "${name}.${aln_type}", 
+                       peak_chunks.size(), name, group, aln_type, peaks]
+                  }
+                  .mix(
+                      seacr_peak_outs
+                          .map {name, group, aln_type, peaks ->
+                              ['seacr', "${params.peaks_dir_seacr}.${aln_type}", 
+                               "${name}.${aln_type}.peaks.seacr", 
+                               (peak_chunks.size() * seacr_modes.size()), name, group, aln_type, peaks]
+                          }
+                  )
+                  // Group chunks (keyed with the expected chunk count) by caller and sample.
+                  .map {caller, peaks_dir, use_name, num_chunks, name, group, aln_type, peaks ->
+                      [groupKey("${caller}.${use_name}", num_chunks), 
+                       caller, peaks_dir, use_name, name, group, aln_type, peaks]
+                  }
+                  .groupTuple()
+                  .map {key, callers, peaks_dirs, use_names, names, groups, aln_types, peaks ->
+                      [callers[0], peaks_dirs[0], use_names[0], names[0], groups[0], aln_types[0],
+                       peaks.flatten()]
+                  }
+                  .set { peak_chunk_outs }
+
+        process CnR_S5_C_Merge_Peak_Chunks {
+            tag          { "${name}.${caller}" }
+            label        'small_mem'
+            beforeScript { task_details(task) }
+            cpus         1     
+
+            input:
+            tuple val(caller), val(peaks_dir), val(use_name), val(name), val(group), val(aln_type),
+                  path(chunk_peaks) from peak_chunk_outs
+
+            output:
+            tuple val(caller), val(name), val(group), val(aln_type), 
+                  path("${peaks_dir}/*") into merged_peak_outs
+            path '.command.log' into merged_peak_log_outs
+
+            // Publish Log
+            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                       pattern: '.command.log', saveAs: { out_log_name }
+            // Publish All Outputs
+            publishDir "${params.out_dir}", mode: params.publish_mode, 
+                       pattern: "${peaks_dir}/*"
+
+            script:
+            run_id       = "${task.tag}.${task.process}.${aln_type}"
+            out_log_name = "${run_id}.nf.log.txt"
+            shell:
+            '''
+            set -o pipefail
+            mkdir -v !{peaks_dir}
+            echo "Merging chromosome-chunk peaks for: !{use_name} (!{caller})"
+
+            # Merge chunk files of each output type into the genome-wide file name:
+            #   Ex: name.chunk_001_peaks.narrowPeak -> name_peaks.narrowPeak
+            ls !{chunk_peaks} \\
+              | grep -v '\\.chroms\\.txt$' \\
+              | sed 's/^!{use_name}\\.chunk_[0-9]*//' \\
+              | sort -u > out_suffixes.txt
+            while read SUFFIX; do
+                OUT_FILE="!{peaks_dir}/!{use_name}${SUFFIX}"
+                CHUNK_FILES=$(ls !{chunk_peaks} | grep -- "^!{use_name}\\.chunk_[0-9]*${SUFFIX}$")
+                echo "Merging: ${CHUNK_FILES} -> ${OUT_FILE}"
+                if [[ "${SUFFIX}" == *.xls ]]; then
+                    # Keep comment lines from the first chunk, and the column header once.
+                    awk 'FNR == 1 {file_num++}
+                         /^#/ || /^$/ {if( file_num == 1 ) {print}; next}
+                         /^chr\\tstart/ {if( !header_done ) {print; header_done = 1}; next}
+                         {print}' ${CHUNK_FILES} > ${OUT_FILE}
+                else
+                    cat ${CHUNK_FILES} | sort -k1,1 -k2,2n > ${OUT_FILE}
+                fi
+            done < out_suffixes.txt
+
+            echo "Step 5, Part C, Merge Chromosome-Chunk Peaks, Complete."
+            '''
+        }
+    }
+
+    // Combine counts recorded by each step into a single stats manifest per sample.
+    Channel.empty()
+          .mix(mergeFastqs_stats_outs, fastqcPre_stats_outs, trim_stats_outs,
+               fastqcPost_stats_outs, aln_stats_outs, sort_aln_stats_outs,
+               aln_spike_stats_outs)
+          .collectFile(
+              sort: true, seed: "name\tstep\tkey\tvalue\n",
+              storeDir: "${params.out_dir}/${params.stats_dir}"
+          ) {name, step, stats ->
+              ["${name}.stats.tsv", stats.readLines().collect {"${name}\t${step}\t${it}\n"}.join('')]
+          }
+          .set { stats_manifest_outs }
+
+    // Step 6, Library QC Reports (If Enabled)
+    if( params.do_qc_report ) {
+        // Peaks for each sample (genome-wide, after merging any chromosome chunks)
+        if( use_peak_chunks ) {
+            merged_peak_outs
+                      .map {caller, name, group, aln_type, peaks -> [name, aln_type, peaks] }
+                      .set { qc_peak_outs }
+        } else {
+            macs_peak_outs
+                      .mix(seacr_peak_outs)
+                      .map {name, group, aln_type, peaks -> [name, aln_type, peaks] }
+                      .set { qc_peak_outs }
+        }
+
+        // Step 6, Part A, Fraction of Fragments in Peaks
+        process CnR_S6_A_QC_FRiP {
+            if( has_container(params, 'cnr_tools') ) {
+                container get_container(params, 'cnr_tools')
+            } else if( has_module(params, 'cnr_tools') ) {
+                module get_module(params, 'cnr_tools')
+            } else if( has_conda(params, 'cnr_tools') ) {
+                conda get_conda(params, 'cnr_tools')
+            }
+            tag          { name }
+            label        'small_mem'
+            beforeScript { task_details(task) }
+            cpus         1
+
+            input:
+            tuple val(name), val(aln_type), path(peaks), path(frag) from qc_peak_outs
+                      .combine(qc_frag_outs, by: [0, 1])
+
+            output:
+            path(frip_file) into qc_frip_outs
+            path '.command.log' into qc_frip_log_outs
+
+            // Publish Log
+            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                       pattern: '.command.log', saveAs: { out_log_name }
+
+            script:
+            run_id       = "${task.tag}.${task.process}.${aln_type}.${task.index}"
+            out_log_name = "${run_id}.nf.log.txt"
+            frip_file    = "${name}.${aln_type}.${task.index}.frip.tsv"
+            shell:
+            '''
+            echo "Counting fragments in peaks for: !{name} (!{aln_type})"
+            PEAK_FLAGS=""
+            for PEAK_FILE in !{peaks}; do
+                case ${PEAK_FILE} in
+                    *_peaks.narrowPeak) 
+                        PEAK_FLAGS="${PEAK_FLAGS} --peaks !{aln_type}.macs=${PEAK_FILE}" ;;
+                    *.peaks.seacr.*.bed)
+                        SEACR_MODE=${PEAK_FILE%.bed}
+                        PEAK_FLAGS="${PEAK_FLAGS} --peaks !{aln_type}.seacr_${SEACR_MODE##*.}=${PEAK_FILE}" ;;
+                esac
+            done
+
+            set -v -H -o history
+            !{params.cnr_tools_call} frip --frags !{frag} \\
+                                      --name !{name} \\
+                                      --out !{frip_file} \\
+                                      ${PEAK_FLAGS}
+            set +v +H +o history
+
+            echo "Step 6, Part A, Fraction of Fragments in Peaks, Complete."
+            '''
+        }
+
+        // Step 6, Part B, Combine QC for all samples into run-level reports
+        //   (Summary table and fragment lengths are MultiQC custom-content files)
+        process CnR_S6_B_QC_Report {
+            if( has_container(params, 'cnr_tools') ) {
+                container get_container(params, 'cnr_tools')
+            } else if( has_module(params, 'cnr_tools') ) {
+                module get_module(params, 'cnr_tools')
+            } else if( has_conda(params, 'cnr_tools') ) {
+                conda get_conda(params, 'cnr_tools')
+            }
+            tag          { "all_samples" }
+            label        'small_mem'
+            beforeScript { task_details(task) }
+            cpus         1
+
+            input:
+            path(stats_manifests) from stats_manifest_outs.collect().ifEmpty([])
+            path(frag_hists) from qc_frag_hist_outs.collect().ifEmpty([])
+            path(chrom_stats) from qc_chrom_stats_outs.collect().ifEmpty([])
+            path(frips) from qc_frip_outs.collect().ifEmpty([])
+
+            output:
+            path "${qc_dir}/*" into qc_report_outs
+            path '.command.log' into qc_report_log_outs
+
+            // Publish Log
+            publishDir "${params.out_dir}/${params.log_dir}", mode: params.publish_mode, 
+                       pattern: '.command.log', saveAs: { out_log_name }
+            // Publish All Outputs
+            publishDir "${params.out_dir}", mode: params.publish_mode, 
+                       pattern: "${qc_dir}/*"
+
+            script:
+            run_id       = "${task.tag}.${task.process}"
+            out_log_name = "${run_id}.nf.log.txt"
+            qc_dir       = "${params.qc_dir}"
+            shell:
+            '''
+            shopt -s nullglob
+            mkdir -v !{qc_dir}
+            QC_FLAGS=""
+            for STATS_FILE in *.stats.tsv; do
+                QC_FLAGS="${QC_FLAGS} --stats ${STATS_FILE}"
+            done
+            for FRAG_HIST in *.frag_hist.tsv; do
+                QC_FLAGS="${QC_FLAGS} --frag-hist ${FRAG_HIST%.frag_hist.tsv}=${FRAG_HIST}"
+            done
+            for CHROM_STATS in *.chrom_stats.tsv; do
+                QC_FLAGS="${QC_FLAGS} --chrom-stats ${CHROM_STATS%.chrom_stats.tsv}=${CHROM_STATS}"
+            done
+            for FRIP_FILE in *.frip.tsv; do
+                QC_FLAGS="${QC_FLAGS} --frip ${FRIP_FILE}"
+            done
+
+            echo "Combining QC statistics for all samples."
+            set -v -H -o history
+            !{params.cnr_tools_call} qc_report ${QC_FLAGS} \\
+                        --out-json !{qc_dir}/CnR-flow.qc.json \\
+                        --out-table !{qc_dir}/cnr_flow_qc_mqc.tsv \\
+                        --out-frag-lengths !{qc_dir}/cnr_flow_fragment_lengths_mqc.json
+            set +v +H +o history
+
+            echo "Step 6, Part B, QC Report, Complete."
+            '''
+        }
     }
 }
 
@@ -2145,7 +3516,171 @@ def return_as_list(item) {
     }
 }
 
-def get_ref_details (params, ref_type ) {
+def get_trimmomatic_settings(params) {
+    def trimmomatic_settings = params.trimmomatic_settings
+    if( params.trimmomatic_adapter_mode ) {
+        def adapter_command = "${params.trimmomatic_adapter_mode}${params.trimmomatic_adapterpath}"
+        adapter_command += "${params.trimmomatic_adapter_params}"
+        trimmomatic_settings = "${adapter_command} ${trimmomatic_settings}"
+    }
+    trimmomatic_settings
+}
+
+def split_fastq_reads(fastq) {
+    // Classify paired fastq files into sorted lists of R1 and R2 files.
+    if( fastq.size() == 2 ) {
+        return [[fastq[0]], [fastq[1]]]
+    }
+    // Read numbers are matched at the end of the file name (Ex: "_R1_part001.fastq.gz" for 
+    //   merge_lanes_mode 'stream', "_R1_001.fastq.gz", "_1.fastq.gz"), so sample names 
+    //   containing "_1_" or "_2_" are not misclassified.
+    def read_suffix = ~/_R?([12])(_part\d+|_\d+)?\.f(ast)?q(\.gz|\.bz2)?$/
+    def read_num = {fn ->
+        def suffix_match = ("${fn}".tokenize('/')[-1] =~ read_suffix)
+        if( suffix_match.find() ) {
+            return suffix_match.group(1)
+        }
+        // Otherwise, search for a read number anywhere in the name.
+        if( "${fn}".contains("_R1_") || "${fn}".contains("_R1.")
+            || "${fn}".contains("_1.f") || "${fn}".contains("_1_") ) {
+            return '1'
+        } else if( "${fn}".contains("_R2_") || "${fn}".contains("_R2.")
+            || "${fn}".contains("_2.f") || "${fn}".contains("_2_") ) {
+            return '2'
+        }
+        ''
+    }
+    def R1_files = fastq.findAll {fn -> read_num(fn) == '1' }.sort { "${it}" }
+    def R2_files = fastq.findAll {fn -> read_num(fn) == '2' }.sort { "${it}" }
+    [R1_files, R2_files]
+}
+
+def get_fastqc_name(fastq) {
+    // Name of the FastQC report (without extension) for a read file, as named by FastQC.
+    def fastqc_name = "${fastq}".tokenize('/')[-1]
+    ['gz', 'bz2', 'txt', 'fastq', 'fq', 'csfastq', 'sam', 'bam', 'ubam'].each {ext ->
+        fastqc_name = fastqc_name.replaceAll("\\.${ext}\$", '')
+    }
+    "${fastqc_name}_fastqc"
+}
+
+def get_fastqc_command(params, task, name, fastq, fastqc_out_dir, stats_file) {
+    // FastQC command for a sample's read files (Shared by FastQCPre and FastQCPost), 
+    //   with read counts written to the sample stats file.
+    def command = ''
+    if( params.fastqc_mode == 'files' ) {
+        def (R1_files, R2_files) = split_fastq_reads(fastq)
+        def R1_data = R1_files.collect { "${fastqc_out_dir}/${get_fastqc_name(it)}/fastqc_data.txt" }
+        def R2_data = R2_files.collect { "${fastqc_out_dir}/${get_fastqc_name(it)}/fastqc_data.txt" }
+        // Each read file is evaluated directly (in parallel), without a concatenated copy.
+        command = """
+        set -o pipefail
+        mkdir -v ${fastqc_out_dir}
+        set -v -H -o history
+        ${params.fastqc_call} ${params.fastqc_flags} --extract -t ${task.cpus} \\
+                              -o ${fastqc_out_dir} ${R1_files.join(' ')} ${R2_files.join(' ')}
+        set +v +H +o history
+
+        R1_READS=0
+        for DATA_FILE in ${R1_data.join(' ')}; do
+            R1_READS=\$(( R1_READS + \$(grep -m 1 '^Total Sequences' \${DATA_FILE} | cut -f 2) ))
+        done
+        R2_READS=0
+        for DATA_FILE in ${R2_data.join(' ')}; do
+            R2_READS=\$(( R2_READS + \$(grep -m 1 '^Total Sequences' \${DATA_FILE} | cut -f 2) ))
+        done
+        echo -e "fastqc_r1_reads\\t\${R1_READS}" >  ${stats_file}
+        echo -e "fastqc_r2_reads\\t\${R2_READS}" >> ${stats_file}
+        """
+    } else {
+        def data_file = "${fastqc_out_dir}/${name}_all_fastqc/fastqc_data.txt"
+        command = """
+        set -o pipefail
+        set -v -H -o history
+        mkdir -v ${fastqc_out_dir}
+        cat ${fastq} > ${name}_all.fastq.gz
+        ${params.fastqc_call} ${params.fastqc_flags} --extract -t ${task.cpus} \\
+                              -o ${fastqc_out_dir} ${name}_all.fastq.gz
+        rm ${name}_all.fastq.gz  # Remove Intermediate
+        set +v +H +o history
+
+        ALL_READS=\$(grep -m 1 '^Total Sequences' ${data_file} | cut -f 2)
+        echo -e "fastqc_all_reads\\t\${ALL_READS}" > ${stats_file}
+        """
+    }
+    command += """
+    rm -r ${fastqc_out_dir}/*_fastqc  # Remove Extracted Reports
+    """
+    command.toString()
+}
+
+def scaled_resource(params, task, resource, in_files) {
+    // Scale the baseline resource of the task's process label (ext.base_<resource>, set 
+    //   with "withLabel" in the process config) by total input size (within 
+    //   resource_min_scale to resource_max_scale), and double memory/time on each retry.
+    def use_files = (in_files instanceof java.nio.file.Path) ? [in_files] : in_files.collect { it }
+    def in_gb = use_files.sum(0) {fn -> fn.size() } / 1e9
+    def scale = Math.max(in_gb / params.resource_base_gb, params.resource_min_scale as double)
+    scale = Math.min(scale, params.resource_max_scale as double)
+    def retry_scale = 2 ** (task.attempt - 1)
+    def baseline = task.ext["base_${resource}".toString()]
+    if( baseline == null ) {
+        throw new Exception("No baseline ${resource} (ext.base_${resource}) is set for the process label.")
+    }
+    if( resource == 'cpus' ) {
+        // CPUs are scaled (without retries) from the baseline, up to max_cpus.
+        return Math.max(1, Math.min(params.max_cpus as int, Math.ceil(baseline * scale) as int))
+    } else if( resource == 'memory' ) {
+        return new nextflow.util.MemoryUnit("${baseline}").multiply(scale * retry_scale)
+    } else {
+        return new nextflow.util.Duration("${baseline}").multiply(scale * retry_scale)
+    }
+}
+
+def resource_retry(params, task) {
+    // Retry tasks killed for exceeding memory or time limits (Ex: 137: SIGKILL, 140: SLURM time)
+    def retry_codes = [104, 134, 137, 139, 140, 143, 247]
+    if( retry_codes.contains(task.exitStatus) && task.attempt <= params.resource_max_retries ) {
+        return 'retry'
+    }
+    'terminate'
+}
+
+def stage_store_path(params, stage, task_name, in_items, stage_keys, tool_names, workflow = workflow) {
+    // Get the store directory for a task, keyed by a fingerprint (md5) of the stage, 
+    //   its input files (name, size, and modification time, or contents if 
+    //   stage_store_hash == 'deep'), stage-specific params, and tool settings 
+    //   (call, container, module, conda), and the pipeline version.
+    def use_files = []
+    in_items.each {item -> 
+        use_files.addAll((item instanceof java.nio.file.Path) ? [item] : item.collect { it })
+    }
+    def fingerprint = ["stage\t${stage}", "version\t${workflow.manifest.version}"]
+    stage_keys.each {key -> 
+        fingerprint.add("${key}\t${params.containsKey(key) ? params[key] : ''}")
+    }
+    def tool_suffixes = ['_call', '_container', '_module', '_conda']
+    params.keySet().sort().each {key ->
+        if( tool_names.any {tool -> key.startsWith("${tool}_") } 
+            && tool_suffixes.any {suffix -> key.endsWith(suffix) } ) {
+            fingerprint.add("${key}\t${params[key]}")
+        }
+    }
+    use_files.sort {fn -> fn.getName() }.each {fn -> 
+        if( params.stage_store_hash == 'deep' ) {
+            def file_digest = java.security.MessageDigest.getInstance('MD5')
+            fn.eachByte(1048576) {buffer, num_bytes -> file_digest.update(buffer, 0, num_bytes) }
+            fingerprint.add("${fn.getName()}\t${file_digest.digest().encodeHex()}")
+        } else {
+            fingerprint.add("${fn.getName()}\t${fn.size()}\t${fn.lastModified()}")
+        }
+    }
+    def digest = java.security.MessageDigest.getInstance('MD5')
+    def fingerprint_md5 = digest.digest(fingerprint.join('\n').getBytes()).encodeHex().toString()
+    "${params.out_dir}/${params.stage_store_dir}/${stage}/${task_name}.${fingerprint_md5}"
+}
+
+def get_ref_key (params, ref_type ) {
     def ref_key = ""
     if( params.ref_mode == 'name' ) {
         check_type = "${ref_type}_name".toString()
@@ -2171,6 +3706,18 @@ def get_ref_details (params, ref_type ) {
         use_name = file(use_name).getBaseName()
         ref_key = use_name
     }
+    ref_key
+}
+
+// Name of the combined reference + spike-in database created during "prep_fasta"
+def get_comb_ref_name (ref_key, norm_ref_key ) {
+    "${ref_key}_plus_${norm_ref_key}".toString()
+}
+
+def get_ref_details (params, ref_type, ref_key=null ) {
+    if( ref_key == null ) {
+        ref_key = get_ref_key(params, ref_type)
+    }
     def ref_info = [:]
     if( ref_key ) { 
         ref_info_file = search_refs(params, ref_key)[ref_key]
@@ -0,0 +1,1767 @@
+#!/usr/bin/env python3
+#Daniel Stribling
+#Renne Lab, University of Florida
+#Changelog:
+#   2026-10-18, Initial Version
+#
+#This file is part of CnR-flow.
+#CnR-flow is free software: you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation, either version 3 of the License, or
+#(at your option) any later version.
+#CnR-flow is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU General Public License for more details.
+#You should have received a copy of the GNU General Public License
+#along with CnR-flow.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Streaming helper tools bundled with the CnR-flow pipeline.
+
+Nextflow places this directory on the task PATH, so each subcommand can be
+called directly from process scripts as "cnr_tools.py <subcommand> ...".
+Only the Python standard library is required, except where noted.
+
+Subcommands:
+    split_modes : Split a coordinate-sorted, duplicate-marked SAM stream
+                  into all enabled alignment-mode outputs in a single pass,
+                  optionally also writing the paired-end fragments of each mode
+                  and a fragment-length histogram.
+    split_spike : Separate a SAM stream aligned to a combined reference + spike-in
+                  index into reference alignments and spike-in alignment counts.
+    prep_ref    : Write a (decompressed) copy, index (.fai), chromosome sizes,
+                  nucleotide counts (faCount format), effective genome size,
+                  checksum (md5), per-sequence checksums, and a CRAM reference
+                  cache (REF_CACHE layout) of a reference fasta in a single pass.
+    interleave  : Interleave paired (R1/R2) fastq streams, such as named pipes
+                  written by a trimmer, into a single stream for alignment.
+    coverage    : Create raw and/or scaled bedgraph, bigWig, or binned (npz)
+                  coverage tracks from a chromosome-grouped fragment (bed) file
+                  in a single pass. (Requires NumPy)
+    binned      : Scale binned (npz) coverage and/or convert it to bigWig format.
+                  (Requires NumPy)
+    frip        : Count the fraction of fragments in peaks (FRiP) for peak files.
+                  (Requires NumPy)
+    qc_report   : Combine per-sample statistics, fragment-length histograms,
+                  chromosome coverage, and FRiP into run-level JSON and
+                  MultiQC custom-content reports.
+    profile     : Summarize measured task resource usage from Nextflow trace files,
+                  ranking bottleneck steps and flagging over/under-provisioning.
+    benchmark   : Combine Nextflow trace files of benchmark runs into a per-step
+                  resource table, and compare it to a previous version's table.
+"""
+
+import os
+import re
+import sys
+import zlib
+import shutil
+import hashlib
+import struct
+import json
+import select
+import zipfile
+import tempfile
+import threading
+import shlex
+import argparse
+import subprocess
+
+__version__ = '0.11-dev'
+
+# Alignment Modes: (remove duplicates, limit to reads <= 120 bp)
+ALN_MODES = {
+    'all':            (False, False),
+    'all_dedup':      (True,  False),
+    'less_120':       (False, True),
+    'less_120_dedup': (True,  True),
+}
+MAX_SHORT_LEN = 120
+MAX_FRAG_LEN = 1000
+DUP_FLAG = 1024
+WRITE_BUFFER = 1024 * 1024
+READ_CHUNK = 64 * 1024
+FASTA_CHUNK = 4 * 1024 * 1024
+FASTA_HEADER = re.compile(rb'^>([^\n]*)\n', re.M)
+CIGAR_QUERY_OPS = re.compile(rb'(\d+)[MIS=X]')
+
+# bigWig file format, using the block sizes and zoom spacing of UCSC bedGraphToBigWig.
+#   Reference: https://genome.ucsc.edu/goldenPath/help/bigWig.html
+BIGWIG_MAGIC = 0x888FFC26
+BIGWIG_VERSION = 4
+CHROM_TREE_MAGIC = 0x78CA8C91
+INDEX_TREE_MAGIC = 0x2468ACE0
+BIGWIG_BLOCK_SIZE = 256
+BIGWIG_ITEMS_PER_SLOT = 1024
+BIGWIG_ZOOM_LEVELS = 10
+BIGWIG_ZOOM_INCREMENT = 4
+BEDGRAPH_SECTION = 1
+BIGWIG_HEADER = struct.Struct('<IHHQQQHHQQIQ')
+ZOOM_HEADER = struct.Struct('<IIQQ')
+TOTAL_SUMMARY = struct.Struct('<Qdddd')
+CHROM_TREE_HEADER = struct.Struct('<IIIIQQ')
+TREE_NODE_HEADER = struct.Struct('<BBH')
+CHROM_TREE_VALUE = struct.Struct('<II')
+INDEX_TREE_HEADER = struct.Struct('<IIQIIIIQII')
+INDEX_LEAF_ITEM = struct.Struct('<IIIIQQ')
+INDEX_NODE_ITEM = struct.Struct('<IIIIQ')
+SECTION_HEADER = struct.Struct('<IIIIIBBH')
+
+# Resource profiling: Efficiency thresholds for flagging provisioning of process labels.
+PROFILE_CPU_OVER = 0.5
+PROFILE_CPU_UNDER = 1.1
+PROFILE_MEM_OVER = 0.3
+PROFILE_MEM_UNDER = 0.9
+PROFILE_LABEL = re.compile(r"^\s*process\s+(\w+)\s*\{|^\s*label\s+'(\w+)'", re.M)
+GB = 1024.0 ** 3
+
+# QC Reports: Name / key columns of input tables, read as text.
+TEXT_COLUMNS = ('name', 'step', 'key', 'peak_set', 'chrom')
+
+# Benchmarks: Compared metrics, and minimum baseline values compared for regressions.
+BENCHMARK_METRICS = ['realtime_s', 'cpu_time_s', 'peak_rss_gb', 'written_gb']
+BENCHMARK_MIN_VALUES = {'realtime_s': 10.0, 'cpu_time_s': 10.0,
+                        'peak_rss_gb': 0.05, 'written_gb': 0.01}
+
+
+def cigar_query_len(cigar):
+    return sum(int(op_len) for op_len in CIGAR_QUERY_OPS.findall(cigar))
+
+
+def mate_query_len(tags):
+    # Mate query length from the "MC" (Mate CIGAR) tag added by samtools fixmate.
+    tag_start = tags.find(b'\tMC:Z:')
+    if tag_start == -1:
+        return None
+    tag_start += 6
+    tag_end = tags.find(b'\t', tag_start)
+    if tag_end == -1:
+        tag_end = len(tags.rstrip())
+    return cigar_query_len(tags[tag_start:tag_end])
+
+
+def parse_mode_outputs(mode_outputs):
+    ret_outputs = []
+    for mode_output in mode_outputs:
+        if '=' not in mode_output:
+            message = 'Output "%s" is not in the format: <mode>=<path>' % mode_output
+            raise ValueError(message)
+        mode, out_path = mode_output.split('=', 1)
+        if mode not in ALN_MODES:
+            message = 'Unknown alignment mode: "%s" (Allowed: %s)' % (
+                mode, ', '.join(ALN_MODES))
+            raise ValueError(message)
+        ret_outputs.append((mode, out_path))
+    return ret_outputs
+
+
+def parse_scaled_outputs(scaled_outputs):
+    ret_outputs = []
+    for scaled_output in scaled_outputs:
+        if '=' not in scaled_output:
+            message = 'Output "%s" is not in the format: <scale>=<path>' % scaled_output
+            raise ValueError(message)
+        scale, out_path = scaled_output.split('=', 1)
+        ret_outputs.append((float(scale), out_path))
+    return ret_outputs
+
+
+def parse_named_inputs(named_inputs):
+    ret_inputs = []
+    for named_input in named_inputs:
+        if '=' not in named_input:
+            message = 'Input "%s" is not in the format: <name>=<path>' % named_input
+            raise ValueError(message)
+        ret_inputs.append(tuple(named_input.split('=', 1)))
+    return ret_inputs
+
+
+def read_chrom_sizes(chrom_sizes_path):
+    chrom_sizes = {}
+    with open(chrom_sizes_path, 'r') as chrom_sizes_file:
+        for line in chrom_sizes_file:
+            if not line.strip():
+                continue
+            chrom, size = line.split()[:2]
+            chrom_sizes[chrom.encode()] = int(size)
+    return chrom_sizes
+
+
+def split_modes(args):
+    mode_outputs = parse_mode_outputs(args.out)
+    if not mode_outputs:
+        raise ValueError('At least one alignment mode output is required.')
+
+    writers = []
+    for mode, out_path in mode_outputs:
+        command = shlex.split(args.samtools)
+        command += ['view', '-h', '--threads', str(args.threads)]
+        if out_path.endswith('.cram'):
+            command += ['-C', '-T', args.reference]
+        elif out_path.endswith('.bam'):
+            command += ['-b']
+        command += ['-o', out_path, '-']
+        print('Writing mode: %s' % mode.ljust(15), '-', ' '.join(command))
+        sys.stdout.flush()
+        proc = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=WRITE_BUFFER)
+        no_dup, only_short = ALN_MODES[mode]
+        writers.append([mode, no_dup, only_short, proc, 0, command])
+
+    # (A mode may have multiple alignment outputs, Ex: CRAM and BAM, but one fragment output)
+    frag_outputs = dict(parse_mode_outputs(args.frag))
+    frag_writers = []
+    for writer in writers:
+        mode = writer[0]
+        if mode in frag_outputs and mode not in [frag_writer[0] for frag_writer in frag_writers]:
+            print('Writing fragments for mode: %s' % mode.ljust(15), '-', frag_outputs[mode])
+            frag_file = open(frag_outputs[mode], 'wb', buffering=WRITE_BUFFER)
+            frag_writers.append([mode, writer[1], writer[2], frag_file, 0])
+
+    # Reference sequence checksums are added to the header (@SQ M5 tags), so they are
+    #   not recomputed from the reference for each CRAM output.
+    seq_md5s = {}
+    if args.seq_md5:
+        with open(args.seq_md5, 'rb') as seq_md5_file:
+            for line in seq_md5_file:
+                if line.strip():
+                    name, length, seq_md5 = line.split()[:3]
+                    seq_md5s[name] = seq_md5
+
+    if args.input == '-':
+        in_file = sys.stdin.buffer
+    else:
+        in_file = open(args.input, 'rb')
+
+    # Fragment lengths: {length: [fragments, duplicate fragments]}
+    frag_hist = {}
+    in_records = 0
+    dup_records = 0
+    try:
+        for line in in_file:
+            if line.startswith(b'@'):
+                if seq_md5s and line.startswith(b'@SQ\t') and b'\tM5:' not in line:
+                    tags = dict(tag.split(b':', 1) for tag in line.rstrip(b'\n').split(b'\t')[1:]
+                                if b':' in tag)
+                    if tags.get(b'SN') in seq_md5s:
+                        line = line.rstrip(b'\n') + b'\tM5:' + seq_md5s[tags[b'SN']] + b'\n'
+                for writer in writers:
+                    writer[3].stdin.write(line)
+                continue
+            in_records += 1
+            fields = line.split(b'\t', 10)
+            is_dup = int(fields[1]) & DUP_FLAG
+            if is_dup:
+                dup_records += 1
+            is_short = len(fields[9]) <= MAX_SHORT_LEN
+            for writer in writers:
+                if (writer[1] and is_dup) or (writer[2] and not is_short):
+                    continue
+                writer[3].stdin.write(line)
+                writer[4] += 1
+
+            # Each properly-paired fragment is written once, from the mate with a positive
+            #   template length (the leftmost 5' end), so fragments remain coordinate-sorted.
+            #   Fragment filter matches: "$1==$4 && $6-$2 < 1000"
+            if fields[6] != b'=':
+                continue
+            frag_len = int(fields[8])
+            if frag_len <= 0:
+                continue
+            if args.frag_hist:
+                if frag_len not in frag_hist:
+                    frag_hist[frag_len] = [0, 0]
+                frag_hist[frag_len][0] += 1
+                if is_dup:
+                    frag_hist[frag_len][1] += 1
+            if not frag_writers or frag_len >= MAX_FRAG_LEN:
+                continue
+            pair_short = False
+            if is_short:
+                mate_len = mate_query_len(fields[10])
+                pair_short = mate_len is not None and mate_len <= MAX_SHORT_LEN
+            frag_start = int(fields[3]) - 1
+            frag_line = b'%s\t%i\t%i\n' % (fields[2], frag_start, frag_start + frag_len)
+            for frag_writer in frag_writers:
+                if (frag_writer[1] and is_dup) or (frag_writer[2] and not pair_short):
+                    continue
+                frag_writer[3].write(frag_line)
+                frag_writer[4] += 1
+    except BrokenPipeError as err:
+        # A writer exited early: wait for all writers, then report the failing mode(s).
+        print('Error: Writing mode "%s" failed: %s' % (writer[0], err), file=sys.stderr)
+        print('    Command: %s' % ' '.join(writer[5]), file=sys.stderr)
+        for writer in writers:
+            try:
+                writer[3].stdin.close()
+            except OSError:
+                pass
+        for mode, _, _, proc, _, command in writers:
+            ret_code = proc.wait()
+            if ret_code != 0:
+                print('Error: Writer for mode "%s" exited with code: %i' % (mode, ret_code),
+                      file=sys.stderr)
+                print('    Command: %s' % ' '.join(command), file=sys.stderr)
+        for frag_writer in frag_writers:
+            frag_writer[3].close()
+        return 1
+
+    if in_file is not sys.stdin.buffer:
+        in_file.close()
+
+    for mode, out_path in parse_mode_outputs(args.count):
+        count = [writer[4] for writer in writers if writer[0] == mode]
+        with open(out_path, 'w') as count_file:
+            count_file.write('%i\n' % (count[0] if count else 0))
+
+    exit_code = 0
+    print('\nInput Alignments: %i' % in_records)
+    for mode, _, _, proc, count, command in writers:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # (Reported from the writer exit code)
+        ret_code = proc.wait()
+        print('Mode: %s Alignments: %i' % (mode.ljust(15), count))
+        if ret_code != 0:
+            print('Error: Writer for mode "%s" exited with code: %i' % (mode, ret_code),
+                  file=sys.stderr)
+            print('    Command: %s' % ' '.join(command), file=sys.stderr)
+            exit_code = ret_code
+    for mode, _, _, frag_file, count in frag_writers:
+        frag_file.close()
+        print('Mode: %s Fragments:  %i' % (mode.ljust(15), count))
+
+    if args.frag_hist:
+        with open(args.frag_hist, 'w') as frag_hist_file:
+            frag_hist_file.write('length\tfragments\tduplicate_fragments\n')
+            for frag_len in sorted(frag_hist):
+                frag_hist_file.write('%i\t%i\t%i\n' % (frag_len, *frag_hist[frag_len]))
+
+    if args.stats:
+        with open(args.stats, 'w') as stats_file:
+            stats_file.write('input_alignments\t%i\n' % in_records)
+            stats_file.write('duplicate_alignments\t%i\n' % dup_records)
+            stats_modes = []
+            for mode, _, _, _, count, _ in writers:
+                if mode not in stats_modes:
+                    stats_modes.append(mode)
+                    stats_file.write('%s.alignments\t%i\n' % (mode, count))
+            for mode, _, _, _, count in frag_writers:
+                stats_file.write('%s.fragments\t%i\n' % (mode, count))
+    return exit_code
+
+
+def alignment_scores(tags):
+    # Return (AS, XS) alignment scores from the optional fields of a record.
+    scores = {}
+    for tag in tags.rstrip().split(b'\t'):
+        if tag[:5] in (b'AS:i:', b'XS:i:'):
+            scores[tag[:2]] = int(tag[5:])
+    return scores.get(b'AS'), scores.get(b'XS')
+
+
+def split_spike(args):
+    prefix = args.prefix.encode()
+    sq_prefix = b'@SQ\tSN:' + prefix
+    if args.input == '-':
+        in_file = sys.stdin.buffer
+    else:
+        in_file = open(args.input, 'rb')
+    if args.output == '-':
+        out_file = sys.stdout.buffer
+    else:
+        out_file = open(args.output, 'wb', buffering=WRITE_BUFFER)
+
+    ref_count = 0
+    spike_count = 0
+    cross_count = 0
+    mixed_count = 0
+    for line in in_file:
+        if line.startswith(b'@'):
+            if not line.startswith(sq_prefix):
+                out_file.write(line)
+            continue
+        fields = line.split(b'\t', 11)
+        if fields[2].startswith(prefix):
+            # Alignments with an equal-scoring alternate alignment (XS >= AS) cannot be 
+            #   uniquely assigned to the spike-in genome, and are counted as cross-mapped.
+            #   (Approximation: Bowtie2 does not report the location of the alternate 
+            #   alignment, so this also counts alignments that are multi-mapped only 
+            #   within the spike-in genome. Separate mode (norm_aln_mode: 'separate') 
+            #   instead counts spike-in alignments that also align to the reference.)
+            spike_count += 1
+            align_score, other_score = alignment_scores(fields[11] if len(fields) > 11 else b'')
+            if other_score is not None and align_score is not None and other_score >= align_score:
+                cross_count += 1
+            continue
+        if fields[6].startswith(prefix):
+            # Reference alignments with a mate aligned to a spike-in contig are removed.
+            mixed_count += 1
+            continue
+        ref_count += 1
+        out_file.write(line)
+
+    if in_file is not sys.stdin.buffer:
+        in_file.close()
+    out_file.flush()
+    if out_file is not sys.stdout.buffer:
+        out_file.close()
+
+    counts = [
+        ('ref_aln', ref_count),
+        ('spike_aln', spike_count),
+        ('cross_aln', cross_count),
+        ('adj_aln', spike_count - cross_count),
+        ('mixed_ref_aln', mixed_count),
+    ]
+    for key, count in counts:
+        print('%s: %i' % (key.ljust(10), count), file=sys.stderr)
+    if args.stats:
+        with open(args.stats, 'w') as stats_file:
+            for key, count in counts:
+                stats_file.write('%s\t%i\n' % (key, count))
+    return 0
+
+
+def new_fasta_record(header, offset, ref_cache=''):
+    name = header.split()[0].decode() if header.split() else ''
+    record = {'name': name, 'offset': offset, 'length': 0, 'line_bases': 0, 'line_width': 0,
+              'last_line': False, 'A': 0, 'C': 0, 'G': 0, 'T': 0, 'cpg': 0, 'last_base': b'',
+              'seq_md5': hashlib.md5(), 'cache_file': None}
+    if ref_cache:
+        record['cache_file'] = tempfile.NamedTemporaryFile(dir=ref_cache, delete=False)
+    return record
+
+
+def finish_fasta_record(record, ref_cache=''):
+    # Sequence checksum (As in the SAM "M5" tag: uppercase, without whitespace), and
+    #   move the cached sequence to its REF_CACHE location: <ref_cache>/%2s/%2s/%s
+    record['seq_md5'] = record['seq_md5'].hexdigest()
+    if record['cache_file'] is not None:
+        record['cache_file'].close()
+        seq_md5 = record['seq_md5']
+        cache_dir = os.path.join(ref_cache, seq_md5[:2], seq_md5[2:4])
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        os.chmod(record['cache_file'].name, 0o644)
+        os.rename(record['cache_file'].name, os.path.join(cache_dir, seq_md5[4:]))
+        record['cache_file'] = None
+
+
+def add_fasta_lines(record, seq_lines):
+    # Add complete sequence lines to a record, checking line lengths as with "samtools faidx".
+    lines = seq_lines.split(b'\n')[:-1]
+    line_lens = list(map(len, lines))
+    if not record['line_bases'] and line_lens:
+        record['line_bases'] = line_lens[0]
+        record['line_width'] = line_lens[0] + 1
+    for line_len in line_lens:
+        if record['last_line'] and line_len:
+            message = 'Sequence "%s" has lines of differing length.' % record['name']
+            raise ValueError(message)
+        if line_len > record['line_bases']:
+            message = 'Sequence "%s" has lines of differing length.' % record['name']
+            raise ValueError(message)
+        if line_len < record['line_bases']:
+            record['last_line'] = True
+
+    seq = b''.join(lines).upper()
+    if b'\r' in seq:
+        raise ValueError('Fasta files with Windows (CRLF) line endings are not supported.')
+    record['seq_md5'].update(seq)
+    if record['cache_file'] is not None:
+        record['cache_file'].write(seq)
+    record['length'] += len(seq)
+    for base in 'ACGT':
+        record[base] += seq.count(base.encode())
+    record['cpg'] += seq.count(b'CG')
+    if record['last_base'] == b'C' and seq[:1] == b'G':
+        record['cpg'] += 1
+    if seq:
+        record['last_base'] = seq[-1:]
+
+
+def prep_ref(args):
+    if args.input == '-':
+        in_file = sys.stdin.buffer
+    else:
+        in_file = open(args.input, 'rb')
+    out_fasta = None
+    if args.out_fasta:
+        out_fasta = open(args.out_fasta, 'wb', buffering=WRITE_BUFFER)
+
+    if args.ref_cache and not os.path.isdir(args.ref_cache):
+        os.makedirs(args.ref_cache)
+    md5 = hashlib.md5()
+    records = []
+    record = None
+    offset = 0
+    partial = b''
+    while True:
+        chunk = in_file.read(FASTA_CHUNK)
+        if chunk:
+            md5.update(chunk)
+            if out_fasta is not None:
+                out_fasta.write(chunk)
+            block = partial + chunk
+            line_end = block.rfind(b'\n') + 1
+            block, partial = block[:line_end], block[line_end:]
+        else:
+            block, partial = partial, b''
+            if block and not block.endswith(b'\n'):
+                block += b'\n'
+        if not block:
+            if not chunk:
+                break
+            continue
+
+        # Split each block at sequence headers, offsets are relative to the start of the file.
+        seq_start = 0
+        for header in FASTA_HEADER.finditer(block):
+            if record is not None:
+                add_fasta_lines(record, block[seq_start:header.start()])
+                finish_fasta_record(record, args.ref_cache)
+            elif header.start():
+                raise ValueError('Fasta file does not begin with a sequence header (">").')
+            record = new_fasta_record(header.group(1), offset + header.end(), args.ref_cache)
+            records.append(record)
+            seq_start = header.end()
+        if record is None:
+            raise ValueError('Fasta file does not begin with a sequence header (">").')
+        add_fasta_lines(record, block[seq_start:])
+        offset += len(block)
+        if not chunk:
+            break
+
+    if record is not None:
+        finish_fasta_record(record, args.ref_cache)
+    if in_file is not sys.stdin.buffer:
+        in_file.close()
+    if out_fasta is not None:
+        out_fasta.close()
+
+    names = [record['name'] for record in records]
+    if len(set(names)) != len(names):
+        raise ValueError('Fasta file has duplicate sequence names.')
+    if args.faidx:
+        with open(args.faidx, 'w') as faidx_file:
+            for record in records:
+                faidx_file.write('%s\t%i\t%i\t%i\t%i\n' % (
+                    record['name'], record['length'], record['offset'],
+                    record['line_bases'], record['line_width']))
+    if args.chrom_sizes:
+        with open(args.chrom_sizes, 'w') as chrom_sizes_file:
+            for record in records:
+                chrom_sizes_file.write('%s\t%i\n' % (record['name'], record['length']))
+
+    totals = dict((key, sum(record[key] for record in records))
+                  for key in ['length', 'A', 'C', 'G', 'T', 'cpg'])
+    total_n = totals['length'] - sum(totals[base] for base in 'ACGT')
+    if args.facount:
+        # Same format as UCSC faCount (Non-ACGT bases are counted as "N")
+        with open(args.facount, 'w') as facount_file:
+            facount_file.write('#seq\tlen\tA\tC\tG\tT\tN\tcpg\n')
+            for record in records + [dict(totals, name='total')]:
+                bases = [record[base] for base in 'ACGT']
+                facount_file.write('%s\t%i\t%s\t%i\t%i\n' % (
+                    record['name'], record['length'], '\t'.join(str(count) for count in bases),
+                    record['length'] - sum(bases), record['cpg']))
+    if args.eff_genome:
+        with open(args.eff_genome, 'w') as eff_genome_file:
+            eff_genome_file.write('%i\n' % (totals['length'] - total_n))
+    if args.md5:
+        with open(args.md5, 'w') as md5_file:
+            md5_file.write('%s\n' % md5.hexdigest())
+    if args.seq_md5:
+        with open(args.seq_md5, 'w') as seq_md5_file:
+            for record in records:
+                seq_md5_file.write('%s\t%i\t%s\n' % (
+                    record['name'], record['length'], record['seq_md5']))
+
+    print('Sequences:             %i' % len(records))
+    print('Total Length:          %i' % totals['length'])
+    print('Effective Genome Size: %i - %i = %i' % (totals['length'], total_n,
+                                                   totals['length'] - total_n))
+    print('Checksum (md5):        %s' % md5.hexdigest())
+    return 0
+
+
+def open_read_fds(in_paths):
+    # Named pipes block on open until a writer connects, so inputs are opened
+    #   concurrently to avoid depending on the order used by the writer.
+    in_fds = [None] * len(in_paths)
+
+    def open_fd(index):
+        in_fds[index] = os.open(in_paths[index], os.O_RDONLY)
+
+    threads = [threading.Thread(target=open_fd, args=(index,)) for index in range(len(in_paths))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if None in in_fds:
+        raise OSError('Could not open all inputs: %s' % ', '.join(in_paths))
+    return in_fds
+
+
+def interleave(args):
+    # Both inputs are drained as data becomes available, rather than in lockstep,
+    #   so a writer that buffers each file separately (Ex: Trimmomatic) cannot
+    #   block on a full pipe while this reader waits on the other file.
+    in_fds = open_read_fds([args.in_1, args.in_2])
+    if args.output == '-':
+        out_file = sys.stdout.buffer
+    else:
+        out_file = open(args.output, 'wb', buffering=WRITE_BUFFER)
+
+    partial = [b'', b'']
+    lines = [[], []]
+    open_fds = list(in_fds)
+    pair_count = 0
+    while open_fds:
+        ready_fds, _, _ = select.select(open_fds, [], [])
+        for in_fd in ready_fds:
+            index = in_fds.index(in_fd)
+            chunk = os.read(in_fd, READ_CHUNK)
+            if not chunk:
+                open_fds.remove(in_fd)
+                os.close(in_fd)
+                if partial[index]:
+                    lines[index].append(partial[index])
+                    partial[index] = b''
+                continue
+            chunk_lines = (partial[index] + chunk).split(b'\n')
+            partial[index] = chunk_lines.pop()
+            lines[index].extend(chunk_lines)
+
+        # Write all complete record pairs (4 lines per record).
+        num_lines = (min(len(lines[0]), len(lines[1])) // 4) * 4
+        if num_lines:
+            out_lines = []
+            for line_num in range(0, num_lines, 4):
+                out_lines.extend(lines[0][line_num:line_num + 4])
+                out_lines.extend(lines[1][line_num:line_num + 4])
+            out_file.write(b'\n'.join(out_lines) + b'\n')
+            del lines[0][:num_lines]
+            del lines[1][:num_lines]
+            pair_count += num_lines // 4
+
+    out_file.flush()
+    if out_file is not sys.stdout.buffer:
+        out_file.close()
+    print('Interleaved Read Pairs: %i' % pair_count, file=sys.stderr)
+    if lines[0] or lines[1]:
+        message = 'Paired inputs have unequal or incomplete records (R1: %i, R2: %i lines remain).' % (
+            len(lines[0]), len(lines[1]))
+        raise ValueError(message)
+    return 0
+
+
+def chrom_coverage(np, starts, ends, chrom_size):
+    # Sweep fragment start (+1) and end (-1) events to get runs of constant depth.
+    starts = np.clip(np.frombuffer(starts, dtype=np.int64), 0, chrom_size)
+    ends = np.clip(np.frombuffer(ends, dtype=np.int64), 0, chrom_size)
+    keep = starts < ends
+    starts, ends = starts[keep], ends[keep]
+    if not starts.size:
+        return None
+    events = np.concatenate((starts, ends))
+    weights = np.concatenate((np.ones(starts.size, dtype=np.int64),
+                              np.full(ends.size, -1, dtype=np.int64)))
+    positions, event_index = np.unique(events, return_inverse=True)
+    deltas = np.bincount(event_index, weights=weights).astype(np.int64)
+    changed = deltas != 0
+    positions, deltas = positions[changed], deltas[changed]
+    depths = np.cumsum(deltas)[:-1]
+    run_starts, run_ends = positions[:-1], positions[1:]
+    covered = depths > 0
+    return run_starts[covered], run_ends[covered], depths[covered]
+
+
+def write_coverage(writers, chrom, runs):
+    run_starts, run_ends, depths = runs
+    chrom = chrom.decode()
+    run_starts, run_ends = run_starts.tolist(), run_ends.tolist()
+    for scale, out_file in writers:
+        if scale is None:
+            values = ['%i' % depth for depth in depths.tolist()]
+        else:
+            values = ['%g' % value for value in (depths * scale).tolist()]
+        out_file.write(''.join(
+            '%s\t%i\t%i\t%s\n' % (chrom, start, end, value)
+            for start, end, value in zip(run_starts, run_ends, values)
+        ))
+
+
+def split_runs(np, runs, bin_size):
+    # Split runs at the edges of fixed bins of "bin_size" bases.
+    run_starts, run_ends, _ = runs
+    first_bins = run_starts // bin_size
+    bin_counts = (run_ends - 1) // bin_size - first_bins + 1
+    run_index = np.repeat(np.arange(run_starts.size), bin_counts)
+    bin_offsets = np.arange(run_index.size) - np.repeat(np.cumsum(bin_counts) - bin_counts, bin_counts)
+    bins = first_bins[run_index] + bin_offsets
+    bases = (np.minimum(run_ends[run_index], (bins + 1) * bin_size)
+             - np.maximum(run_starts[run_index], bins * bin_size))
+    return bins, bases, run_index
+
+
+def zoom_records(np, chrom_id, chrom_size, runs, values, reduction):
+    # Summarize runs over fixed bins of "reduction" bases.
+    bins, bases, run_index = split_runs(np, runs, reduction)
+    piece_values = values[run_index]
+    group_starts = np.concatenate(([0], np.flatnonzero(np.diff(bins)) + 1))
+
+    records = np.zeros(group_starts.size, dtype=[
+        ('chrom_id', '<u4'), ('start', '<u4'), ('end', '<u4'), ('valid_count', '<u4'),
+        ('min_val', '<f4'), ('max_val', '<f4'), ('sum_data', '<f4'), ('sum_squares', '<f4'),
+    ])
+    records['chrom_id'] = chrom_id
+    records['start'] = bins[group_starts] * reduction
+    records['end'] = np.minimum(records['start'].astype(np.int64) + reduction, chrom_size)
+    records['valid_count'] = np.add.reduceat(bases, group_starts)
+    records['min_val'] = np.minimum.reduceat(piece_values, group_starts)
+    records['max_val'] = np.maximum.reduceat(piece_values, group_starts)
+    records['sum_data'] = np.add.reduceat(piece_values * bases, group_starts)
+    records['sum_squares'] = np.add.reduceat(piece_values * piece_values * bases, group_starts)
+    return records
+
+
+def binned_coverage(np, runs, values, chrom_size, bin_size):
+    # Mean coverage of each fixed-width bin (the last bin is truncated at the chromosome end).
+    num_bins = -(-chrom_size // bin_size)
+    bins, bases, run_index = split_runs(np, runs, bin_size)
+    binned = np.bincount(bins, weights=(values[run_index] * bases), minlength=num_bins)
+    bin_lengths = np.full(num_bins, bin_size, dtype=np.int64)
+    bin_lengths[-1] = chrom_size - (num_bins - 1) * bin_size
+    return (binned / bin_lengths).astype(np.float32)
+
+
+def binned_runs(np, binned, chrom_size, bin_size):
+    # Convert binned coverage into runs of constant coverage, merging equal adjacent bins.
+    changed = np.ones(binned.size, dtype=bool)
+    changed[1:] = binned[1:] != binned[:-1]
+    first_bins = np.flatnonzero(changed)
+    end_bins = np.append(first_bins[1:], binned.size)
+    values = binned[first_bins]
+    keep = values != 0
+    run_starts = first_bins[keep].astype(np.int64) * bin_size
+    run_ends = np.minimum(end_bins[keep].astype(np.int64) * bin_size, chrom_size)
+    return run_starts, run_ends, values[keep].astype(np.float64)
+
+
+class BinnedWriter(object):
+    """
+    Write binned coverage to a NumPy (.npz) archive, one chromosome at a time.
+
+    Archive contents:
+        bin_size       : Bin width (bases)
+        chroms         : Names of chromosomes with coverage
+        chrom_sizes    : Sizes of chromosomes with coverage
+        coverage_<N>   : Mean coverage of each bin (float32) for chroms[N]
+    """
+
+    def __init__(self, np, out_path, bin_size, scale=None):
+        self.np = np
+        self.bin_size = bin_size
+        self.scale = scale
+        self.chroms = []
+        self.chrom_sizes = []
+        self.out_file = zipfile.ZipFile(out_path, 'w', compression=zipfile.ZIP_DEFLATED,
+                                        allowZip64=True)
+
+    def write_array(self, key, array):
+        with self.out_file.open(key + '.npy', 'w', force_zip64=True) as array_file:
+            self.np.lib.format.write_array(array_file, self.np.asanyarray(array))
+
+    def add_binned(self, chrom, chrom_size, binned):
+        self.write_array('coverage_%i' % len(self.chroms), binned)
+        self.chroms.append(chrom.decode())
+        self.chrom_sizes.append(chrom_size)
+
+    def add_chrom(self, chrom, chrom_size, runs):
+        values = runs[2].astype(self.np.float64)
+        if self.scale is not None:
+            values *= self.scale
+        self.add_binned(chrom, chrom_size,
+                        binned_coverage(self.np, runs, values, chrom_size, self.bin_size))
+
+    def close(self):
+        self.write_array('bin_size', self.bin_size)
+        self.write_array('chroms', self.np.array(self.chroms, dtype=str))
+        self.write_array('chrom_sizes', self.np.array(self.chrom_sizes, dtype=self.np.int64))
+        self.out_file.close()
+
+
+def bigwig_reductions(num_runs, num_bases, max_chrom_size):
+    # As with bedGraphToBigWig, the first zoom level summarizes ~10 average runs,
+    #   and each further level is 4-fold coarser.
+    reductions = []
+    if not num_runs:
+        return reductions
+    reduction = max(int(num_bases / num_runs) * 10, 10)
+    while len(reductions) < BIGWIG_ZOOM_LEVELS and reduction < max_chrom_size:
+        reductions.append(reduction)
+        reduction *= BIGWIG_ZOOM_INCREMENT
+    return reductions
+
+
+def write_chrom_tree(out_file, chroms, chrom_sizes):
+    # All chromosomes are written to a single leaf node.
+    if len(chroms) > 0xFFFF:
+        raise ValueError('Too many chromosomes for bigWig output: %i' % len(chroms))
+    key_size = max([len(chrom) for chrom in chroms] + [1])
+    out_file.write(CHROM_TREE_HEADER.pack(CHROM_TREE_MAGIC, max(len(chroms), 1), key_size,
+                                          CHROM_TREE_VALUE.size, len(chroms), 0))
+    out_file.write(TREE_NODE_HEADER.pack(1, 0, len(chroms)))
+    for chrom_id, chrom in enumerate(chroms):
+        out_file.write(chrom.ljust(key_size, b'\0'))
+        out_file.write(CHROM_TREE_VALUE.pack(chrom_id, chrom_sizes[chrom]))
+
+
+def write_index_tree(out_file, items, end_file_offset):
+    # Write an R-tree index of (start_chrom, start, end_chrom, end, offset, size) block items.
+    #   Nodes are padded to the full block size, so all node offsets are known before writing.
+    def node_bounds(first_bounds, last_bounds):
+        return first_bounds[:2] + last_bounds[2:4]
+
+    leaves = [items[first:first + BIGWIG_BLOCK_SIZE]
+              for first in range(0, len(items), BIGWIG_BLOCK_SIZE)] or [[]]
+    levels = [[(node_bounds(leaf[0], leaf[-1]) if leaf else (0, 0, 0, 0), leaf)
+               for leaf in leaves]]
+    while len(levels[0]) > 1:
+        children = levels[0]
+        parents = []
+        for first in range(0, len(children), BIGWIG_BLOCK_SIZE):
+            child_indexes = range(first, min(first + BIGWIG_BLOCK_SIZE, len(children)))
+            bounds = node_bounds(children[child_indexes[0]][0], children[child_indexes[-1]][0])
+            parents.append((bounds, child_indexes))
+        levels.insert(0, parents)
+
+    out_file.write(INDEX_TREE_HEADER.pack(INDEX_TREE_MAGIC, BIGWIG_BLOCK_SIZE, len(items),
+                                          *(levels[0][0][0] + (end_file_offset, 1, 0))))
+    node_sizes = [TREE_NODE_HEADER.size + BIGWIG_BLOCK_SIZE * INDEX_NODE_ITEM.size] * (len(levels) - 1)
+    node_sizes.append(TREE_NODE_HEADER.size + BIGWIG_BLOCK_SIZE * INDEX_LEAF_ITEM.size)
+    level_offset = out_file.tell()
+    for level_num, level in enumerate(levels):
+        child_level_offset = level_offset + len(level) * node_sizes[level_num]
+        is_leaf = (level_num == len(levels) - 1)
+        for bounds, children in level:
+            out_file.write(TREE_NODE_HEADER.pack(int(is_leaf), 0, len(children)))
+            if is_leaf:
+                for item in children:
+                    out_file.write(INDEX_LEAF_ITEM.pack(*item))
+                item_size = INDEX_LEAF_ITEM.size
+            else:
+                for child_index in children:
+                    child_offset = child_level_offset + child_index * node_sizes[level_num + 1]
+                    child_bounds = levels[level_num + 1][child_index][0]
+                    out_file.write(INDEX_NODE_ITEM.pack(*(child_bounds + (child_offset,))))
+                item_size = INDEX_NODE_ITEM.size
+            out_file.write(b'\0' * ((BIGWIG_BLOCK_SIZE - len(children)) * item_size))
+        level_offset = child_level_offset
+
+
+class BigWigWriter(object):
+    """
+    Write a bigWig file from runs of constant coverage, added in chromosome order.
+
+    Data sections and zoom levels are built as runs are added, with zoom blocks
+    held in temporary files until the main data and index are complete.
+    """
+
+    def __init__(self, np, out_path, chroms, chrom_sizes, reductions, scale=None):
+        self.np = np
+        self.scale = scale
+        self.chrom_sizes = chrom_sizes
+        self.chrom_ids = {chrom: chrom_id for chrom_id, chrom in enumerate(chroms)}
+        self.reductions = reductions
+        self.out_file = open(out_path, 'w+b', buffering=WRITE_BUFFER)
+        tmp_dir = os.path.dirname(os.path.abspath(out_path))
+        self.zoom_files = [tempfile.TemporaryFile(dir=tmp_dir) for _ in reductions]
+        self.zoom_items = [[] for _ in reductions]
+        self.zoom_counts = [0 for _ in reductions]
+        self.data_items = []
+        self.max_block_size = 0
+        self.summary = [0, float('inf'), float('-inf'), 0.0, 0.0]
+
+        # Header, zoom headers, and summary are written once all offsets are known.
+        self.out_file.write(b'\0' * (BIGWIG_HEADER.size + ZOOM_HEADER.size * len(reductions)
+                                     + TOTAL_SUMMARY.size))
+        self.chrom_tree_offset = self.out_file.tell()
+        write_chrom_tree(self.out_file, chroms, chrom_sizes)
+        self.data_offset = self.out_file.tell()
+        self.out_file.write(struct.pack('<Q', 0))
+
+    def write_block(self, out_file, data):
+        offset = out_file.tell()
+        compressed = zlib.compress(data)
+        out_file.write(compressed)
+        self.max_block_size = max(self.max_block_size, len(data))
+        return offset, len(compressed)
+
+    def add_chrom(self, chrom, runs):
+        np = self.np
+        chrom_id = self.chrom_ids[chrom]
+        run_starts, run_ends, depths = runs
+        values = depths.astype(np.float64)
+        if self.scale is not None:
+            values *= self.scale
+        bases = run_ends - run_starts
+        self.summary[0] += int(bases.sum())
+        self.summary[1] = min(self.summary[1], float(values.min()))
+        self.summary[2] = max(self.summary[2], float(values.max()))
+        self.summary[3] += float((values * bases).sum())
+        self.summary[4] += float((values * values * bases).sum())
+
+        items = np.empty(run_starts.size, dtype=[('start', '<u4'), ('end', '<u4'), ('value', '<f4')])
+        items['start'], items['end'], items['value'] = run_starts, run_ends, values
+        for first in range(0, items.size, BIGWIG_ITEMS_PER_SLOT):
+            section = items[first:first + BIGWIG_ITEMS_PER_SLOT]
+            start, end = int(section['start'][0]), int(section['end'][-1])
+            header = SECTION_HEADER.pack(chrom_id, start, end, 0, 0, BEDGRAPH_SECTION, 0, section.size)
+            offset, size = self.write_block(self.out_file, header + section.tobytes())
+            self.data_items.append((chrom_id, start, chrom_id, end, offset, size))
+
+        for level, reduction in enumerate(self.reductions):
+            records = zoom_records(np, chrom_id, self.chrom_sizes[chrom], runs, values, reduction)
+            for first in range(0, records.size, BIGWIG_ITEMS_PER_SLOT):
+                block = records[first:first + BIGWIG_ITEMS_PER_SLOT]
+                start, end = int(block['start'][0]), int(block['end'][-1])
+                offset, size = self.write_block(self.zoom_files[level], block.tobytes())
+                self.zoom_items[level].append((chrom_id, start, chrom_id, end, offset, size))
+            self.zoom_counts[level] += records.size
+
+    def close(self):
+        out_file = self.out_file
+        index_offset = out_file.tell()
+        write_index_tree(out_file, self.data_items, index_offset)
+
+        zoom_headers = []
+        for level, reduction in enumerate(self.reductions):
+            zoom_data_offset = out_file.tell()
+            out_file.write(struct.pack('<I', self.zoom_counts[level]))
+            base_offset = out_file.tell()
+            self.zoom_files[level].seek(0)
+            shutil.copyfileobj(self.zoom_files[level], out_file)
+            self.zoom_files[level].close()
+            zoom_index_offset = out_file.tell()
+            zoom_items = [item[:4] + (base_offset + item[4], item[5])
+                          for item in self.zoom_items[level]]
+            write_index_tree(out_file, zoom_items, zoom_index_offset)
+            zoom_headers.append(ZOOM_HEADER.pack(reduction, 0, zoom_data_offset, zoom_index_offset))
+        out_file.write(struct.pack('<I', BIGWIG_MAGIC))
+
+        if not self.summary[0]:
+            self.summary[1:3] = [0.0, 0.0]
+        summary_offset = BIGWIG_HEADER.size + ZOOM_HEADER.size * len(self.reductions)
+        out_file.seek(0)
+        out_file.write(BIGWIG_HEADER.pack(
+            BIGWIG_MAGIC, BIGWIG_VERSION, len(self.reductions), self.chrom_tree_offset,
+            self.data_offset, index_offset, 0, 0, 0, summary_offset, self.max_block_size, 0))
+        out_file.write(b''.join(zoom_headers))
+        out_file.write(TOTAL_SUMMARY.pack(*self.summary))
+        out_file.seek(self.data_offset)
+        out_file.write(struct.pack('<Q', len(self.data_items)))
+        out_file.close()
+
+
+def coverage(args):
+    import array
+    import numpy as np
+
+    outputs = parse_scaled_outputs(args.scaled)
+    if args.out:
+        outputs.insert(0, (None, args.out))
+    bigwig_outputs = parse_scaled_outputs(args.bigwig)
+    binned_outputs = parse_scaled_outputs(args.binned)
+    if not outputs and not bigwig_outputs and not binned_outputs:
+        raise ValueError('At least one raw (--out), scaled (--scaled), bigWig (--bigwig), '
+                         + 'or binned (--binned) output is required.')
+    if binned_outputs and args.bin_size < 1:
+        raise ValueError('A bin size (--bin-size) is required for binned (--binned) output.')
+    chrom_sizes = read_chrom_sizes(args.chrom_sizes)
+
+    if args.input == '-':
+        in_file = sys.stdin.buffer
+    else:
+        in_file = open(args.input, 'rb')
+
+    # Runs for each chromosome are spooled to disk in a compact binary form,
+    #   so outputs can be written in "LC_ALL=C sort -k1,1 -k2,2n" order
+    #   regardless of the chromosome order of the input fragments.
+    spool_root = os.path.dirname(os.path.abspath((outputs + bigwig_outputs + binned_outputs)[0][1]))
+    spool_dir = tempfile.mkdtemp(prefix='.coverage_spool.', dir=spool_root)
+    spool_paths = {}
+    num_runs, num_bases = 0, 0
+    # Chromosome Statistics: {chrom: [fragments, covered bases, total depth]}
+    chrom_stats = {}
+
+    def spool_chrom(chrom, starts, ends):
+        runs = chrom_coverage(np, starts, ends, chrom_sizes[chrom])
+        if runs is None:
+            return 0, 0
+        chrom_stats[chrom] = [len(starts), int((runs[1] - runs[0]).sum()),
+                              int(((runs[1] - runs[0]) * runs[2]).sum())]
+        spool_paths[chrom] = os.path.join(spool_dir, '%i.npy' % len(spool_paths))
+        np.save(spool_paths[chrom], np.stack(runs).astype(np.uint32))
+        return runs[0].size, int((runs[1] - runs[0]).sum())
+
+    seen_chroms = set()
+    skipped_chroms = set()
+    chrom, starts, ends = None, array.array('q'), array.array('q')
+    frag_count = 0
+    try:
+        for line in in_file:
+            fields = line.split(b'\t', 3)
+            if len(fields) < 3:
+                continue
+            if fields[0] != chrom:
+                if chrom in chrom_sizes:
+                    chrom_runs, chrom_bases = spool_chrom(chrom, starts, ends)
+                    num_runs, num_bases = num_runs + chrom_runs, num_bases + chrom_bases
+                chrom, starts, ends = fields[0], array.array('q'), array.array('q')
+                if chrom in seen_chroms:
+                    message = 'Fragments for chromosome "%s" are not grouped together.' % chrom.decode()
+                    raise ValueError(message)
+                seen_chroms.add(chrom)
+            if chrom not in chrom_sizes:
+                skipped_chroms.add(chrom)
+                continue
+            frag_count += 1
+            starts.append(int(fields[1]))
+            ends.append(int(fields[2]))
+        if chrom in chrom_sizes:
+            chrom_runs, chrom_bases = spool_chrom(chrom, starts, ends)
+            num_runs, num_bases = num_runs + chrom_runs, num_bases + chrom_bases
+        if in_file is not sys.stdin.buffer:
+            in_file.close()
+
+        writers = []
+        for scale, out_path in outputs:
+            print('Writing coverage:', ('raw' if scale is None else 'scale=%g' % scale).ljust(15),
+                  '-', out_path)
+            writers.append((scale, open(out_path, 'w', buffering=WRITE_BUFFER)))
+        out_chroms = sorted(chrom_sizes)
+        reductions = bigwig_reductions(num_runs, num_bases,
+                                       max([chrom_sizes[chrom] for chrom in spool_paths] + [0]))
+        bigwig_writers = []
+        for scale, out_path in bigwig_outputs:
+            print('Writing bigWig:  ', ('scale=%g' % scale).ljust(15), '-', out_path)
+            bigwig_writers.append(BigWigWriter(np, out_path, out_chroms, chrom_sizes, reductions, scale))
+        binned_writers = []
+        for scale, out_path in binned_outputs:
+            print('Writing binned:  ', ('scale=%g' % scale).ljust(15), '-', out_path,
+                  '(Bin Size: %i)' % args.bin_size)
+            binned_writers.append(BinnedWriter(np, out_path, args.bin_size, scale))
+
+        for out_chrom in out_chroms:
+            if out_chrom not in spool_paths:
+                continue
+            runs = tuple(np.load(spool_paths[out_chrom]).astype(np.int64))
+            os.remove(spool_paths[out_chrom])
+            write_coverage(writers, out_chrom, runs)
+            for bigwig_writer in bigwig_writers:
+                bigwig_writer.add_chrom(out_chrom, runs)
+            for binned_writer in binned_writers:
+                binned_writer.add_chrom(out_chrom, chrom_sizes[out_chrom], runs)
+
+        for _, out_file in writers:
+            out_file.close()
+        for bigwig_writer in bigwig_writers:
+            bigwig_writer.close()
+        for binned_writer in binned_writers:
+            binned_writer.close()
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+
+    if args.chrom_stats:
+        with open(args.chrom_stats, 'w') as chrom_stats_file:
+            chrom_stats_file.write('chrom\tsize\tfragments\tcovered_bases\tmean_depth\n')
+            for out_chrom in sorted(chrom_sizes):
+                fragments, covered_bases, total_depth = chrom_stats.get(out_chrom, [0, 0, 0])
+                chrom_stats_file.write('%s\t%i\t%i\t%i\t%.6g\n' % (
+                    out_chrom.decode(), chrom_sizes[out_chrom], fragments, covered_bases,
+                    total_depth / max(chrom_sizes[out_chrom], 1)))
+
+    for skipped_chrom in sorted(skipped_chroms):
+        print('Warning: Chromosome "%s" not in chromosome sizes file, skipped.'
+              % skipped_chrom.decode(), file=sys.stderr)
+    print('\nInput Fragments: %i' % frag_count)
+    print('Output Order: LC_ALL=C sort -k1,1 -k2,2n')
+    return 0
+
+
+def binned(args):
+    import numpy as np
+
+    if not args.out and not args.bigwig:
+        raise ValueError('At least one binned (--out) or bigWig (--bigwig) output is required.')
+    scale = args.scale
+    with np.load(args.input) as in_binned:
+        bin_size = int(in_binned['bin_size'])
+        chroms = [chrom.encode() for chrom in in_binned['chroms'].tolist()]
+        chrom_sizes = dict(zip(chroms, in_binned['chrom_sizes'].tolist()))
+        chrom_keys = dict((chrom, 'coverage_%i' % index) for index, chrom in enumerate(chroms))
+        print('Input Binned Coverage:', args.input, '(Bin Size: %i)' % bin_size)
+
+        binned_writer = None
+        if args.out:
+            print('Writing binned:  ', ('scale=%g' % scale).ljust(15), '-', args.out)
+            binned_writer = BinnedWriter(np, args.out, bin_size)
+        bigwig_writer = None
+        if args.bigwig:
+            num_runs, num_bases = 0, 0
+            for chrom in chroms:
+                runs = binned_runs(np, in_binned[chrom_keys[chrom]], chrom_sizes[chrom], bin_size)
+                num_runs += runs[0].size
+                num_bases += int((runs[1] - runs[0]).sum())
+            reductions = bigwig_reductions(num_runs, num_bases, max(list(chrom_sizes.values()) + [0]))
+            print('Writing bigWig:  ', ('scale=%g' % scale).ljust(15), '-', args.bigwig)
+            bigwig_writer = BigWigWriter(np, args.bigwig, sorted(chroms), chrom_sizes, reductions, scale)
+
+        for chrom in sorted(chroms):
+            chrom_binned = in_binned[chrom_keys[chrom]]
+            if binned_writer is not None:
+                binned_writer.add_binned(chrom, chrom_sizes[chrom],
+                                         (chrom_binned * scale).astype(np.float32))
+            if bigwig_writer is not None:
+                bigwig_writer.add_chrom(chrom, binned_runs(np, chrom_binned, chrom_sizes[chrom], bin_size))
+        if binned_writer is not None:
+            binned_writer.close()
+        if bigwig_writer is not None:
+            bigwig_writer.close()
+    return 0
+
+
+def read_peaks(np, peaks_path):
+    # Read peak intervals (bed-like) into merged, sorted intervals for each chromosome.
+    chrom_peaks = {}
+    num_peaks = 0
+    with open(peaks_path, 'rb') as peaks_file:
+        for line in peaks_file:
+            fields = line.split(b'\t', 3)
+            if len(fields) < 3 or line.startswith((b'#', b'track', b'browser')):
+                continue
+            if not fields[1].isdigit():
+                continue
+            chrom_peaks.setdefault(fields[0], []).append((int(fields[1]), int(fields[2])))
+            num_peaks += 1
+    merged_peaks = {}
+    peak_bases = 0
+    for chrom, peaks in chrom_peaks.items():
+        peaks.sort()
+        merged = [list(peaks[0])]
+        for start, end in peaks[1:]:
+            if start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        merged = np.array(merged, dtype=np.int64)
+        peak_bases += int((merged[:, 1] - merged[:, 0]).sum())
+        merged_peaks[chrom] = (merged[:, 0], merged[:, 1])
+    return merged_peaks, num_peaks, peak_bases
+
+
+def frip(args):
+    import array
+    import numpy as np
+
+    peak_sets = parse_named_inputs(args.peaks)
+    all_peaks = []
+    for peak_set, peaks_path in peak_sets:
+        merged_peaks, num_peaks, peak_bases = read_peaks(np, peaks_path)
+        print('Peak Set: %s' % peak_set.ljust(20), '-', peaks_path, '(Peaks: %i)' % num_peaks)
+        all_peaks.append([peak_set, merged_peaks, num_peaks, peak_bases, 0])
+
+    def count_chrom(chrom, starts, ends):
+        # A fragment overlaps a peak if the first peak ending after the fragment start
+        #   also begins before the fragment end.
+        starts = np.frombuffer(starts, dtype=np.int64)
+        ends = np.frombuffer(ends, dtype=np.int64)
+        for peak_info in all_peaks:
+            if chrom not in peak_info[1]:
+                continue
+            peak_starts, peak_ends = peak_info[1][chrom]
+            peak_index = np.searchsorted(peak_ends, starts, side='right')
+            in_range = peak_index < peak_ends.size
+            overlaps = np.zeros(starts.size, dtype=bool)
+            overlaps[in_range] = peak_starts[peak_index[in_range]] < ends[in_range]
+            peak_info[4] += int(overlaps.sum())
+
+    if args.frags == '-':
+        in_file = sys.stdin.buffer
+    else:
+        in_file = open(args.frags, 'rb')
+    chrom, starts, ends = None, array.array('q'), array.array('q')
+    frag_count = 0
+    for line in in_file:
+        fields = line.split(b'\t', 3)
+        if len(fields) < 3:
+            continue
+        if fields[0] != chrom:
+            count_chrom(chrom, starts, ends)
+            chrom, starts, ends = fields[0], array.array('q'), array.array('q')
+        frag_count += 1
+        starts.append(int(fields[1]))
+        ends.append(int(fields[2]))
+    count_chrom(chrom, starts, ends)
+    if in_file is not sys.stdin.buffer:
+        in_file.close()
+
+    print('\nInput Fragments: %i' % frag_count)
+    with open(args.out, 'w') as out_file:
+        out_file.write('name\tpeak_set\tpeaks\tpeak_bases\tfragments\tfragments_in_peaks\tfrip\n')
+        for peak_set, _, num_peaks, peak_bases, in_peaks in all_peaks:
+            use_frip = in_peaks / frag_count if frag_count else 0.0
+            print('Peak Set: %s FRiP: %.4f (%i / %i)' % (peak_set.ljust(20), use_frip,
+                                                       in_peaks, frag_count))
+            out_file.write('%s\t%s\t%i\t%i\t%i\t%i\t%.6f\n' % (
+                args.name, peak_set, num_peaks, peak_bases, frag_count, in_peaks, use_frip))
+    return 0
+
+
+def read_table(in_path, text_columns=TEXT_COLUMNS):
+    # Read a tab-separated table with a header line, converting numeric values
+    #   (Except for name / key columns, Ex: a sample named "001").
+    rows = []
+    with open(in_path) as in_file:
+        header = in_file.readline().rstrip('\n').split('\t')
+        for line in in_file:
+            if not line.strip():
+                continue
+            values = []
+            for column, value in zip(header, line.rstrip('\n').split('\t')):
+                if column in text_columns:
+                    values.append(value)
+                    continue
+                for convert in (int, float):
+                    try:
+                        value = convert(value)
+                        break
+                    except ValueError:
+                        pass
+                values.append(value)
+            rows.append(dict(zip(header, values)))
+    return rows
+
+
+def qc_report(args):
+    samples = {}
+
+    def get_sample(name):
+        if name not in samples:
+            samples[name] = {'stats': {}, 'fragment_lengths': {},
+                             'duplicate_fragment_lengths': {}, 'frip': {}}
+        return samples[name]
+
+    for stats_path in args.stats:
+        for row in read_table(stats_path):
+            get_sample(row['name'])['stats']['%s.%s' % (row['step'], row['key'])] = row['value']
+    for name, frag_hist_path in parse_named_inputs(args.frag_hist):
+        sample = get_sample(name)
+        for row in read_table(frag_hist_path):
+            sample['fragment_lengths'][row['length']] = row['fragments']
+            sample['duplicate_fragment_lengths'][row['length']] = row['duplicate_fragments']
+    for frip_path in args.frip:
+        for row in read_table(frip_path):
+            get_sample(row['name'])['frip'][row['peak_set']] = dict(
+                (key, row[key]) for key in ['peaks', 'peak_bases', 'fragments',
+                                            'fragments_in_peaks', 'frip'])
+    chrom_coverage = {}
+    for name, chrom_stats_path in parse_named_inputs(args.chrom_stats):
+        chrom_coverage[name] = dict(
+            (row['chrom'], dict((key, row[key]) for key in ['size', 'fragments', 'covered_bases',
+                                                            'mean_depth']))
+            for row in read_table(chrom_stats_path))
+
+    # Summary table (MultiQC custom content), one row per sample.
+    peak_sets = sorted(set(peak_set for sample in samples.values() for peak_set in sample['frip']))
+    columns = ['Input Alignments', 'Duplicate Alignments (%)', 'Paired Fragments',
+               'Median Fragment Length', 'Fragments <= %i bp (%%)' % MAX_SHORT_LEN]
+    columns += ['FRiP %s' % peak_set for peak_set in peak_sets]
+    table_rows = []
+    for name in sorted(samples):
+        sample = samples[name]
+        in_alns = sample['stats'].get('S2_B_Modify_Aln.input_alignments', '')
+        dup_alns = sample['stats'].get('S2_B_Modify_Aln.duplicate_alignments', '')
+        dup_pct = ''
+        if in_alns and dup_alns != '':
+            dup_pct = '%.2f' % (100.0 * dup_alns / in_alns)
+        lengths = sample['fragment_lengths']
+        num_frags = sum(lengths.values())
+        median_len, short_pct = '', ''
+        if num_frags:
+            cumulative = 0
+            for frag_len in sorted(lengths):
+                cumulative += lengths[frag_len]
+                if cumulative * 2 >= num_frags:
+                    median_len = frag_len
+                    break
+            short_frags = sum(count for frag_len, count in lengths.items()
+                              if frag_len <= MAX_SHORT_LEN)
+            short_pct = '%.2f' % (100.0 * short_frags / num_frags)
+        row = [in_alns, dup_pct, num_frags if lengths else '', median_len, short_pct]
+        row += [('%.4f' % sample['frip'][peak_set]['frip']) if peak_set in sample['frip'] else ''
+                for peak_set in peak_sets]
+        table_rows.append([str(value) for value in [name] + row])
+
+    if args.out_json:
+        with open(args.out_json, 'w') as out_file:
+            json.dump({'pipeline': 'CnR-flow', 'version': __version__, 'samples': samples,
+                       'chrom_coverage': chrom_coverage}, out_file, indent=1, sort_keys=True)
+    if args.out_table:
+        with open(args.out_table, 'w') as out_file:
+            out_file.write("# id: 'cnr_flow_qc'\n")
+            out_file.write("# section_name: 'CnR-flow Library QC'\n")
+            out_file.write("# description: 'Alignment, duplication, fragment-length, "
+                           + "and FRiP summary for each sample.'\n")
+            out_file.write("# plot_type: 'table'\n")
+            out_file.write('\t'.join(['Sample'] + columns) + '\n')
+            for row in table_rows:
+                out_file.write('\t'.join(row) + '\n')
+    if args.out_frag_lengths:
+        with open(args.out_frag_lengths, 'w') as out_file:
+            json.dump({
+                'id': 'cnr_flow_fragment_lengths',
+                'section_name': 'CnR-flow Fragment Lengths',
+                'description': 'Fragment lengths of all properly-paired fragments.',
+                'plot_type': 'linegraph',
+                'pconfig': {'id': 'cnr_flow_fragment_lengths_plot',
+                            'title': 'CnR-flow: Fragment Lengths',
+                            'xlab': 'Fragment Length (bp)', 'ylab': 'Fragments'},
+                'data': dict((name, samples[name]['fragment_lengths']) for name in sorted(samples)
+                             if samples[name]['fragment_lengths']),
+            }, out_file, indent=1)
+
+    print('Samples: %i' % len(samples))
+    print('Peak Sets: %s' % (', '.join(peak_sets) if peak_sets else 'None'))
+    return 0
+
+
+def read_process_labels(pipeline_path):
+    # Static process labels, from "process <name> {" followed by "label '<label>'"
+    labels = {}
+    process = None
+    with open(pipeline_path) as pipeline_file:
+        for match in PROFILE_LABEL.finditer(pipeline_file.read()):
+            if match.group(1):
+                process = match.group(1)
+            elif process and process not in labels:
+                labels[process] = match.group(2)
+    return labels
+
+
+def trace_value(value):
+    # Nextflow trace values (with trace.raw = true), missing values are reported as "-"
+    value = value.strip().rstrip('%')
+    if value in ('', '-'):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def read_trace(trace_path):
+    tasks = []
+    with open(trace_path) as trace_file:
+        header = trace_file.readline().rstrip('\n').split('\t')
+        for line in trace_file:
+            if not line.strip():
+                continue
+            row = dict(zip(header, line.rstrip('\n').split('\t')))
+            task = dict((key, trace_value(row.get(key, '-')))
+                        for key in ['cpus', 'memory', 'realtime', '%cpu', 'peak_rss',
+                                    'rchar', 'wchar'])
+            task.update((key, row.get(key, '')) for key in ['process', 'tag', 'status', 'exit'])
+            tasks.append(task)
+    return tasks
+
+
+def profile_summary(group_tasks):
+    summary = {'tasks': 0, 'failed': 0, 'cpus': 0, 'realtime': 0.0, 'max_realtime': 0.0,
+               'cpu_time': 0.0, 'alloc_cpu_time': 0.0, 'memory': 0.0, 'peak_rss': 0.0,
+               'rchar': 0.0, 'wchar': 0.0}
+    for task in group_tasks:
+        if task['status'] not in ('COMPLETED', 'CACHED'):
+            summary['failed'] += 1
+            continue
+        summary['tasks'] += 1
+        cpus = task['cpus'] or 1
+        realtime = task['realtime'] or 0.0
+        summary['cpus'] = max(summary['cpus'], int(cpus))
+        summary['realtime'] += realtime
+        summary['max_realtime'] = max(summary['max_realtime'], realtime)
+        if task['%cpu'] is not None:
+            summary['cpu_time'] += task['%cpu'] / 100.0 * realtime
+            summary['alloc_cpu_time'] += cpus * realtime
+        summary['memory'] = max(summary['memory'], task['memory'] or 0.0)
+        summary['peak_rss'] = max(summary['peak_rss'], task['peak_rss'] or 0.0)
+        summary['rchar'] += task['rchar'] or 0.0
+        summary['wchar'] += task['wchar'] or 0.0
+
+    summary['cpu_eff'] = None
+    if summary['alloc_cpu_time']:
+        summary['cpu_eff'] = summary['cpu_time'] / summary['alloc_cpu_time']
+    summary['mem_eff'] = None
+    if summary['memory']:
+        summary['mem_eff'] = summary['peak_rss'] / summary['memory']
+
+    flags = []
+    if summary['cpu_eff'] is not None:
+        if summary['cpus'] > 1 and summary['cpu_eff'] < PROFILE_CPU_OVER:
+            flags.append('cpus_over_provisioned')
+        elif summary['cpu_eff'] > PROFILE_CPU_UNDER:
+            flags.append('cpus_under_provisioned')
+    if summary['mem_eff'] is not None:
+        if summary['mem_eff'] < PROFILE_MEM_OVER:
+            flags.append('memory_over_provisioned')
+        elif summary['mem_eff'] > PROFILE_MEM_UNDER:
+            flags.append('memory_under_provisioned')
+    elif summary['tasks']:
+        flags.append('memory_not_requested')
+    if summary['failed']:
+        flags.append('failed_tasks')
+    summary['flags'] = flags
+    return summary
+
+
+def profile(args):
+    tasks = []
+    for trace_path in args.trace:
+        tasks += read_trace(trace_path)
+    labels = read_process_labels(args.pipeline) if args.pipeline else {}
+
+    groups = {}
+    for task in tasks:
+        groups.setdefault(('process', task['process']), []).append(task)
+        groups.setdefault(('label', labels.get(task['process'], '-')), []).append(task)
+    summaries = dict((key, profile_summary(group_tasks)) for key, group_tasks in groups.items())
+    total_realtime = sum(task['realtime'] or 0.0 for task in tasks) or 1.0
+    # Bottlenecks: ranked by total measured wall time.
+    ranked = sorted(summaries, key=lambda key: (key[0] != 'process', -summaries[key]['realtime']))
+
+    def format_value(value, fmt):
+        return '' if value is None else fmt % value
+
+    columns = ['level', 'name', 'label', 'tasks', 'failed', 'cpus', 'realtime_h', 'realtime_share',
+               'max_realtime_h', 'cpu_efficiency', 'memory_gb', 'peak_rss_gb', 'memory_efficiency',
+               'read_gb', 'written_gb', 'flags']
+    rows = []
+    for level, name in ranked:
+        summary = summaries[(level, name)]
+        rows.append([
+            level, name, (labels.get(name, '-') if level == 'process' else name),
+            '%i' % summary['tasks'], '%i' % summary['failed'], '%i' % summary['cpus'],
+            '%.3f' % (summary['realtime'] / 3600000.0),
+            '%.3f' % (summary['realtime'] / total_realtime),
+            '%.3f' % (summary['max_realtime'] / 3600000.0),
+            format_value(summary['cpu_eff'], '%.3f'),
+            format_value(summary['memory'] / GB if summary['memory'] else None, '%.2f'),
+            '%.2f' % (summary['peak_rss'] / GB), format_value(summary['mem_eff'], '%.3f'),
+            '%.2f' % (summary['rchar'] / GB), '%.2f' % (summary['wchar'] / GB),
+            ','.join(summary['flags']),
+        ])
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            out_file.write('\t'.join(columns) + '\n')
+            for row in rows:
+                out_file.write('\t'.join(row) + '\n')
+
+    report = ['Tasks: %i  (Traces: %s)' % (len(tasks), ', '.join(args.trace)), '',
+              'Bottleneck Steps (by total wall time):']
+    report.append('  %-32s %-10s %6s %10s %7s %8s %8s' % (
+        'Process', 'Label', 'Tasks', 'Hours', 'Share', 'CPU Eff', 'Mem Eff'))
+    for row in rows:
+        if row[0] == 'process':
+            report.append('  %-32s %-10s %6s %10s %6.1f%% %8s %8s' % (
+                row[1], row[2], row[3], row[6], 100 * float(row[7]), row[9] or '-', row[12] or '-'))
+    report += ['', 'Process Label Provisioning:']
+    for row in rows:
+        if row[0] == 'label':
+            report.append('  %-10s CPU Eff: %-6s Mem Eff: %-6s (Peak: %s GB / Req: %s GB) %s' % (
+                row[1], row[9] or '-', row[12] or '-', row[11], row[10] or '-',
+                ('Flags: ' + row[15]) if row[15] else ''))
+    report += ['', 'Longest Tasks:']
+    for task in sorted(tasks, key=lambda task: -(task['realtime'] or 0.0))[:args.top]:
+        report.append('  %-32s %-30s %10.3f h' % (task['process'], task['tag'],
+                                                  (task['realtime'] or 0.0) / 3600000.0))
+    report = '\n'.join(report) + '\n'
+    print(report)
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            report_file.write(report)
+    return 0
+
+
+def benchmark(args):
+    # Per-case, per-step totals (and a "total" row for each case), from each case's trace(s).
+    results = {}
+    cases = []
+    for case, trace_path in parse_named_inputs(args.trace):
+        if case not in results:
+            cases.append(case)
+        for task in read_trace(trace_path):
+            if task['status'] not in ('COMPLETED', 'CACHED'):
+                continue
+            realtime = (task['realtime'] or 0.0) / 1000.0
+            for process in [task['process'], 'total']:
+                result = results.setdefault(case, {}).setdefault(process, {
+                    'tasks': 0, 'realtime_s': 0.0, 'cpu_time_s': 0.0,
+                    'peak_rss_gb': 0.0, 'written_gb': 0.0})
+                result['tasks'] += 1
+                result['realtime_s'] += realtime
+                result['cpu_time_s'] += (task['%cpu'] or 0.0) / 100.0 * realtime
+                result['peak_rss_gb'] = max(result['peak_rss_gb'], (task['peak_rss'] or 0.0) / GB)
+                result['written_gb'] += (task['wchar'] or 0.0) / GB
+
+    columns = ['version', 'case', 'process', 'tasks'] + BENCHMARK_METRICS
+    rows = []
+    for case in cases:
+        processes = sorted(results.get(case, {}), key=lambda process: (process == 'total', process))
+        for process in processes:
+            result = results[case][process]
+            rows.append([args.version, case, process, '%i' % result['tasks']]
+                        + ['%.3f' % result[metric] for metric in BENCHMARK_METRICS])
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            out_file.write('\t'.join(columns) + '\n')
+            for row in rows:
+                out_file.write('\t'.join(row) + '\n')
+
+    report = ['Benchmark: %s  (Cases: %i)' % (args.version, len(cases)), '']
+    report.append('  %-32s %-28s %6s %10s %10s %8s %9s' % (
+        'Case', 'Process', 'Tasks', 'Wall (s)', 'CPU (s)', 'RSS (GB)', 'Wrt (GB)'))
+    for row in rows:
+        report.append('  %-32s %-28s %6s %10s %10s %8s %9s' % tuple(row[1:]))
+
+    # Regressions: Metrics increased by more than the tolerance from the baseline version.
+    if args.baseline:
+        baseline = {}
+        baseline_versions = set()
+        with open(args.baseline) as baseline_file:
+            header = baseline_file.readline().rstrip('\n').split('\t')
+            for line in baseline_file:
+                if not line.strip():
+                    continue
+                row = dict(zip(header, line.rstrip('\n').split('\t')))
+                baseline[(row['case'], row['process'])] = row
+                baseline_versions.add(row['version'])
+        report += ['', 'Comparison to Baseline: %s  (Tolerance: %.0f%%)' % (
+            ', '.join(sorted(baseline_versions)), 100 * args.tolerance)]
+        regressions = 0
+        for row in rows:
+            base_row = baseline.get((row[1], row[2]))
+            if base_row is None:
+                continue
+            for metric, value in zip(BENCHMARK_METRICS, row[4:]):
+                base_value = float(base_row[metric])
+                if base_value < BENCHMARK_MIN_VALUES[metric]:
+                    continue
+                change = float(value) / base_value - 1.0
+                if abs(change) > args.tolerance:
+                    regressions += int(change > 0)
+                    report.append('  %-10s %-32s %-28s %-12s %10.3f -> %10.3f (%+.1f%%)' % (
+                        'REGRESSION' if change > 0 else 'IMPROVED', row[1], row[2], metric,
+                        base_value, float(value), 100 * change))
+        report.append('  Regressions: %i' % regressions)
+    report = '\n'.join(report) + '\n'
+    print(report)
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            report_file.write(report)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cnr_tools.py',
+        description='Streaming helper tools bundled with the CnR-flow pipeline.')
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + __version__)
+    subparsers = parser.add_subparsers(dest='command')
+
+    split_parser = subparsers.add_parser(
+        'split_modes',
+        help='Split a duplicate-marked SAM stream into alignment-mode outputs.')
+    split_parser.add_argument('--input', default='-',
+                              help='Input SAM file (Default: "-", stdin)')
+    split_parser.add_argument('--out', action='append', default=[], required=True,
+                              help='Mode output as <mode>=<path>, may be repeated.')
+    split_parser.add_argument('--frag', action='append', default=[],
+                              help='Mode fragment (bed) output as <mode>=<path>, may be repeated.')
+    split_parser.add_argument('--count', action='append', default=[],
+                              help='Mode alignment count output as <mode>=<path>, may be repeated.')
+    split_parser.add_argument('--stats', default='',
+                              help='Sample count statistics output (tab-separated key, value).')
+    split_parser.add_argument('--frag-hist', default='',
+                              help='Fragment-length histogram output (all paired fragments).')
+    split_parser.add_argument('--reference', default='',
+                              help='Reference fasta, required for CRAM output.')
+    split_parser.add_argument('--seq-md5', default='',
+                              help='Reference sequence checksums (name, length, md5), '
+                                   'added to header @SQ lines as M5 tags.')
+    split_parser.add_argument('--samtools', default='samtools',
+                              help='Samtools system call (Default: "samtools")')
+    split_parser.add_argument('--threads', type=int, default=0,
+                              help='Additional compression threads per output.')
+    split_parser.set_defaults(func=split_modes)
+
+    spike_parser = subparsers.add_parser(
+        'split_spike',
+        help='Separate reference alignments and spike-in counts from a combined alignment.')
+    spike_parser.add_argument('--input', default='-',
+                              help='Input SAM file (Default: "-", stdin)')
+    spike_parser.add_argument('--output', default='-',
+                              help='Output reference-only SAM file (Default: "-", stdout)')
+    spike_parser.add_argument('--prefix', required=True,
+                              help='Contig name prefix identifying spike-in contigs.')
+    spike_parser.add_argument('--stats', default='',
+                              help='Alignment count statistics output (tab-separated key, value).')
+    spike_parser.set_defaults(func=split_spike)
+
+    prep_ref_parser = subparsers.add_parser(
+        'prep_ref',
+        help='Write reference fasta index, sizes, counts, and checksum in a single pass.')
+    prep_ref_parser.add_argument('--input', default='-',
+                                 help='Input (uncompressed) fasta file (Default: "-", stdin)')
+    prep_ref_parser.add_argument('--out-fasta', default='',
+                                 help='Copy of input fasta output path.')
+    prep_ref_parser.add_argument('--faidx', default='',
+                                 help='Fasta index (.fai, as with "samtools faidx") output path.')
+    prep_ref_parser.add_argument('--chrom-sizes', default='',
+                                 help='Chromosome sizes output path.')
+    prep_ref_parser.add_argument('--facount', default='',
+                                 help='Nucleotide counts (UCSC faCount format) output path.')
+    prep_ref_parser.add_argument('--eff-genome', default='',
+                                 help='Effective genome size (Total - N\'s) output path.')
+    prep_ref_parser.add_argument('--md5', default='',
+                                 help='Fasta checksum (md5) output path.')
+    prep_ref_parser.add_argument('--seq-md5', default='',
+                                 help='Per-sequence checksums (name, length, md5) output path.')
+    prep_ref_parser.add_argument('--ref-cache', default='',
+                                 help='CRAM reference cache (REF_CACHE, %%2s/%%2s/%%s layout) '
+                                      'output directory.')
+    prep_ref_parser.set_defaults(func=prep_ref)
+
+    interleave_parser = subparsers.add_parser(
+        'interleave',
+        help='Interleave paired fastq files or named pipes into a single stream.')
+    interleave_parser.add_argument('--in-1', required=True,
+                                   help='Input R1 fastq file or named pipe (uncompressed).')
+    interleave_parser.add_argument('--in-2', required=True,
+                                   help='Input R2 fastq file or named pipe (uncompressed).')
+    interleave_parser.add_argument('--output', default='-',
+                                   help='Output interleaved fastq file (Default: "-", stdout)')
+    interleave_parser.set_defaults(func=interleave)
+
+    coverage_parser = subparsers.add_parser(
+        'coverage',
+        help='Create raw and scaled bedgraph or bigWig tracks from fragments in a single pass.')
+    coverage_parser.add_argument('--input', default='-',
+                                 help='Input fragment bed file (Default: "-", stdin)')
+    coverage_parser.add_argument('--chrom-sizes', required=True,
+                                 help='Chromosome sizes file, used to clip coordinates.')
+    coverage_parser.add_argument('--out', default='',
+                                 help='Raw (non-scaled) bedgraph output path.')
+    coverage_parser.add_argument('--scaled', action='append', default=[],
+                                 help='Scaled bedgraph output as <scale>=<path>, may be repeated.')
+    coverage_parser.add_argument('--bigwig', action='append', default=[],
+                                 help='Scaled bigWig output as <scale>=<path>, may be repeated.')
+    coverage_parser.add_argument('--binned', action='append', default=[],
+                                 help='Scaled binned (npz) output as <scale>=<path>, may be repeated.')
+    coverage_parser.add_argument('--bin-size', type=int, default=0,
+                                 help='Bin size (bases) for binned (--binned) outputs.')
+    coverage_parser.add_argument('--chrom-stats', default='',
+                                 help='Per-chromosome fragment and coverage statistics output.')
+    coverage_parser.set_defaults(func=coverage)
+
+    binned_parser = subparsers.add_parser(
+        'binned',
+        help='Scale binned (npz) coverage and/or convert it to bigWig.')
+    binned_parser.add_argument('--input', required=True,
+                               help='Input binned coverage (npz) file.')
+    binned_parser.add_argument('--scale', type=float, default=1.0,
+                               help='Scale factor applied to coverage values (Default: 1).')
+    binned_parser.add_argument('--out', default='',
+                               help='Scaled binned coverage (npz) output path.')
+    binned_parser.add_argument('--bigwig', default='',
+                               help='Scaled bigWig output path.')
+    binned_parser.set_defaults(func=binned)
+
+    frip_parser = subparsers.add_parser(
+        'frip',
+        help='Count the fraction of fragments in peaks (FRiP).')
+    frip_parser.add_argument('--frags', default='-',
+                             help='Input fragment (bed) file (Default: "-", stdin)')
+    frip_parser.add_argument('--peaks', action='append', default=[],
+                             help='Peak file as <peak_set>=<path>, may be repeated.')
+    frip_parser.add_argument('--name', required=True,
+                             help='Sample name.')
+    frip_parser.add_argument('--out', required=True,
+                             help='FRiP statistics (tab-separated) output path.')
+    frip_parser.set_defaults(func=frip)
+
+    qc_report_parser = subparsers.add_parser(
+        'qc_report',
+        help='Combine sample QC statistics into run-level reports.')
+    qc_report_parser.add_argument('--stats', action='append', default=[],
+                                  help='Sample statistics manifest, may be repeated.')
+    qc_report_parser.add_argument('--frag-hist', action='append', default=[],
+                                  help='Fragment-length histogram as <name>=<path>, may be repeated.')
+    qc_report_parser.add_argument('--chrom-stats', action='append', default=[],
+                                  help='Chromosome statistics as <name>=<path>, may be repeated.')
+    qc_report_parser.add_argument('--frip', action='append', default=[],
+                                  help='FRiP statistics, may be repeated.')
+    qc_report_parser.add_argument('--out-json', default='',
+                                  help='Combined QC (JSON) output path.')
+    qc_report_parser.add_argument('--out-table', default='',
+                                  help='Summary table (MultiQC custom content, tsv) output path.')
+    qc_report_parser.add_argument('--out-frag-lengths', default='',
+                                  help='Fragment-length plot (MultiQC custom content, json) output path.')
+    qc_report_parser.set_defaults(func=qc_report)
+
+    profile_parser = subparsers.add_parser(
+        'profile',
+        help='Summarize task resource usage from Nextflow trace files.')
+    profile_parser.add_argument('--trace', action='append', default=[], required=True,
+                                help='Nextflow trace file (trace.raw = true), may be repeated.')
+    profile_parser.add_argument('--pipeline', default='',
+                                help='Pipeline script, used to find the label of each process.')
+    profile_parser.add_argument('--out', default='',
+                                help='Process and label summary (tab-separated) output path.')
+    profile_parser.add_argument('--report', default='',
+                                help='Text report output path.')
+    profile_parser.add_argument('--top', type=int, default=10,
+                                help='Number of longest tasks to report (Default: 10).')
+    profile_parser.set_defaults(func=profile)
+
+    benchmark_parser = subparsers.add_parser(
+        'benchmark',
+        help='Combine and compare Nextflow trace files from benchmark runs.')
+    benchmark_parser.add_argument('--trace', action='append', default=[], required=True,
+                                  help='Benchmark case trace file as <case>=<path>, may be repeated.')
+    benchmark_parser.add_argument('--version', default='-',
+                                  help='Pipeline version recorded for the benchmark results.')
+    benchmark_parser.add_argument('--out', default='',
+                                  help='Per-case, per-step results (tab-separated) output path.')
+    benchmark_parser.add_argument('--baseline', default='',
+                                  help='Results (tab-separated) of a previous benchmark for comparison.')
+    benchmark_parser.add_argument('--tolerance', type=float, default=0.2,
+                                  help='Fraction increase from the baseline reported as '
+                                       'a regression (Default: 0.2).')
+    benchmark_parser.add_argument('--report', default='',
+                                  help='Text report output path.')
+    benchmark_parser.set_defaults(func=benchmark)
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_parser()
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+    sys.exit(args.func(args))
@@ -26,6 +26,7 @@ cat ${PIPE_FILES} > ../nextflow.config
 cat ${TASK_FILES} > ../nextflow.config.task
 grep -vh "^\s*//\s" config_2A_process_shared.txt config_3A_params_task_inputs.txt \
     config_3B_params_shared_stepsettings.txt config_3Z_params_shared_close.txt \
+    config_4B_trace_shared.txt \
     | grep -v "^\s*$" > ../nextflow.config.task.nodoc
 grep -vh "^\s*//\s" config_2A_process_shared.txt config_3A_params_task_inputs.txt \
     config_3Z_params_shared_close.txt \
@@ -83,7 +84,7 @@ egrep "peak_callers.*=" config_3B_params_shared_stepsettings.txt \
      | sed 's/^[[:space:]]*//' \
      | sed 's/peak_callers[[:space:]]*=/peak_callers =/' \
      | sed 's/=[[:space:]]*"/= "/' > config_zz_auto_peak_callers.txt 
-egrep -A 2 "// Macs2 Settings" config_3B_params_shared_stepsettings.txt \
+egrep -A 8 "// Macs2 Settings" config_3B_params_shared_stepsettings.txt \
      | sed 's/^[[:space:]]*//' \
      | sed 's/[[:space:]]*=/=/' \
      | sed 's/=[[:space:]]*/=/' \
@@ -93,15 +94,15 @@ egrep -A 4 "// SEACR Settings" config_3B_params_shared_stepsettings.txt \
      | sed 's/[[:space:]]*=/=/' \
      | sed 's/=[[:space:]]*/=/' \
      | sed 's/=/ = /' > config_zz_auto_seacr_settings.txt 
-egrep -A 11 "Using Anaconda" config_3A_params_pipe_dependencies.txt \
+egrep -A 12 "Using Anaconda" config_3A_params_pipe_dependencies.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_conda_config.txt
-egrep -A 11 "// Dependency Configuration Using Environment Modules" config_3A_params_pipe_dependencies.txt \
+egrep -A 12 "// Dependency Configuration Using Environment Modules" config_3A_params_pipe_dependencies.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_module_config.txt
-egrep -A 17 "with Singularity" config_3A_params_pipe_dependencies.txt \
+egrep -A 19 "with Singularity" config_3A_params_pipe_dependencies.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_singularity_config.txt
-egrep -A 20 "with Docker" config_3A_params_pipe_dependencies.txt \
+egrep -A 22 "with Docker" config_3A_params_pipe_dependencies.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_docker_config.txt
-egrep -A 20 "// System Call Settings" config_3A_params_pipe_dependencies.txt \
+egrep -A 21 "// System Call Settings" config_3A_params_pipe_dependencies.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_call_config.txt
 echo "params {" > config_zz_auto_params_header.txt
 echo "}" > config_zz_auto_params_footer.txt
@@ -109,7 +110,7 @@ egrep -A 7 "// CnR-flow Input Files:" config_3A_params_task_inputs.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_inputs_single_prep.txt
 egrep -A 16 "// Can specify multiple treat/control" config_3A_params_task_inputs.txt \
      | sed 's/^[[:space:]]*//' > config_zz_auto_inputs_group_prep.txt
-egrep -A 13 "// ------- General Pipeline" config_3B_params_shared_stepsettings.txt \
+egrep -A 18 "// ------- General Pipeline" config_3B_params_shared_stepsettings.txt \
     > config_zz_auto_naming_prep.txt
 cat config_zz_auto_params_header.txt config_zz_auto_inputs_single_prep.txt config_zz_auto_params_footer.txt \
     > config_zz_auto_inputs_single.txt
@@ -0,0 +1,98 @@
+#!/usr/bin/env bash
+#Daniel Stribling
+#Renne Lab, University of Florida
+#
+#This file is part of CnR-flow.
+#CnR-flow is free software: you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation, either version 3 of the License, or
+#(at your option) any later version.
+#CnR-flow is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU General Public License for more details.
+#You should have received a copy of the GNU General Public License
+#along with CnR-flow.  If not, see <https://www.gnu.org/licenses/>.
+
+# Benchmark the pipeline on the test dataset, subsampled at several depths (fixed seed),
+#   for each alignment mode and normalization setting. Per-step wall time, CPU time,
+#   peak memory, and bytes written are combined from the trace of each run into:
+#     benchmarks/CnR-flow.<version>.benchmark.tsv
+#   and compared to the results of the most recent previous version (if present).
+# Settings (Environment Variables):
+BENCH_PROPS=${BENCH_PROPS:-"0.05 0.10 0.20"}
+BENCH_SEED=${BENCH_SEED:-11}
+BENCH_ALN_MODES=${BENCH_ALN_MODES:-"all all_dedup less_120 less_120_dedup"}
+BENCH_NORMS=${BENCH_NORMS:-"none spike cpm"}  # Options: none, spike, cpm
+BENCH_DIR=${BENCH_DIR:-"bench_output"}
+BENCH_RESULTS_DIR=${BENCH_RESULTS_DIR:-"benchmarks"}
+BENCH_BASELINE=${BENCH_BASELINE:-""}  # Default: Latest results of a different version
+BENCH_TOLERANCE=${BENCH_TOLERANCE:-0.2}
+BENCH_NF_ARGS=${BENCH_NF_ARGS:-""}  # Ex: "-profile docker"
+
+set -e
+VERSION=$(grep -m 1 "version *=" ../nextflow.config | cut -d "'" -f 2)
+BENCH_DATA="${BENCH_DIR}/subsampled_data_seed${BENCH_SEED}"
+echo "Benchmarking CnR-flow Version: ${VERSION}"
+
+./setup_reference.sh
+if [ $(ls raw_data/*.fastq.gz 2>/dev/null | wc -l) -lt 4 ] ; then
+  ./dl_prep_data.sh
+fi
+if [ $(ls raw_data/*.fastq.gz 2>/dev/null | wc -l) -lt 4 ] ; then
+  echo "Raw data (raw_data/*.fastq.gz) is required for benchmark subsampling."
+  echo "(Remove existing subsampled_data to download with dl_prep_data.sh)"
+  exit 1
+fi
+if [ $(ls test_reference/*.refinfo.txt 2>/dev/null | wc -l) -lt 1 ] ; then
+  nextflow ../CnR-flow.nf ${BENCH_NF_ARGS} --mode prep_fasta
+fi
+
+echo "Subsampling Data at Proportions: ${BENCH_PROPS}"
+# (Trailing comma keeps a single proportion as text, Ex: "0.20")
+nextflow subsample_data.nf --props "$(echo ${BENCH_PROPS} | tr ' ' ','),"  \
+                           --seed ${BENCH_SEED} --out_dir ${BENCH_DATA}
+
+TRACE_ARGS=""
+for PROP in ${BENCH_PROPS}; do
+  PROP_STR=${PROP//./}
+  for ALN_MODE in ${BENCH_ALN_MODES}; do
+    for NORM in ${BENCH_NORMS}; do
+      CASE="prop${PROP}.${ALN_MODE}.norm_${NORM}"
+      OUT_DIR="${PWD}/${BENCH_DIR}/runs/${CASE}"
+      echo "Running Benchmark Case: ${CASE}"
+      rm -rf ${OUT_DIR}
+      set -v
+      nextflow ../CnR-flow.nf ${BENCH_NF_ARGS} --mode run \
+          -w ${BENCH_DIR}/work \
+          --out_dir ${OUT_DIR} \
+          --treat_fastqs "${BENCH_DATA}/SRR6128978_{1,2}_prop${PROP_STR}.fastq.gz" \
+          --ctrl_fastqs "${BENCH_DATA}/SRR6128981_{1,2}_prop${PROP_STR}.fastq.gz" \
+          --use_aln_modes ${ALN_MODE} \
+          --do_norm_spike $([ "${NORM}" == "spike" ] && echo true || echo false) \
+          --do_norm_cpm $([ "${NORM}" == "cpm" ] && echo true || echo false) \
+          --stage_store false
+      set +v
+      TRACE_FILE=$(ls -t ${OUT_DIR}/pipeline_info/CnR-flow.trace.*.tsv | head -n 1)
+      TRACE_ARGS="${TRACE_ARGS} --trace ${CASE}=${TRACE_FILE}"
+    done
+  done
+done
+
+mkdir -p ${BENCH_RESULTS_DIR}
+RESULTS="${BENCH_RESULTS_DIR}/CnR-flow.${VERSION}.benchmark.tsv"
+if [ -z "${BENCH_BASELINE}" ] ; then
+  BENCH_BASELINE=$(ls -t ${BENCH_RESULTS_DIR}/CnR-flow.*.benchmark.tsv 2>/dev/null \
+                       | grep -v -F "${RESULTS}" | head -n 1 || true)
+fi
+BASELINE_ARGS=""
+if [ -n "${BENCH_BASELINE}" ] ; then
+  echo "Comparing to Baseline: ${BENCH_BASELINE}"
+  BASELINE_ARGS="--baseline ${BENCH_BASELINE} --tolerance ${BENCH_TOLERANCE}"
+fi
+
+python3 ../bin/cnr_tools.py benchmark ${TRACE_ARGS} ${BASELINE_ARGS} \
+                                      --version ${VERSION} \
+                                      --out ${RESULTS} \
+                                      --report ${RESULTS%.tsv}.txt
+echo "Benchmark Results: ${RESULTS}"
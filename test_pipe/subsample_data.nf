@@ -20,6 +20,13 @@ nextflow.enable.dsl=2
 sras      = ['SRX3241465', 'SRX3241462']
 file_glob = "raw_data/*_{1,2}.fastq.gz"
 
+// Subsampled proportions (Ex: --props 0.05,0.10,0.20) and fixed random seed,
+//   so subsampled (Ex: benchmark) datasets are reproducible.
+params.props   = '0.20'
+params.seed    = 11
+params.out_dir = 'subsampled_data'
+props = (params.props instanceof List) ? params.props : "${params.props}".tokenize(',')
+
 
 workflow {
     //Channel.fromSRA(sras)
@@ -28,19 +35,19 @@ workflow {
     Channel.fromFilePairs(file_glob)
           .view()
           .set { in_fastqs }
-    Subsample_Fastq(in_fastqs)
+    Subsample_Fastq(in_fastqs.combine(Channel.fromList(props)))
 }
 
 process Subsample_Fastq {
     conda         'bioconda::seqkit=0.13.2'
-    tag           { sra }
+    tag           { "${sra}.prop${prop}" }
     cache         false
     echo          true
     errorStrategy { sleep(Math.pow(2, task.attempt) * 200 as long); return 'retry' }
     maxRetries    10
 
     input:
-    tuple val(sra), path(fastqs)
+    tuple val(sra), path(fastqs), val(prop)
 
     output:
     path("${out_dir}/*.fastq*")
@@ -51,8 +58,7 @@ process Subsample_Fastq {
     publishDir ".", mode: 'move', pattern: "${out_dir}/*"
     script:
     out_log  = "${task.tag}.${task.process}.nflog.txt"
-    out_dir  = 'subsampled_data'
-    prop     = 0.20
+    out_dir  = params.out_dir
     prop_str = "${prop}" - ~/\./
     fq_names = ""
     fastqs.each{name -> 
@@ -61,7 +67,7 @@ process Subsample_Fastq {
     shell:
     '''
     echo "Subsampling Sequence name(s): !{fq_names}"
-    USE_RAND="$RANDOM"
+    USE_RAND="!{params.seed}"
     echo "Random Seed: ${USE_RAND}"
     mkdir -v !{out_dir}
 
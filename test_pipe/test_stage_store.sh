@@ -0,0 +1,58 @@
+#!/usr/bin/env bash
+#Daniel Stribling
+#Renne Lab, University of Florida
+#
+#This file is part of CnR-flow.
+#CnR-flow is free software: you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation, either version 3 of the License, or
+#(at your option) any later version.
+#CnR-flow is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU General Public License for more details.
+#You should have received a copy of the GNU General Public License
+#along with CnR-flow.  If not, see <https://www.gnu.org/licenses/>.
+
+# Test reuse of stored stage outputs (params.stage_store): Run the test dataset twice,
+#   each with a new (empty) work directory and without "-resume", and verify that the
+#   stored steps are skipped in the second run.
+#   (Requires the test reference, prepared with: --mode prep_fasta)
+# Settings (Environment Variables):
+STORE_NF_ARGS=${STORE_NF_ARGS:-""}  # Ex: "-profile docker"
+STORE_DIR=${STORE_DIR:-"store_output"}
+STORE_STEPS=${STORE_STEPS:-"S1_A_Trim S2_A_Aln_Ref S2_B_Modify_Aln S2_C_Make_Bdg"}
+
+set -e -o pipefail
+export NXF_ANSI_LOG=false
+OUT_DIR="${PWD}/${STORE_DIR}/cnr_output"
+rm -rf ${STORE_DIR}
+mkdir -p ${STORE_DIR}
+
+for RUN in 1 2; do
+  echo "Running Stage Store Test, Run: ${RUN}"
+  rm -rf ${STORE_DIR}/work
+  set -v
+  nextflow ../CnR-flow.nf ${STORE_NF_ARGS} --mode run \
+      -w ${STORE_DIR}/work \
+      --out_dir ${OUT_DIR} \
+      --publish_mode copy \
+      --stage_store true \
+      | tee ${STORE_DIR}/run_${RUN}.log
+  set +v
+done
+
+FAILED=0
+for STEP in ${STORE_STEPS}; do
+  if grep -q -F "Stored process > CnR_${STEP}" ${STORE_DIR}/run_2.log ; then
+    echo "Stored Outputs Reused: CnR_${STEP}"
+  else
+    echo "Stored Outputs NOT Reused: CnR_${STEP}"
+    FAILED=1
+  fi
+done
+if [ "${FAILED}" != "0" ] ; then
+  echo "Stage Store Test Failed."
+  exit 1
+fi
+echo "Stage Store Test Complete."
@@ -0,0 +1,503 @@
+#Daniel Stribling
+#Renne Lab, University of Florida
+#
+#This file is part of CnR-flow.
+#CnR-flow is free software: you can redistribute it and/or modify
+#it under the terms of the GNU General Public License as published by
+#the Free Software Foundation, either version 3 of the License, or
+#(at your option) any later version.
+#CnR-flow is distributed in the hope that it will be useful,
+#but WITHOUT ANY WARRANTY; without even the implied warranty of
+#MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#GNU General Public License for more details.
+#You should have received a copy of the GNU General Public License
+#along with CnR-flow.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tests of the cnr_tools.py subcommands on small synthetic inputs.
+
+Run from the repository base directory with: python -m pytest tests
+"""
+
+import os
+import sys
+import json
+import struct
+import hashlib
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bin'))
+import cnr_tools  # noqa: E402
+
+
+def run_tool(*tool_args):
+    args = cnr_tools.build_parser().parse_args([str(arg) for arg in tool_args])
+    return args.func(args)
+
+
+def write_file(path, text):
+    with open(str(path), 'w') as out_file:
+        out_file.write(text)
+    return str(path)
+
+
+def read_lines(path):
+    with open(str(path)) as in_file:
+        return [line.rstrip('\n') for line in in_file]
+
+
+def sam_record(name, flag, pos, tlen, seq_len, mate_seq_len=None):
+    tags = 'MC:Z:%iM' % mate_seq_len if mate_seq_len else ''
+    return '\t'.join([name, str(flag), 'chr1', str(pos), '42', '%iM' % seq_len, '=',
+                      str(pos + tlen), str(tlen), 'A' * seq_len, '*', tags]).rstrip('\t')
+
+
+def test_split_modes(tmp_path):
+    # Stand-in for "samtools view": Copies the input to the "-o" output path.
+    fake_samtools = write_file(tmp_path / 'fake_samtools.py', (
+        'import shutil\n'
+        'import sys\n'
+        'with open(sys.argv[sys.argv.index("-o") + 1], "wb") as out_file:\n'
+        '    shutil.copyfileobj(sys.stdin.buffer, out_file)\n'
+    ))
+    sam = write_file(tmp_path / 'in.sam', '\n'.join([
+        '@HD\tVN:1.6\tSO:coordinate',
+        '@SQ\tSN:chr1\tLN:5000',
+        # Short fragment
+        sam_record('p1', 99, 101, 150, 50, 50),
+        # Short fragment, duplicate
+        sam_record('p2', 1123, 101, 150, 50, 50),
+        # Long reads
+        sam_record('p3', 99, 301, 300, 150, 150),
+        # Fragment too long for fragment outputs
+        sam_record('p4', 99, 1001, 1200, 50, 50),
+        sam_record('p1', 147, 201, -150, 50, 50),
+        sam_record('p2', 1171, 201, -150, 50, 50),
+        sam_record('p3', 147, 451, -300, 150, 150),
+        sam_record('p4', 147, 2151, -1200, 50, 50),
+    ]) + '\n')
+    seq_md5 = write_file(tmp_path / 'ref.seq_md5.txt', 'chr1\t5000\t' + 'a' * 32 + '\n')
+    mode_args = []
+    for mode in cnr_tools.ALN_MODES:
+        mode_args += ['--out', '%s=%s' % (mode, tmp_path / (mode + '.sam')),
+                      '--frag', '%s=%s' % (mode, tmp_path / (mode + '.frag.bed'))]
+    # A second output for a mode (Ex: BAM copies for MACS2 BAMPE input)
+    mode_args += ['--out', 'all=%s' % (tmp_path / 'all.copy.sam')]
+    stats = tmp_path / 'stats.tsv'
+    frag_hist = tmp_path / 'frag_hist.tsv'
+    count = tmp_path / 'count.txt'
+    assert run_tool('split_modes', '--input', sam, *mode_args,
+                    '--count', 'all_dedup=%s' % count, '--stats', stats,
+                    '--frag-hist', frag_hist, '--seq-md5', seq_md5,
+                    '--samtools', '%s %s' % (sys.executable, fake_samtools)) == 0
+
+    expected = {'all': (['p1', 'p2', 'p3', 'p4'], ['chr1\t100\t250', 'chr1\t100\t250', 'chr1\t300\t600']),
+                'all_dedup': (['p1', 'p3', 'p4'], ['chr1\t100\t250', 'chr1\t300\t600']),
+                'less_120': (['p1', 'p2', 'p4'], ['chr1\t100\t250', 'chr1\t100\t250']),
+                'less_120_dedup': (['p1', 'p4'], ['chr1\t100\t250'])}
+    for mode, (names, frags) in expected.items():
+        out_lines = read_lines(tmp_path / (mode + '.sam'))
+        assert out_lines[1] == '@SQ\tSN:chr1\tLN:5000\tM5:' + 'a' * 32
+        assert sorted(set(line.split('\t')[0] for line in out_lines[2:])) == names
+        assert len(out_lines[2:]) == 2 * len(names)
+        assert read_lines(tmp_path / (mode + '.frag.bed')) == frags
+    assert read_lines(tmp_path / 'all.copy.sam') == read_lines(tmp_path / 'all.sam')
+    assert read_lines(count) == ['6']
+    assert read_lines(frag_hist) == ['length\tfragments\tduplicate_fragments',
+                                     '150\t2\t1', '300\t1\t0', '1200\t1\t0']
+    stats_values = dict(line.split('\t') for line in read_lines(stats))
+    assert stats_values['input_alignments'] == '8'
+    assert stats_values['duplicate_alignments'] == '2'
+    assert stats_values['less_120_dedup.alignments'] == '4'
+    assert stats_values['all.fragments'] == '3'
+    assert [line.split('\t')[0] for line in read_lines(stats)].count('all.alignments') == 1
+
+
+@pytest.mark.parametrize('num_pairs', [1, 20000])
+def test_split_modes_failed_writer(tmp_path, capsys, num_pairs):
+    # Stand-in for "samtools view" that fails for one mode without reading its input,
+    #   at the end of the input (1 pair) or with the input still streaming (20000 pairs).
+    fake_samtools = write_file(tmp_path / 'fake_samtools.py', (
+        'import shutil\n'
+        'import sys\n'
+        'out_path = sys.argv[sys.argv.index("-o") + 1]\n'
+        'if "less_120" in out_path:\n'
+        '    sys.exit(3)\n'
+        'with open(out_path, "wb") as out_file:\n'
+        '    shutil.copyfileobj(sys.stdin.buffer, out_file)\n'
+    ))
+    records = ['@SQ\tSN:chr1\tLN:5000']
+    for pair_num in range(num_pairs):
+        records += [sam_record('p%i' % pair_num, 99, 101, 150, 50, 50),
+                    sam_record('p%i' % pair_num, 147, 201, -150, 50, 50)]
+    sam = write_file(tmp_path / 'in.sam', '\n'.join(records) + '\n')
+    mode_args = []
+    for mode in ['all', 'less_120']:
+        mode_args += ['--out', '%s=%s' % (mode, tmp_path / (mode + '.sam'))]
+    assert run_tool('split_modes', '--input', sam, *mode_args,
+                    '--samtools', '%s %s' % (sys.executable, fake_samtools)) != 0
+    error = capsys.readouterr().err
+    assert 'Writer for mode "less_120" exited with code: 3' in error
+    assert str(tmp_path / 'less_120.sam') in error
+    if num_pairs > 1:
+        assert 'Writing mode "less_120" failed' in error
+    assert 'mode "all"' not in error
+
+
+def read_bigwig(path):
+    # Minimal bigWig reader: Returns the header, chromosome sizes, total summary,
+    #   and all (chrom, start, end, value) data items.
+    with open(str(path), 'rb') as in_file:
+        data = in_file.read()
+    header = cnr_tools.BIGWIG_HEADER.unpack_from(data, 0)
+    chrom_tree_offset, index_offset, summary_offset = header[3], header[5], header[9]
+    key_size, item_count = [cnr_tools.CHROM_TREE_HEADER.unpack_from(data, chrom_tree_offset)[i]
+                            for i in (2, 4)]
+    offset = chrom_tree_offset + cnr_tools.CHROM_TREE_HEADER.size + cnr_tools.TREE_NODE_HEADER.size
+    chrom_names, chrom_sizes = {}, {}
+    for _ in range(item_count):
+        name = data[offset:offset + key_size].rstrip(b'\0').decode()
+        chrom_id, chrom_size = cnr_tools.CHROM_TREE_VALUE.unpack_from(data, offset + key_size)
+        chrom_names[chrom_id] = name
+        chrom_sizes[name] = chrom_size
+        offset += key_size + cnr_tools.CHROM_TREE_VALUE.size
+
+    def read_node(node_offset):
+        is_leaf, _, count = cnr_tools.TREE_NODE_HEADER.unpack_from(data, node_offset)
+        node_offset += cnr_tools.TREE_NODE_HEADER.size
+        for _ in range(count):
+            if is_leaf:
+                item = cnr_tools.INDEX_LEAF_ITEM.unpack_from(data, node_offset)
+                node_offset += cnr_tools.INDEX_LEAF_ITEM.size
+                yield item[4], item[5]
+            else:
+                item = cnr_tools.INDEX_NODE_ITEM.unpack_from(data, node_offset)
+                node_offset += cnr_tools.INDEX_NODE_ITEM.size
+                for block in read_node(item[4]):
+                    yield block
+
+    items = []
+    for block_offset, block_size in read_node(index_offset + cnr_tools.INDEX_TREE_HEADER.size):
+        block = zlib.decompress(data[block_offset:block_offset + block_size])
+        section = cnr_tools.SECTION_HEADER.unpack_from(block, 0)
+        assert section[5] == cnr_tools.BEDGRAPH_SECTION
+        for item_num in range(section[7]):
+            start, end, value = struct.unpack_from(
+                '<IIf', block, cnr_tools.SECTION_HEADER.size + 12 * item_num)
+            items.append((chrom_names[section[0]], start, end, value))
+    summary = cnr_tools.TOTAL_SUMMARY.unpack_from(data, summary_offset)
+    assert struct.unpack('<I', data[-4:])[0] == cnr_tools.BIGWIG_MAGIC
+    return header, chrom_sizes, summary, items
+
+
+def test_coverage(tmp_path):
+    chrom_sizes = write_file(tmp_path / 'chrom_sizes.txt', 'chr1\t100\nchr2\t50\nchr10\t80\n')
+    frags = write_file(tmp_path / 'frags.bed', (
+        'chr2\t10\t20\n'
+        'chr2\t15\t30\n'
+        'chr1\t0\t10\n'
+        'chr1\t5\t15\n'
+        'chrUn\t0\t5\n'
+    ))
+    out_paths = dict((key, tmp_path / ('cov.' + key)) for key in [
+        'bedgraph', 'scaled.bedgraph', 'bw', 'npz', 'chrom_stats.tsv'])
+    assert run_tool('coverage', '--input', frags, '--chrom-sizes', chrom_sizes,
+                    '--out', out_paths['bedgraph'],
+                    '--scaled', '0.5=%s' % out_paths['scaled.bedgraph'],
+                    '--bigwig', '2=%s' % out_paths['bw'],
+                    '--binned', '1=%s' % out_paths['npz'], '--bin-size', 10,
+                    '--chrom-stats', out_paths['chrom_stats.tsv']) == 0
+
+    runs = [('chr1', 0, 5, 1), ('chr1', 5, 10, 2), ('chr1', 10, 15, 1),
+            ('chr2', 10, 15, 1), ('chr2', 15, 20, 2), ('chr2', 20, 30, 1)]
+    assert read_lines(out_paths['bedgraph']) == ['%s\t%i\t%i\t%i' % run for run in runs]
+    assert read_lines(out_paths['scaled.bedgraph']) == [
+        '%s\t%i\t%i\t%g' % (run[:3] + (run[3] * 0.5,)) for run in runs]
+    assert read_lines(out_paths['chrom_stats.tsv']) == [
+        'chrom\tsize\tfragments\tcovered_bases\tmean_depth',
+        'chr1\t100\t2\t15\t0.2', 'chr10\t80\t0\t0\t0', 'chr2\t50\t2\t20\t0.5']
+
+    header, bw_chrom_sizes, summary, items = read_bigwig(out_paths['bw'])
+    assert header[0] == cnr_tools.BIGWIG_MAGIC
+    assert header[2] == 1
+    assert bw_chrom_sizes == {'chr1': 100, 'chr10': 80, 'chr2': 50}
+    assert items == [run[:3] + (run[3] * 2.0,) for run in runs]
+    assert summary == (35, 2.0, 4.0, 90.0, 260.0)
+
+    with np.load(str(out_paths['npz'])) as binned:
+        assert int(binned['bin_size']) == 10
+        assert binned['chroms'].tolist() == ['chr1', 'chr2']
+        assert binned['chrom_sizes'].tolist() == [100, 50]
+        assert binned['coverage_0'].tolist() == [1.5, 0.5] + [0.0] * 8
+        assert binned['coverage_1'].tolist() == [0.0, 1.5, 1.0, 0.0, 0.0]
+
+    # Fragments for a chromosome must be grouped together.
+    frags = write_file(tmp_path / 'frags_ungrouped.bed', 'chr1\t0\t10\nchr2\t0\t10\nchr1\t20\t30\n')
+    with pytest.raises(ValueError, match='not grouped together'):
+        run_tool('coverage', '--input', frags, '--chrom-sizes', chrom_sizes,
+                 '--out', out_paths['bedgraph'])
+
+
+def test_binned(tmp_path):
+    in_binned = str(tmp_path / 'in.npz')
+    np.savez(in_binned, bin_size=np.int64(10), chroms=np.array(['chr1', 'chr2']),
+             chrom_sizes=np.array([25, 30], dtype=np.int64),
+             coverage_0=np.array([1.5, 0.5, 0.5], dtype=np.float32),
+             coverage_1=np.array([0.0, 1.5, 1.0], dtype=np.float32))
+    out_binned = tmp_path / 'out.npz'
+    out_bigwig = tmp_path / 'out.bw'
+    assert run_tool('binned', '--input', in_binned, '--scale', 2,
+                    '--out', out_binned, '--bigwig', out_bigwig) == 0
+
+    with np.load(str(out_binned)) as binned:
+        assert int(binned['bin_size']) == 10
+        assert binned['chroms'].tolist() == ['chr1', 'chr2']
+        assert binned['coverage_0'].tolist() == [3.0, 1.0, 1.0]
+        assert binned['coverage_1'].tolist() == [0.0, 3.0, 2.0]
+    _, bw_chrom_sizes, summary, items = read_bigwig(out_bigwig)
+    assert bw_chrom_sizes == {'chr1': 25, 'chr2': 30}
+    # Equal adjacent bins are merged, and the last bin ends at the chromosome end.
+    assert items == [('chr1', 0, 10, 3.0), ('chr1', 10, 25, 1.0),
+                     ('chr2', 10, 20, 3.0), ('chr2', 20, 30, 2.0)]
+    assert summary[:3] == (45, 1.0, 3.0)
+
+
+def test_frip(tmp_path):
+    peaks_a = write_file(tmp_path / 'peaks_a.bed', (
+        'track name=peaks_a\n'
+        'chr1\t0\t10\n'
+        'chr1\t5\t20\n'
+        'chr2\t100\t200\n'
+    ))
+    peaks_b = write_file(tmp_path / 'peaks_b.bed', 'chr2\t0\t5\n')
+    frags = write_file(tmp_path / 'frags.bed', (
+        'chr1\t15\t30\n'
+        'chr1\t20\t30\n'
+        'chr1\t50\t60\n'
+        'chr2\t150\t160\n'
+        'chr2\t5\t10\n'
+        'chr3\t0\t10\n'
+    ))
+    out_path = tmp_path / 'frip.tsv'
+    assert run_tool('frip', '--frags', frags, '--peaks', 'A=' + peaks_a, '--peaks', 'B=' + peaks_b,
+                    '--name', 'sample_1', '--out', out_path) == 0
+    assert read_lines(out_path) == [
+        'name\tpeak_set\tpeaks\tpeak_bases\tfragments\tfragments_in_peaks\tfrip',
+        'sample_1\tA\t3\t120\t6\t2\t0.333333',
+        'sample_1\tB\t1\t5\t6\t0\t0.000000',
+    ]
+
+
+def test_split_spike(tmp_path):
+    sam = write_file(tmp_path / 'comb.sam', '\n'.join([
+        '@HD\tVN:1.6\tSO:unsorted',
+        '@SQ\tSN:chr1\tLN:1000',
+        '@SQ\tSN:spike_chrA\tLN:1000',
+        # Reference pair
+        'r1\t99\tchr1\t100\t42\t50M\t=\t200\t150\t*\t*\tAS:i:0',
+        'r1\t147\tchr1\t200\t42\t50M\t=\t100\t-150\t*\t*\tAS:i:0',
+        # Spike-in pair, unique
+        'r2\t99\tspike_chrA\t100\t42\t50M\t=\t200\t150\t*\t*\tAS:i:0\tXS:i:-10',
+        'r2\t147\tspike_chrA\t200\t42\t50M\t=\t100\t-150\t*\t*\tAS:i:0',
+        # Spike-in pair, equal-scoring alternate alignment
+        'r3\t99\tspike_chrA\t300\t1\t50M\t=\t400\t150\t*\t*\tAS:i:-5\tXS:i:-5',
+        'r3\t147\tspike_chrA\t400\t1\t50M\t=\t300\t-150\t*\t*\tAS:i:-5\tXS:i:-2',
+        # Mixed pair: Reference mate with a spike-in mate
+        'r4\t97\tchr1\t500\t42\t50M\tspike_chrA\t600\t0\t*\t*\tAS:i:0',
+        'r4\t145\tspike_chrA\t600\t42\t50M\tchr1\t500\t0\t*\t*\tAS:i:0',
+    ]) + '\n')
+    out_sam = tmp_path / 'ref.sam'
+    stats = tmp_path / 'stats.tsv'
+    assert run_tool('split_spike', '--input', sam, '--output', out_sam,
+                    '--prefix', 'spike_', '--stats', stats) == 0
+    out_lines = read_lines(out_sam)
+    assert '@SQ\tSN:spike_chrA\tLN:1000' not in out_lines
+    assert [line.split('\t')[0] for line in out_lines if not line.startswith('@')] == ['r1', 'r1']
+    counts = dict(line.split('\t') for line in read_lines(stats))
+    assert counts == {'ref_aln': '2', 'spike_aln': '5', 'cross_aln': '2',
+                      'adj_aln': '3', 'mixed_ref_aln': '1'}
+
+
+def test_interleave(tmp_path):
+    reads = {}
+    for mate in ['1', '2']:
+        reads[mate] = [['@read%i/%s' % (read_num, mate), 'ACGT', '+', 'IIII']
+                       for read_num in range(3)]
+        write_file(tmp_path / ('in_R%s.fastq' % mate),
+                   ''.join('\n'.join(read) + '\n' for read in reads[mate]))
+    out_path = tmp_path / 'out.fastq'
+    assert run_tool('interleave', '--in-1', tmp_path / 'in_R1.fastq',
+                    '--in-2', tmp_path / 'in_R2.fastq', '--output', out_path) == 0
+    expected = []
+    for read_1, read_2 in zip(reads['1'], reads['2']):
+        expected += read_1 + read_2
+    assert read_lines(out_path) == expected
+
+    write_file(tmp_path / 'short_R2.fastq', '\n'.join(reads['2'][0]) + '\n')
+    with pytest.raises(ValueError, match='unequal or incomplete'):
+        run_tool('interleave', '--in-1', tmp_path / 'in_R1.fastq',
+                 '--in-2', tmp_path / 'short_R2.fastq', '--output', out_path)
+
+
+def test_prep_ref(tmp_path):
+    fasta_text = '>chr1 description\nACGTACGTCG\nacgtNN\n>chr2\nCCGG\n'
+    fasta = write_file(tmp_path / 'ref.fa', fasta_text)
+    out_paths = dict((key, tmp_path / ('ref.' + key)) for key in [
+        'out-fasta', 'faidx', 'chrom-sizes', 'facount', 'eff-genome', 'md5', 'seq-md5'])
+    out_args = []
+    for key, out_path in out_paths.items():
+        out_args += ['--' + key, out_path]
+    ref_cache = tmp_path / 'ref_cache'
+    assert run_tool('prep_ref', '--input', fasta, *out_args, '--ref-cache', ref_cache) == 0
+
+    with open(str(out_paths['out-fasta'])) as in_file:
+        assert in_file.read() == fasta_text
+    assert read_lines(out_paths['faidx']) == ['chr1\t16\t18\t10\t11', 'chr2\t4\t42\t4\t5']
+    assert read_lines(out_paths['chrom-sizes']) == ['chr1\t16', 'chr2\t4']
+    assert read_lines(out_paths['facount']) == ['#seq\tlen\tA\tC\tG\tT\tN\tcpg',
+                                                'chr1\t16\t3\t4\t4\t3\t2\t4',
+                                                'chr2\t4\t0\t2\t2\t0\t0\t1',
+                                                'total\t20\t3\t6\t6\t3\t2\t5']
+    assert read_lines(out_paths['eff-genome']) == ['18']
+    assert read_lines(out_paths['md5']) == [hashlib.md5(fasta_text.encode()).hexdigest()]
+    seqs = [('chr1', b'ACGTACGTCGACGTNN'), ('chr2', b'CCGG')]
+    assert read_lines(out_paths['seq-md5']) == [
+        '%s\t%i\t%s' % (name, len(seq), hashlib.md5(seq).hexdigest()) for name, seq in seqs]
+    for name, seq in seqs:
+        seq_md5 = hashlib.md5(seq).hexdigest()
+        with open(str(ref_cache / seq_md5[:2] / seq_md5[2:4] / seq_md5[4:]), 'rb') as in_file:
+            assert in_file.read() == seq
+
+    fasta = write_file(tmp_path / 'bad.fa', '>chr1\nACGT\nAC\nACGT\n')
+    with pytest.raises(ValueError, match='differing length'):
+        run_tool('prep_ref', '--input', fasta, '--faidx', tmp_path / 'bad.fai')
+
+
+def test_qc_report_numeric_sample_names(tmp_path):
+    # Regression: Numeric (Ex: "001") and mixed sample names were converted to int.
+    stats = write_file(tmp_path / 'stats.tsv', (
+        'name\tstep\tkey\tvalue\n'
+        '001\tS2_B_Modify_Aln\tinput_alignments\t200\n'
+        '001\tS2_B_Modify_Aln\tduplicate_alignments\t20\n'
+        'ctrl_A\tS2_B_Modify_Aln\tinput_alignments\t100\n'
+    ))
+    frip = write_file(tmp_path / 'frip.tsv', (
+        'name\tpeak_set\tpeaks\tpeak_bases\tfragments\tfragments_in_peaks\tfrip\n'
+        '001\t2\t3\t300\t100\t25\t0.25\n'
+    ))
+    frag_hist = write_file(tmp_path / '001.frag_hist.tsv', (
+        'length\tfragments\tduplicate_fragments\n'
+        '100\t3\t1\n'
+        '150\t1\t0\n'
+    ))
+    out_table = tmp_path / 'qc.tsv'
+    out_json = tmp_path / 'qc.json'
+    assert run_tool('qc_report', '--stats', stats, '--frip', frip,
+                    '--frag-hist', '001=' + frag_hist,
+                    '--out-table', out_table, '--out-json', out_json) == 0
+    rows = [line.split('\t') for line in read_lines(out_table) if not line.startswith('#')]
+    assert rows[0][-1] == 'FRiP 2'
+    assert [row[0] for row in rows[1:]] == ['001', 'ctrl_A']
+    assert rows[1][1:] == ['200', '10.00', '4', '100', '75.00', '0.2500']
+    with open(str(out_json)) as in_file:
+        assert sorted(json.load(in_file)['samples']) == ['001', 'ctrl_A']
+
+    # All-numeric sample names
+    stats = write_file(tmp_path / 'stats_numeric.tsv', (
+        'name\tstep\tkey\tvalue\n'
+        '002\tS2_B_Modify_Aln\tinput_alignments\t50\n'
+        '10\tS2_B_Modify_Aln\tinput_alignments\t60\n'
+    ))
+    assert run_tool('qc_report', '--stats', stats, '--out-table', out_table) == 0
+    rows = [line.split('\t') for line in read_lines(out_table) if not line.startswith('#')]
+    assert [row[0] for row in rows[1:]] == ['002', '10']
+
+
+TRACE_HEADER = 'task_id\tprocess\ttag\tstatus\texit\tcpus\tmemory\trealtime\t%cpu\tpeak_rss\trchar\twchar\n'
+
+
+def test_profile(tmp_path):
+    pipeline = write_file(tmp_path / 'pipeline.nf', (
+        "process CnR_A {\n"
+        "    label 'big'\n"
+        "}\n"
+        "process CnR_B {\n"
+        "    label 'small'\n"
+        "}\n"
+    ))
+    gb = 1024 ** 3
+    trace = write_file(tmp_path / 'trace.tsv', TRACE_HEADER + ''.join([
+        '1\tCnR_A\ts1\tCOMPLETED\t0\t4\t%i\t3600000\t100.0\t%i\t%i\t%i\n' % (8 * gb, gb, gb, gb),
+        '2\tCnR_A\ts2\tCACHED\t0\t4\t%i\t3600000\t100.0\t%i\t%i\t%i\n' % (8 * gb, gb, gb, gb),
+        '3\tCnR_B\ts1\tCOMPLETED\t0\t1\t-\t1800000\t150.0\t%i\t0\t0\n' % gb,
+        '4\tCnR_B\ts2\tFAILED\t1\t1\t-\t-\t-\t-\t-\t-\n',
+    ]))
+    out_path = tmp_path / 'profile.tsv'
+    report_path = tmp_path / 'profile.txt'
+    assert run_tool('profile', '--trace', trace, '--pipeline', pipeline,
+                    '--out', out_path, '--report', report_path, '--top', 2) == 0
+
+    rows = [line.split('\t') for line in read_lines(out_path)]
+    columns = rows.pop(0)
+    rows = dict(((row[0], row[1]), dict(zip(columns, row))) for row in rows)
+    assert list(rows) == [('process', 'CnR_A'), ('process', 'CnR_B'),
+                          ('label', 'big'), ('label', 'small')]
+    assert rows[('process', 'CnR_A')]['label'] == 'big'
+    assert rows[('process', 'CnR_A')]['realtime_h'] == '2.000'
+    assert rows[('process', 'CnR_A')]['realtime_share'] == '0.800'
+    assert rows[('process', 'CnR_A')]['cpu_efficiency'] == '0.250'
+    assert rows[('process', 'CnR_A')]['memory_efficiency'] == '0.125'
+    assert rows[('process', 'CnR_A')]['flags'] == 'cpus_over_provisioned,memory_over_provisioned'
+    assert rows[('process', 'CnR_B')]['tasks'] == '1'
+    assert rows[('process', 'CnR_B')]['failed'] == '1'
+    assert rows[('process', 'CnR_B')]['flags'] == ('cpus_under_provisioned,memory_not_requested,'
+                                                   'failed_tasks')
+    with open(str(report_path)) as in_file:
+        report = in_file.read()
+    assert 'Tasks: 4' in report
+    assert report.split('Longest Tasks:\n')[1].count('\n') == 2
+
+
+def test_benchmark(tmp_path):
+    gb = 1024 ** 3
+    traces = {}
+    for case, realtime in [('case_1', 100000), ('case_2', 20000)]:
+        traces[case] = write_file(tmp_path / (case + '.trace.tsv'), TRACE_HEADER + ''.join([
+            '1\tCnR_A\ts1\tCOMPLETED\t0\t2\t%i\t%i\t200.0\t%i\t0\t%i\n' % (gb, realtime, gb // 2, gb),
+            '2\tCnR_B\ts1\tCOMPLETED\t0\t1\t%i\t%i\t100.0\t%i\t0\t0\n' % (gb, realtime, gb // 4),
+            '3\tCnR_B\ts2\tFAILED\t1\t1\t%i\t%i\t100.0\t%i\t0\t0\n' % (gb, realtime, gb // 4),
+        ]))
+    out_path = tmp_path / 'benchmark.tsv'
+    assert run_tool('benchmark', '--trace', 'case_1=' + traces['case_1'],
+                    '--trace', 'case_2=' + traces['case_2'], '--version', '1.0',
+                    '--out', out_path) == 0
+    rows = [line.split('\t') for line in read_lines(out_path)]
+    assert rows[0] == ['version', 'case', 'process', 'tasks'] + cnr_tools.BENCHMARK_METRICS
+    assert rows[1:4] == [
+        ['1.0', 'case_1', 'CnR_A', '1', '100.000', '200.000', '0.500', '1.000'],
+        ['1.0', 'case_1', 'CnR_B', '1', '100.000', '100.000', '0.250', '0.000'],
+        ['1.0', 'case_1', 'total', '2', '200.000', '300.000', '0.500', '1.000'],
+    ]
+    assert [row[1:3] for row in rows[4:]] == [['case_2', 'CnR_A'], ['case_2', 'CnR_B'],
+                                              ['case_2', 'total']]
+
+    # Compare to a baseline: case_1 CnR_A wall time doubled, CPU time halved,
+    #   and case_2 values are below the minimum compared values.
+    baseline = write_file(tmp_path / 'baseline.tsv', '\t'.join(rows[0]) + '\n' + ''.join([
+        '0.9\tcase_1\tCnR_A\t1\t50.000\t400.000\t0.500\t1.000\n',
+        '0.9\tcase_2\tCnR_A\t1\t5.000\t5.000\t0.010\t0.001\n',
+    ]))
+    report_path = tmp_path / 'benchmark.txt'
+    assert run_tool('benchmark', '--trace', 'case_1=' + traces['case_1'],
+                    '--trace', 'case_2=' + traces['case_2'], '--version', '1.0',
+                    '--baseline', baseline, '--report', report_path) == 0
+    with open(str(report_path)) as in_file:
+        report = in_file.read()
+    comparisons = [line.split() for line in report.split('Comparison to Baseline: 0.9')[1].splitlines()
+                   if line.strip().startswith(('REGRESSION', 'IMPROVED'))]
+    assert [line[:4] for line in comparisons] == [['REGRESSION', 'case_1', 'CnR_A', 'realtime_s'],
+                                                  ['IMPROVED', 'case_1', 'CnR_A', 'cpu_time_s']]
+    assert 'Regressions: 1' in report